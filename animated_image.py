@@ -0,0 +1,128 @@
+"""
+Animated Image Streaming for Marketing Display Application
+Decodes animated GIF/WebP frames lazily with a bounded frame buffer
+"""
+import logging
+import queue
+import threading
+from typing import Optional, Tuple
+from PIL import Image, ImageOps
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def is_animated_image(filepath: str) -> bool:
+    """
+    Check if an image file contains more than one frame
+
+    Args:
+        filepath: Path to image file
+
+    Returns:
+        True if animated GIF/WebP/PNG, False otherwise
+    """
+    try:
+        with Image.open(filepath) as image:
+            return bool(getattr(image, 'is_animated', False)) and getattr(image, 'n_frames', 1) > 1
+    except Exception:
+        return False
+
+
+class AnimatedImageStream:
+    """
+    Streams frames of an animated image from a background decoder thread
+
+    Frames are decoded one at a time from PIL's lazy frame iterator, scaled to
+    the target size and handed over through a small bounded queue. At most
+    ANIMATION_FRAME_BUFFER decoded frames exist at any time, so long animations
+    never expand into the full set of RGB frames in memory. When the last frame
+    is reached the decoder seeks back to the first one and keeps looping.
+    """
+
+    def __init__(self, filepath: str, target_size: QSize):
+        self.filepath = filepath
+        self.target_size = (target_size.width(), target_size.height())
+        self.frames: queue.Queue = queue.Queue(maxsize=Config.ANIMATION_FRAME_BUFFER)
+        self.stop_event = threading.Event()
+        self.decoder_thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+
+    def start(self):
+        """Start decoding frames in the background"""
+        self.decoder_thread = threading.Thread(
+            target=self._decode_loop,
+            name="animated-image-decoder",
+            daemon=True
+        )
+        self.decoder_thread.start()
+
+    def stop(self):
+        """Stop decoding and release buffered frames"""
+        self.stop_event.set()
+
+        # Drain the queue so a blocked decoder wakes up
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+
+        if self.decoder_thread and self.decoder_thread.is_alive():
+            self.decoder_thread.join(timeout=1)
+        self.decoder_thread = None
+
+    def next_frame(self) -> Optional[Tuple[QImage, int]]:
+        """
+        Take the next decoded frame if one is ready
+
+        Returns:
+            Tuple of (frame, delay in ms) or None if the decoder is behind
+        """
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _decode_loop(self):
+        """Decode, scale and queue frames until stopped"""
+        try:
+            with Image.open(self.filepath) as image:
+                frame_count = getattr(image, 'n_frames', 1)
+                index = 0
+
+                while not self.stop_event.is_set():
+                    image.seek(index)
+                    delay = image.info.get('duration') or Config.ANIMATION_DEFAULT_FRAME_DELAY
+                    delay = max(int(delay), Config.ANIMATION_MIN_FRAME_DELAY)
+
+                    frame = self._prepare_frame(image)
+
+                    # Block until the consumer frees a slot in the buffer
+                    while not self.stop_event.is_set():
+                        try:
+                            self.frames.put((frame, delay), timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+
+                    index = (index + 1) % frame_count
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Animated image decode failed: {e}")
+
+    def _prepare_frame(self, image: Image.Image) -> QImage:
+        """Convert the current PIL frame into a screen-sized QImage"""
+        frame = image.convert('RGB')
+
+        # Fill screen completely, center crop (matches static images)
+        frame = ImageOps.fit(frame, self.target_size, Image.BILINEAR)
+
+        data = frame.tobytes('raw', 'RGB')
+        qimage = QImage(data, frame.width, frame.height, frame.width * 3, QImage.Format_RGB888)
+
+        # Detach from the Python buffer before it is released
+        return qimage.copy()
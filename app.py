@@ -2,75 +2,153 @@
 Main Application Entry Point for Marketing Display
 Integrates device registration, WiFi setup, media player, SignalR, and content management
 """
+from startup_profiler import startup_profiler  # First: its clock times everything below
+
 import sys
 import os
+import time
 import asyncio
+import argparse
 import logging
 from PyQt5.QtWidgets import QApplication, QStackedWidget
-from PyQt5.QtCore import QTimer, QThread, pyqtSignal
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal
 from PyQt5.QtGui import QCursor
 from PyQt5.QtCore import Qt
 
 from config import Config, load_environment
-from utils import check_internet_connection, setup_logging
-from wifi_setup import WiFiSetupUI
-from media_player_vlc import MediaPlayerApp
+from async_runtime import async_runtime
+from utils import setup_logging, stop_logging, get_system_uptime, write_json_atomic
+from connectivity import ConnectivityMonitor
+from refresh_coordinator import RefreshCoordinator, RefreshRun
+from metrics import metrics
 from playlist_manager import PlaylistManager
-from media_downloader import MediaDownloader
-from signalr_client import SignalRClient
-from device_registration import DeviceRegistrationManager, RegistrationUI, RegistrationState
+from device_registration import DeviceRegistrationManager, RegistrationState
+
+# Heavy subsystems (player backend and libVLC with its decode profile and
+# sandbox, downloader and ingest, SignalR, WiFi and registration UIs) and the
+# optional ones (stall watchdog, proof of play, rollups) are imported where
+# they are first used, so each boot only pays for the path it takes
 
 logger = logging.getLogger(__name__)
 
 
-class ContentUpdateThread(QThread):
-    """Thread for handling playlist updates and downloads"""
+class ContentUpdater(QObject):
+    """Runs playlist updates and downloads on the shared async runtime, one at a time"""
     
     playlist_ready = pyqtSignal(list)  # Emits playlist when ready
+    urgent_ready = pyqtSignal(dict)  # Emits an urgent item as soon as it can play (may still be downloading)
     
-    def __init__(self, action='refresh', message=None):
-        super().__init__()
-        self.action = action
-        self.message = message
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.coordinator = RefreshCoordinator(self.update, self)
+        self.run_finished = self.coordinator.run_finished  # Outcome of every run
     
-    def run(self):
-        """Run content update in background thread"""
-        try:
-            logger.info(f"Processing content update: {self.action}")
-            
-            # Fetch latest playlist
-            playlist_manager = PlaylistManager()
-            items = playlist_manager.fetch_playlist()
-            
-            if items:
-                # Download media files
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                async def download_all():
-                    async with MediaDownloader() as downloader:
-                        return await downloader.download_playlist(items)
-                
-                downloaded_items = loop.run_until_complete(download_all())
-                loop.close()
-                
-                if downloaded_items:
-                    self.playlist_ready.emit(downloaded_items)
-                    logger.info(f"Content update completed: {len(downloaded_items)} items ready")
-                else:
-                    logger.warning("No items downloaded")
-            else:
-                logger.error("Failed to fetch playlist")
-                
-        except Exception as e:
-            logger.error(f"Error in content update thread: {e}")
+    def refresh(self, action='refresh', message=None):
+        """Request a content update (any thread, returns immediately)"""
+        self.coordinator.request(action, message)
+    
+    def is_running(self) -> bool:
+        """Check if an update is in progress"""
+        return self.coordinator.is_running()
+    
+    def cancel(self):
+        """Cancel the update in progress and any merged follow-up"""
+        self.coordinator.cancel()
+    
+    async def update(self, run: RefreshRun) -> dict:
+        """Fetch the playlist and download its media (async runtime thread)"""
+        logger.info(f"Processing content update: {', '.join(run.get_actions())}")
+        
+        # Fetch latest playlist (blocking HTTP client, kept off the loop)
+        playlist_manager = PlaylistManager()
+        loop = asyncio.get_running_loop()
+        items = await loop.run_in_executor(None, playlist_manager.fetch_playlist)
+        
+        if not items:
+            logger.error("Failed to fetch playlist")
+            return {'outcome': 'failed', 'error': 'playlist fetch failed'}
+        
+        if run.superseded:
+            # A newer publish arrived while fetching: this playlist may already be stale,
+            # the follow-up run fetches again before any download starts
+            return {'outcome': 'superseded'}
+        
+        # Download media files over the shared session (downloads are not cut short by
+        # later requests: the follow-up run finds them in the cache)
+        from media_downloader import MediaDownloader
+        
+        session = await async_runtime.get_session()
+        async with MediaDownloader(session) as downloader:
+            downloader.progressive_callback = self.urgent_ready.emit
+            downloaded_items = await downloader.download_playlist(items)
+        
+        if not downloaded_items:
+            logger.warning("No items downloaded")
+            return {'outcome': 'empty', 'items': 0, 'fetched': len(items)}
+        
+        self.playlist_ready.emit(downloaded_items)
+        logger.info(f"Content update completed: {len(downloaded_items)} items ready")
+        return {'outcome': 'ok', 'items': len(downloaded_items), 'fetched': len(items)}
+
+
+class RegistrationCheck(QObject):
+    """Boot-time registration check on the async runtime, reported on the Qt thread"""
+    
+    # Emitted once per check: RegistrationState (None if not registered), or an exception on failure
+    finished = pyqtSignal(object)
+    
+    # Done callback runs on the runtime thread; delivered queued on the Qt thread
+    _done = pyqtSignal(object, object)
+    
+    def __init__(self, check, parent=None):
+        """
+        Args:
+            check: Coroutine function returning the RegistrationState or None
+        """
+        super().__init__(parent)
+        self.check = check
+        self.future = None
+        self._done.connect(self._on_done)
+        
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self._on_timeout)
+    
+    def start(self):
+        """Submit the check (returns immediately)"""
+        future = self.future = async_runtime.submit(self.check())
+        future.add_done_callback(lambda done: self._done.emit(future, done))
+        self.timeout_timer.start(Config.REGISTRATION_CHECK_TIMEOUT * 1000)
+    
+    def _on_done(self, future, done):
+        """Report the result of the current check (Qt thread)"""
+        if future is not self.future:
+            return  # Timed out and already reported
+        self.future = None
+        self.timeout_timer.stop()
+        
+        if done.cancelled():
+            self.finished.emit(TimeoutError('registration check cancelled'))
+        elif done.exception() is not None:
+            self.finished.emit(done.exception())
+        else:
+            self.finished.emit(done.result())
+    
+    def _on_timeout(self):
+        """Give up on a check that did not answer in time (Qt thread)"""
+        if self.future is None:
+            return
+        future, self.future = self.future, None
+        future.cancel()
+        self.finished.emit(TimeoutError(f"no answer within {Config.REGISTRATION_CHECK_TIMEOUT}s"))
 
 
 class MarketingDisplayApp:
     """Main application controller"""
     
-    def __init__(self):
+    def __init__(self, profile_startup: bool = False):
         self.app = QApplication(sys.argv)
+        self.profile_startup = profile_startup
         
         # Main window stack (registration -> wifi -> media player)
         self.main_window = QStackedWidget()
@@ -85,11 +163,40 @@ class MarketingDisplayApp:
         self.registration_manager = DeviceRegistrationManager()
         self.signalr_client = None
         self.playlist_manager = PlaylistManager()
-        self.update_thread = None
-        
-        # Timer for periodic internet checks
-        self.internet_check_timer = QTimer()
-        self.internet_check_timer.timeout.connect(self.check_connectivity)
+        self.content_updater = ContentUpdater()
+        self.content_updater.playlist_ready.connect(self.on_playlist_ready)
+        self.content_updater.urgent_ready.connect(self.on_urgent_ready)
+        
+        # Async backend/blob probes with debounced online/offline state
+        self.connectivity = ConnectivityMonitor()
+        self.connectivity.online_changed.connect(self.on_online_changed)
+        self.pending_registration = None  # Waiting for the first connectivity result
+        self.registration_check = RegistrationCheck(self.check_registration)
+        self.registration_check.finished.connect(self.on_registration_checked)
+        self.pending_sync = None  # Playing cached content offline; sync when back online
+        self.first_frame_recorded = False
+        self.booted_from_cache = False
+        
+        # Event-loop latency and stack capture for UI freezes
+        self.stall_watchdog = None
+        if Config.STALL_WATCHDOG:
+            from stall_watchdog import StallWatchdog
+            self.stall_watchdog = StallWatchdog()
+        
+        # Proof-of-play journal, uploaded in batches whenever the device is online
+        self.proof_of_play = None
+        if Config.PROOF_OF_PLAY:
+            from proof_of_play import ProofOfPlayJournal
+            self.proof_of_play = ProofOfPlayJournal()
+        self.proof_of_play_upload = None  # Upload in flight
+        self.proof_of_play_timer = QTimer()
+        self.proof_of_play_timer.timeout.connect(self.upload_proof_of_play)
+        
+        # Hourly per-item aggregates, the compact alternative to shipping every play
+        self.playback_rollups = None
+        if Config.PLAYBACK_ROLLUPS:
+            from playback_rollups import PlaybackRollups
+            self.playback_rollups = PlaybackRollups(self.connectivity)
         
         # Hide cursor globally
         self.app.setOverrideCursor(QCursor(Qt.BlankCursor))
@@ -112,45 +219,85 @@ class MarketingDisplayApp:
         """Start the application"""
         logger.info("Application starting...")
         
-        # Run async initialization
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # Network and timer work runs on one persistent loop for the app's lifetime
+        async_runtime.start()
         
-        registration_state = loop.run_until_complete(self.check_registration())
+        # Writer thread seals anything a previous run left behind
+        if self.proof_of_play:
+            self.proof_of_play.start()
+        if self.playback_rollups:
+            self.playback_rollups.start()
         
-        if not registration_state:
-            # Need to register device
-            self.show_registration()
-        elif not check_internet_connection():
-            # Registered but no internet - show WiFi setup
-            logger.warning("No internet connection - showing WiFi setup")
-            self.show_wifi_setup()
-        else:
-            # Registered and has internet - start main app
-            logger.info("Device registered and connected - starting main app")
-            self.start_main_app(registration_state)
+        # Heartbeats only tick once exec_() runs; until then the boot is still in progress
+        if self.stall_watchdog:
+            QTimer.singleShot(0, self.stall_watchdog.start)
+        
+        # Scrape endpoint and snapshot writer, also kept off the path to the first frame
+        if Config.METRICS_ENABLED:
+            QTimer.singleShot(0, metrics.start)
+        
+        # Registration check runs on the runtime thread while the player warms up here;
+        # the result arrives through on_registration_checked once the event loop runs
+        self.registration_check.start()
+        
+        # Offline-first: play the last committed playlist before any network activity
+        cached_items = self.playlist_manager.load_committed_playlist(Config.PLAYLIST_CACHE_FILE)
+        if cached_items:
+            logger.info(f"Booting from cached playlist: {len(cached_items)} items")
+            self.booted_from_cache = True
+            self.start_main_app(playlist=cached_items)
+        
+        if self.profile_startup:
+            # Paths without a first frame (registration, WiFi setup) still get a report
+            QTimer.singleShot(Config.STARTUP_PROFILE_TIMEOUT * 1000, self.finish_startup_profile)
+        
+        # First probe result arrives through online_changed
+        self.connectivity.start()
         
         # Start application event loop
         return self.app.exec_()
     
+    def on_registration_checked(self, result):
+        """
+        Continue the boot with the stored registration (Qt thread)
+        
+        Args:
+            result: RegistrationState, None if not registered, or the exception
+                that made the check fail
+        """
+        if isinstance(result, BaseException):
+            # Cached content (if any) keeps playing offline while we retry
+            logger.error(f"Registration check failed: {result}; retrying in "
+                         f"{Config.REGISTRATION_CHECK_RETRY_DELAY}s")
+            QTimer.singleShot(Config.REGISTRATION_CHECK_RETRY_DELAY * 1000, self.registration_check.start)
+            return
+        
+        startup_profiler.mark('registration check')
+        
+        if not result:
+            # Need to register device
+            if self.player_window:
+                self.player_window.close()
+                self.player_window = None
+            self.show_registration()
+        else:
+            self.proceed_when_connectivity_known(result)
+    
     def show_registration(self):
         """Show device registration UI"""
         logger.info("Showing device registration screen")
         
+        from device_registration import RegistrationUI
+        
         self.registration_window = RegistrationUI()
         self.registration_window.registration_complete.connect(self.on_registration_complete)
         
         # Show window first (fullscreen kiosk mode)
         self.registration_window.showFullScreen()
+        startup_profiler.mark('registration shown')
         
         # Start registration process after window is shown
-        QTimer.singleShot(100, self._start_registration_async)
-    
-    def _start_registration_async(self):
-        """Start registration process asynchronously"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(self.registration_window.start_registration_process())
+        QTimer.singleShot(100, self.registration_window.start)
     
     def on_registration_complete(self, state: RegistrationState):
         """Called when device registration is complete"""
@@ -162,17 +309,49 @@ class MarketingDisplayApp:
             self.registration_window = None
         
         # Check internet and proceed
-        if check_internet_connection():
+        self.proceed_when_connectivity_known(state)
+    
+    def proceed_when_connectivity_known(self, state: RegistrationState):
+        """Start the main app or WiFi setup once the connectivity state is known"""
+        # Registered: proof of play can be uploaded whenever the device is online
+        if self.proof_of_play:
+            self.proof_of_play.set_credentials(state.api_key, state.assigned_guid)
+            self.proof_of_play_timer.start(Config.PROOF_OF_PLAY_UPLOAD_INTERVAL * 1000)
+        if self.playback_rollups:
+            self.playback_rollups.set_credentials(state.api_key, state.assigned_guid)
+        
+        self.pending_registration = state
+        if self.connectivity.online is not None:
+            self._proceed()
+    
+    def _proceed(self):
+        """Leave registration for the main app (online) or WiFi setup (offline)"""
+        state, self.pending_registration = self.pending_registration, None
+        if self.player_window:
+            # Booted from cache: keep playing, sync in the background once online
+            if self.connectivity.online:
+                self.start_background_sync(state)
+            else:
+                logger.warning("No internet connection - playing cached content")
+                self.pending_sync = state
+        elif self.connectivity.online:
+            # Registered and has internet - start main app
+            logger.info("Device registered and connected - starting main app")
             self.start_main_app(state)
         else:
+            # Registered but no internet - show WiFi setup
+            logger.warning("No internet connection - showing WiFi setup")
             self.show_wifi_setup()
     
     def show_wifi_setup(self):
         """Show WiFi configuration UI"""
+        from wifi_setup import WiFiSetupUI
+        
         self.wifi_window = WiFiSetupUI(on_success_callback=self.on_wifi_connected)
         
         # Always show fullscreen (kiosk mode)
         self.wifi_window.showFullScreen()
+        startup_profiler.mark('wifi setup shown')
     
     def on_wifi_connected(self):
         """Called when WiFi connection is successful"""
@@ -183,47 +362,110 @@ class MarketingDisplayApp:
             self.wifi_window.close()
             self.wifi_window = None
         
+        # Re-probe now rather than at the next interval
+        self.connectivity.check_now()
+        
         # Start main app
         QTimer.singleShot(1000, self.start_main_app)
     
-    def start_main_app(self, registration_state: RegistrationState = None):
-        """Start main media display application"""
+    def start_main_app(self, registration_state: RegistrationState = None, playlist: list = None):
+        """
+        Start main media display application
+        
+        Args:
+            registration_state: Activated registration (starts the background sync)
+            playlist: Cached items to play right away
+        """
         logger.info("Starting main application")
         
-        # Create media player window
-        self.player_window = MediaPlayerApp()
+        from media_player_app import MediaPlayerApp
+        
+        # Create media player window (warms the playback backend, pre-decodes the first item)
+        self.player_window = MediaPlayerApp(playlist)
+        self.player_window.player_widget.media_started.connect(self.on_first_frame)
+        if self.proof_of_play:
+            self.player_window.item_started.connect(self.proof_of_play.start_item)
+            self.player_window.item_ended.connect(self.proof_of_play.end_item)
+        if self.playback_rollups:
+            self.player_window.item_started.connect(self.playback_rollups.on_item_started)
+            self.player_window.item_ended.connect(self.playback_rollups.on_item_ended)
+            self.player_window.item_updated.connect(self.playback_rollups.on_item_updated)
         
         # Always show fullscreen (kiosk mode)
         self.player_window.showFullScreen()
+        startup_profiler.mark('window show')
         
         # Load initial content
         logger.info("Main application window displayed")
         
+        if registration_state:
+            self.start_background_sync(registration_state)
+    
+    def start_background_sync(self, registration_state: RegistrationState):
+        """Sync content and real-time updates behind the running player"""
+        logger.info("Starting background content sync")
+        self.upload_proof_of_play()
+        
         # TODO: Uncomment when backend is ready
-        # if registration_state:
-        #     self.load_content(registration_state.api_key)
-        #     self.start_signalr(registration_state.api_key)
+        # self.load_content(registration_state.api_key)
+        # self.start_signalr(registration_state.api_key)
+    
+    def on_first_frame(self):
+        """Record time-to-first-frame once per boot"""
+        if self.first_frame_recorded:
+            return
+        self.first_frame_recorded = True
+        startup_profiler.mark('first frame')
+        
+        elapsed_ms = startup_profiler.elapsed_ms()
+        uptime = get_system_uptime()
+        within_budget = elapsed_ms <= Config.BOOT_FIRST_FRAME_BUDGET_MS
+        
+        message = f"First frame {elapsed_ms:.0f}ms after process start"
+        if uptime is not None:
+            message += f", {uptime:.1f}s after power-on"
+        if within_budget:
+            logger.info(f"⏱️  {message} (budget {Config.BOOT_FIRST_FRAME_BUDGET_MS}ms)")
+        else:
+            logger.warning(f"⏱️  {message} - over budget of {Config.BOOT_FIRST_FRAME_BUDGET_MS}ms")
         
+        try:
+            write_json_atomic(Config.BOOT_TIMING_FILE, {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'first_frame_ms': round(elapsed_ms),
+                'uptime_seconds': round(uptime, 1) if uptime is not None else None,
+                'budget_ms': Config.BOOT_FIRST_FRAME_BUDGET_MS,
+                'within_budget': within_budget,
+                'from_cache': self.booted_from_cache,
+            }, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not write boot timing: {e}")
+        
+        if self.profile_startup:
+            self.finish_startup_profile()
+    
+    def finish_startup_profile(self):
+        """Report the startup timeline and quit (--profile-startup)"""
+        if not self.profile_startup:
+            return
+        self.profile_startup = False
+        
+        within_budget = startup_profiler.report(
+            budget_ms=Config.BOOT_FIRST_FRAME_BUDGET_MS if self.first_frame_recorded else None,
+            output_file=Config.STARTUP_PROFILE_FILE
+        )
+        self.app.exit(0 if within_budget and self.first_frame_recorded else 1)
+    
     def load_content(self, api_key: str):
         """Load initial content from backend"""
         logger.info("Loading initial content")
         
-        # Try to load cached playlist first
-        cache_file = os.path.join(Config.CACHE_DIR, 'playlist_cache.json')
-        
-        if os.path.exists(cache_file):
-            if self.playlist_manager.load_playlist_cache(cache_file):
-                logger.info("Loaded cached playlist")
-                
-                # Use cached items that are already downloaded
-                cached_items = []
-                for item in self.playlist_manager.get_current_playlist():
-                    if item.get('path') and os.path.exists(item['path']):
-                        cached_items.append(item)
-                
-                if cached_items and self.player_window:
-                    self.player_window.set_playlist(cached_items)
-                    logger.info(f"Playing {len(cached_items)} cached items")
+        # Cached playlist, unless boot already started playing it
+        if self.player_window and not self.player_window.playlist:
+            cached_items = self.playlist_manager.load_committed_playlist(Config.PLAYLIST_CACHE_FILE)
+            if cached_items:
+                self.player_window.set_playlist(cached_items)
+                logger.info(f"Playing {len(cached_items)} cached items")
         
         # Fetch fresh content in background
         # TODO: Uncomment when backend is ready
@@ -233,10 +475,8 @@ class MarketingDisplayApp:
         """Refresh content from backend"""
         logger.info("Refreshing content from backend")
         
-        # Start update thread
-        self.update_thread = ContentUpdateThread(action, message)
-        self.update_thread.playlist_ready.connect(self.on_playlist_ready)
-        self.update_thread.start()
+        # Single-flight: a request during a run is merged into one follow-up run
+        self.content_updater.refresh(action, message)
     
     def on_playlist_ready(self, playlist):
         """Called when playlist is downloaded and ready"""
@@ -246,15 +486,25 @@ class MarketingDisplayApp:
         if self.player_window:
             self.player_window.set_playlist(playlist)
         
-        # Save to cache
-        cache_file = os.path.join(Config.CACHE_DIR, 'playlist_cache.json')
-        self.playlist_manager.save_playlist_cache(cache_file)
+        # Commit as the boot manifest (the downloaded items, with their local paths)
+        self.playlist_manager.update_playlist(playlist)
+        self.playlist_manager.save_playlist_cache(Config.PLAYLIST_CACHE_FILE)
+    
+    def on_urgent_ready(self, item: dict):
+        """Called when an urgent item can go on air (possibly while still downloading)"""
+        if self.player_window:
+            self.player_window.play_urgent(item)
     
     def start_signalr(self, api_key: str = None):
         """Start SignalR client for real-time updates"""
         try:
+            from signalr_client import SignalRClient
+            
             # TODO: Add API key authentication when backend supports it
-            self.signalr_client = SignalRClient(on_playlist_updated=self.on_signalr_update)
+            self.signalr_client = SignalRClient(
+                on_playlist_updated=self.on_signalr_update,
+                on_override=self.on_signalr_override
+            )
             self.signalr_client.start()
             logger.info("SignalR client started")
         except Exception as e:
@@ -277,12 +527,36 @@ class MarketingDisplayApp:
             # Handle update action
             pass
     
-    def check_connectivity(self):
-        """Periodic internet connectivity check"""
-        if not check_internet_connection():
+    def on_signalr_override(self, message):
+        """Handle SignalR PlaybackOverride messages (SignalR thread)"""
+        if self.player_window:
+            # Queued signal: reaches the Qt thread immediately, without waiting on any refresh
+            self.player_window.override_requested.emit(message)
+    
+    def on_online_changed(self, online: bool):
+        """Debounced connectivity change from the monitor (Qt thread)"""
+        if self.pending_registration is not None:
+            self._proceed()
+        elif online and self.pending_sync is not None:
+            logger.info("Internet connection restored - starting content sync")
+            state, self.pending_sync = self.pending_sync, None
+            self.start_background_sync(state)
+        elif not online:
             logger.warning("Internet connection lost")
             # Could show reconnection UI here
             # For now, just log it
+        else:
+            logger.info("Internet connection restored")
+            self.upload_proof_of_play()
+            if self.playback_rollups:
+                self.playback_rollups.upload_pending()
+    
+    def upload_proof_of_play(self):
+        """Ship sealed proof-of-play batches if online (returns immediately)"""
+        if not self.proof_of_play or not self.connectivity.is_online():
+            return
+        if self.proof_of_play_upload is None or self.proof_of_play_upload.done():
+            self.proof_of_play_upload = async_runtime.submit(self.proof_of_play.upload_pending())
     
     def shutdown(self):
         """Cleanup and shutdown"""
@@ -292,21 +566,47 @@ class MarketingDisplayApp:
         if self.signalr_client:
             self.signalr_client.stop()
         
-        # Stop timers
-        self.internet_check_timer.stop()
+        # Stop connectivity probes and any content sync
+        self.connectivity.stop()
+        self.content_updater.cancel()
+        
+        # Write the final stall report
+        if self.stall_watchdog:
+            self.stall_watchdog.stop()
+        
+        # Write the final metrics snapshot
+        if Config.METRICS_ENABLED:
+            metrics.stop()
         
         # Close windows
         if self.player_window:
             self.player_window.close()
         if self.wifi_window:
             self.wifi_window.close()
+        
+        # After the player closed: its last item is in the journal too
+        if self.proof_of_play:
+            self.proof_of_play_timer.stop()
+            self.proof_of_play.stop()
+        if self.playback_rollups:
+            self.playback_rollups.stop()
+        
+        # Cancel pending network work and close the shared session
+        async_runtime.shutdown()
 
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description=Config.APP_NAME)
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print a per-phase startup timeline after the first frame, then exit')
+    args, _ = parser.parse_known_args()  # Leave Qt's own arguments alone
+    startup_profiler.mark('imports')
+    
     # Load environment first
     environment = os.getenv('ENVIRONMENT', 'development')
     load_environment(environment)
+    Config.ensure_directories()
     
     # Setup logging
     setup_logging(Config.LOG_FILE, Config.LOG_LEVEL)
@@ -318,14 +618,17 @@ def main():
     logger.info(f"Backend: {Config.BACKEND_API_URL}")
     logger.info(f"Platform: {'Raspberry Pi' if Config.IS_RASPBERRY_PI else 'Development'}")
     logger.info("="*60)
+    startup_profiler.mark('config')
     
     try:
         # Create and start application
-        app = MarketingDisplayApp()
+        app = MarketingDisplayApp(profile_startup=args.profile_startup)
+        startup_profiler.mark('qt init')
         exit_code = app.start()
         
         # Cleanup
         app.shutdown()
+        stop_logging()
         
         sys.exit(exit_code)
         
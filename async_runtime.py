@@ -0,0 +1,128 @@
+"""
+Async Runtime for Marketing Display Application
+One long-lived asyncio event loop on a service thread, shared by all network work
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Optional, Coroutine
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """
+    Persistent asyncio loop hosted on a dedicated thread
+
+    The Qt thread never runs or blocks on a loop: it submits coroutines and
+    gets results back through Qt signals emitted by the coroutine (queued
+    across threads) or through the returned future. Tasks keep running
+    between operations, and one HTTP session (connection pool, DNS cache)
+    is reused by every request.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.session = None  # aiohttp.ClientSession, created on first use
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the loop thread (idempotent)"""
+        with self.lock:
+            if self.thread is not None:
+                return
+
+            self.loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(started.set)
+                self.loop.run_forever()
+
+            self.thread = threading.Thread(target=run, name="async-runtime", daemon=True)
+            self.thread.start()
+            started.wait()
+            logger.info("Async runtime started")
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        Schedule a coroutine on the runtime loop (any thread)
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            concurrent.futures.Future with the coroutine's result
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def run(self, coro: Coroutine, timeout: float = None):
+        """
+        Run a coroutine on the runtime loop and wait for its result
+
+        Only for short work at startup; never call from the runtime thread.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Max seconds to wait
+
+        Returns:
+            The coroutine's result
+        """
+        return self.submit(coro).result(timeout)
+
+    async def get_session(self):
+        """
+        Get the shared HTTP session (runtime loop only)
+
+        Returns:
+            aiohttp session, created on first use
+        """
+        if self.session is None or self.session.closed:
+            import aiohttp  # Loaded with the first network request, not at startup
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    def shutdown(self, timeout: float = 5.0):
+        """Cancel pending tasks, close the session and stop the loop"""
+        with self.lock:
+            if self.thread is None:
+                return
+
+            async def _close():
+                tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if self.session is not None and not self.session.closed:
+                    await self.session.close()
+
+            try:
+                asyncio.run_coroutine_threadsafe(_close(), self.loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Async runtime shutdown incomplete: {e}")
+
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
+            if not self.thread.is_alive():
+                self.loop.close()
+            self.thread = None
+            self.loop = None
+            self.session = None
+            logger.info("Async runtime stopped")
+
+    @staticmethod
+    def _log_failure(future: Future):
+        """Log exceptions of fire-and-forget coroutines"""
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Async task failed: {future.exception()}")
+
+
+# Shared runtime: all network and timer work is scheduled on this loop
+async_runtime = AsyncRuntime()
@@ -0,0 +1,238 @@
+"""
+Playback Backend Benchmark for Marketing Display Application
+Plays the same playlist on each backend and compares open latency, transition gap, CPU and RSS
+
+Usage:
+    python3 benchmark_backends.py [--playlist test-playlist.json] [--backends vlc,qt] [--items 20]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from playback_backend import BACKENDS
+
+
+def read_memory_kb() -> dict:
+    """Read current and peak resident set size of this process"""
+    memory = {'rss_kb': 0, 'peak_rss_kb': 0}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    memory['rss_kb'] = int(line.split()[1])
+                elif line.startswith('VmHWM:'):
+                    memory['peak_rss_kb'] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+
+def load_playlist(playlist_file: str, image_duration: int = None) -> list:
+    """
+    Load a playlist file with paths resolved relative to it
+
+    Args:
+        playlist_file: JSON file with an 'items' list
+        image_duration: Override image durations (seconds) to shorten the run
+
+    Returns:
+        List of playlist items
+    """
+    with open(playlist_file, 'r') as f:
+        items = json.load(f).get('items', [])
+
+    base_dir = os.path.dirname(os.path.abspath(playlist_file))
+    for item in items:
+        if item.get('path') and not os.path.isabs(item['path']):
+            item['path'] = os.path.join(base_dir, item['path'])
+        if image_duration and item.get('type') == 'photo':
+            item['duration'] = image_duration
+    return items
+
+
+def summarize(values: list) -> dict:
+    """Get min / median / p95 / max of a list of milliseconds"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'min': round(ordered[0], 1),
+        'median': round(statistics.median(ordered), 1),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        'max': round(ordered[-1], 1),
+    }
+
+
+def run_backend(backend: str, playlist: list, items: int, timeout: int) -> dict:
+    """
+    Benchmark one backend in this process
+
+    Args:
+        backend: Backend name
+        playlist: Playlist items
+        items: Number of items to play
+        timeout: Give up after this many seconds
+
+    Returns:
+        Result dict
+    """
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    from media_player_app import MediaPlayerApp
+
+    app = QApplication(sys.argv)
+
+    class BenchmarkApp(MediaPlayerApp):
+        """MediaPlayerApp that timestamps every item start and finish"""
+
+        def __init__(self):
+            self.open_latencies = []
+            self.transition_gaps = []
+            self.rss_samples = []
+            self.errors = []
+            self.played = 0
+            self.requested_at = None
+            self.finished_at = None
+            super().__init__(playlist, backend=backend)
+            self.player_widget.media_started.connect(self.on_media_started)
+
+        def play_current(self):
+            if self.played >= items:
+                app.quit()
+                return
+            self.requested_at = time.perf_counter()
+            super().play_current()
+
+        def on_media_started(self):
+            now = time.perf_counter()
+            if self.requested_at is not None:
+                self.open_latencies.append((now - self.requested_at) * 1000)
+                self.requested_at = None
+            if self.finished_at is not None:
+                self.transition_gaps.append((now - self.finished_at) * 1000)
+                self.finished_at = None
+            self.rss_samples.append(read_memory_kb()['rss_kb'])
+            self.played += 1
+
+        def on_media_finished(self):
+            self.finished_at = time.perf_counter()
+            super().on_media_finished()
+
+        def on_media_error(self, error_msg: str):
+            self.errors.append(error_msg)
+            self.finished_at = None
+            super().on_media_error(error_msg)
+
+    window = BenchmarkApp()
+    window.showFullScreen()
+
+    QTimer.singleShot(timeout * 1000, app.quit)
+
+    wall_started = time.perf_counter()
+    cpu_started = os.times()
+    app.exec_()
+    cpu_ended = os.times()
+    wall_seconds = time.perf_counter() - wall_started
+
+    cpu_seconds = (
+        (cpu_ended.user - cpu_started.user) + (cpu_ended.system - cpu_started.system)
+        + (cpu_ended.children_user - cpu_started.children_user)
+        + (cpu_ended.children_system - cpu_started.children_system)
+    )
+    memory = read_memory_kb()
+
+    window.player_widget.cleanup()
+
+    return {
+        'backend': backend,
+        'items_played': window.played,
+        'errors': len(window.errors),
+        'open_latency_ms': summarize(window.open_latencies),
+        'transition_gap_ms': summarize(window.transition_gaps),
+        'cpu_percent': round(100 * cpu_seconds / wall_seconds, 1) if wall_seconds else 0.0,
+        'wall_seconds': round(wall_seconds, 1),
+        'rss_mb_median': round(statistics.median(window.rss_samples) / 1024, 1) if window.rss_samples else 0.0,
+        'peak_rss_mb': round(memory['peak_rss_kb'] / 1024, 1),
+    }
+
+
+def print_table(results: list):
+    """Print a side-by-side comparison"""
+    rows = [
+        ('items played', lambda r: r['items_played']),
+        ('errors', lambda r: r['errors']),
+        ('open latency median (ms)', lambda r: r['open_latency_ms'].get('median', '-')),
+        ('open latency p95 (ms)', lambda r: r['open_latency_ms'].get('p95', '-')),
+        ('transition gap median (ms)', lambda r: r['transition_gap_ms'].get('median', '-')),
+        ('transition gap p95 (ms)', lambda r: r['transition_gap_ms'].get('p95', '-')),
+        ('transition gap max (ms)', lambda r: r['transition_gap_ms'].get('max', '-')),
+        ('CPU (% of one core)', lambda r: r['cpu_percent']),
+        ('RSS median (MB)', lambda r: r['rss_mb_median']),
+        ('peak RSS (MB)', lambda r: r['peak_rss_mb']),
+    ]
+
+    print("\n" + "=" * 70)
+    print(f"{'':30}" + "".join(f"{r['backend']:>18}" for r in results))
+    print("-" * 70)
+    for label, getter in rows:
+        print(f"{label:30}" + "".join(f"{str(getter(r)):>18}" for r in results))
+    print("=" * 70 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare playback backends on the same playlist")
+    parser.add_argument('--playlist', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test-playlist.json'))
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--items', type=int, default=20, help='Items to play per backend')
+    parser.add_argument('--image-duration', type=int, default=2, help='Seconds per image (0 = playlist value)')
+    parser.add_argument('--timeout', type=int, default=600, help='Max seconds per backend')
+    parser.add_argument('--output', help='Also write results as JSON to this file')
+    parser.add_argument('--run', help=argparse.SUPPRESS)  # Internal: benchmark one backend in this process
+    args = parser.parse_args()
+
+    playlist = load_playlist(args.playlist, args.image_duration or None)
+
+    if args.run:
+        result = run_backend(args.run, playlist, args.items, args.timeout)
+        print(json.dumps(result))
+        return
+
+    # One fresh process per backend, so RSS and CPU are not shared between them
+    results = []
+    for backend in args.backends.split(','):
+        print(f"Benchmarking {backend}...")
+        command = [
+            sys.executable, os.path.abspath(__file__),
+            '--run', backend,
+            '--playlist', args.playlist,
+            '--items', str(args.items),
+            '--image-duration', str(args.image_duration),
+            '--timeout', str(args.timeout),
+        ]
+        process = subprocess.run(command, capture_output=True, text=True)
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not lines:
+            print(f"  {backend} failed: {process.stderr.strip()[-500:]}")
+            continue
+        results.append(json.loads(lines[-1]))
+
+    if not results:
+        sys.exit(1)
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,6 @@ Configuration settings for Marketing Display Application
 import os
 import platform
 from pathlib import Path
-from dotenv import load_dotenv
 
 
 def load_environment(mode: str = None):
@@ -19,6 +18,8 @@ def load_environment(mode: str = None):
     if mode is None:
         mode = os.getenv('ENVIRONMENT', 'development')
     
+    from dotenv import load_dotenv
+    
     # Load appropriate .env file
     base_dir = Path(__file__).parent
     env_file = base_dir / f'.env.{mode}'
@@ -43,12 +44,32 @@ def is_raspberry_pi():
         return False
 
 
+class LazySetting:
+    """
+    Config attribute computed on first access instead of at import
+    
+    The computed value replaces the descriptor on the class, so later reads
+    are plain attribute lookups.
+    """
+    
+    def __init__(self, compute):
+        self.compute = compute
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, owner):
+        value = self.compute(owner)
+        setattr(owner, self.name, value)
+        return value
+
+
 class Config:
     """Application configuration"""
     
     # Environment
     ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
-    IS_RASPBERRY_PI = is_raspberry_pi()
+    IS_RASPBERRY_PI = LazySetting(lambda cls: is_raspberry_pi())
     IS_DEVELOPMENT = ENVIRONMENT == 'development' or os.getenv('IS_DEVELOPMENT', 'false').lower() == 'true'
     
     # Device Configuration
@@ -66,10 +87,14 @@ class Config:
     
     # Registration & Polling
     REGISTRATION_POLL_INTERVAL = int(os.getenv('REGISTRATION_POLL_INTERVAL', '10'))
+    REGISTRATION_CHECK_TIMEOUT = 10  # seconds to wait for the stored registration at boot before retrying
+    REGISTRATION_CHECK_RETRY_DELAY = 30  # seconds between boot registration checks after a failure
     HEARTBEAT_INTERVAL = int(os.getenv('HEARTBEAT_INTERVAL', '30'))
     
     # Media Cache Configuration
     CACHE_DIR = os.path.expanduser('~/media-cache')
+    PINNED_CONTENT_DIR = os.path.expanduser('~/media-pinned')  # Local content for overrides (never cleaned)
+    PLAYLIST_CACHE_FILE = os.path.join(CACHE_DIR, 'playlist_cache.json')  # Last committed playlist (boot manifest)
     
     MAX_CACHE_SIZE_GB = 50  # Maximum cache size in GB
     CACHE_CLEANUP_THRESHOLD = 0.9  # Clean when 90% full
@@ -80,19 +105,43 @@ class Config:
     WINDOW_HEIGHT = 1080
     
     # Video Configuration
-    USE_HARDWARE_ACCEL = IS_RASPBERRY_PI
-    DEFAULT_VIDEO_OPTIONS = []
-    
-    if USE_HARDWARE_ACCEL:
+    PLAYBACK_BACKEND = os.getenv('PLAYBACK_BACKEND', 'vlc')  # 'vlc' (libVLC) or 'qt' (QtMultimedia)
+    USE_HARDWARE_ACCEL = LazySetting(lambda cls: cls.IS_RASPBERRY_PI)
+    DEFAULT_VIDEO_OPTIONS = LazySetting(
         # Raspberry Pi hardware acceleration
-        DEFAULT_VIDEO_OPTIONS = [
-            '--vout=mmal_vout',
-            '--codec=mmal',
-        ]
+        lambda cls: ['--vout=mmal_vout', '--codec=mmal'] if cls.USE_HARDWARE_ACCEL else []
+    )
+    VIDEO_WATCHDOG_INTERVAL = 5000  # milliseconds, fallback poll when VLC events are missed
+    VIDEO_PREROLL = os.getenv('VIDEO_PREROLL', 'true').lower() == 'true'  # Preroll next video on a second player
+    MEDIA_PARSE_TIMEOUT = 5000  # milliseconds, libVLC background pre-parse per file
+    VIDEO_LOOP_REPEAT = 65535  # libVLC input-repeat count for single-video loops (re-opened when exhausted)
+    
+    # Decode sandbox (libVLC in a supervised child process)
+    VIDEO_SANDBOX = os.getenv('VIDEO_SANDBOX', 'false').lower() == 'true'
+    VIDEO_SANDBOX_WARM_SPARE = True  # Keep a second initialized worker for instant restarts
+    VIDEO_SANDBOX_HEARTBEAT_INTERVAL = 500  # milliseconds between pings
+    VIDEO_SANDBOX_HEARTBEAT_TIMEOUT = 2000  # milliseconds without a pong before the worker is killed
+    VIDEO_SANDBOX_STARTUP_TIMEOUT = 10000  # milliseconds for a worker to initialize
+    VIDEO_SANDBOX_RESTART_BACKOFF = 2000  # milliseconds before retrying a worker that failed to start
+    
+    # Decode profile probing (runs once per device / libVLC version)
+    DECODE_PROBE_ENABLED = os.getenv('DECODE_PROBE_ENABLED', 'true').lower() == 'true'
+    DECODE_PROBE_CLIP = os.getenv('DECODE_PROBE_CLIP', os.path.join(os.path.dirname(__file__), 'test-media', 'dpp_is.mp4'))
+    DECODE_PROBE_SECONDS = 4  # Headless decode time per profile
+    DECODE_PROBE_RATE = 32.0  # libVLC's maximum rate: decoding is limited by the decoder, not the clock
+    DECODE_PROFILE_FILE = os.path.join(os.path.dirname(__file__), 'Config', 'decode_profile.json')
     
     # Image Configuration
     DEFAULT_IMAGE_DURATION = 10  # seconds
-    IMAGE_TRANSITION_DURATION = 500  # milliseconds
+    IMAGE_TRANSITION_DURATION = int(os.getenv('IMAGE_TRANSITION_DURATION', '500'))  # milliseconds (0 = hard cut)
+    IMAGE_TRANSITION_TYPE = os.getenv('IMAGE_TRANSITION_TYPE', 'crossfade')  # crossfade, slide or none
+    USE_GL_COMPOSITOR = os.getenv('USE_GL_COMPOSITOR', 'true').lower() == 'true'  # OpenGL image surface
+    ANIMATION_FRAME_BUFFER = 4  # Decoded frames held ahead for animated GIF/WebP
+    ANIMATION_DEFAULT_FRAME_DELAY = 100  # milliseconds, when the file has no delay
+    ANIMATION_MIN_FRAME_DELAY = 20  # milliseconds
+    
+    # Content Refresh
+    REFRESH_COALESCE_DELAY = 2  # seconds to wait after a run before the merged follow-up starts
     
     # Download Configuration
     DOWNLOAD_TIMEOUT = 300  # seconds (5 minutes)
@@ -100,21 +149,101 @@ class Config:
     DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB chunks
     MAX_CONCURRENT_DOWNLOADS = 3
     
+    # Progressive playback (urgent videos play while still downloading)
+    ENABLE_PROGRESSIVE_PLAYBACK = os.getenv('ENABLE_PROGRESSIVE_PLAYBACK', 'true').lower() == 'true'
+    PROGRESSIVE_PROBE_BYTES = 1024 * 1024  # Probe duration once this much is downloaded
+    PROGRESSIVE_MIN_BUFFER_SECONDS = 5  # Playback seconds buffered before starting
+    PROGRESSIVE_SAFETY_MARGIN = 0.2  # Download must finish 20% ahead of playback
+    PROGRESSIVE_STALL_TIMEOUT = 30  # seconds without progress before a stream is dropped
+    
+    # Video Normalization (post-download transcode with local ffmpeg)
+    ENABLE_VIDEO_NORMALIZATION = os.getenv('ENABLE_VIDEO_NORMALIZATION', 'true').lower() == 'true'
+    DECODE_ENVELOPE_CODECS = ['h264']  # Codecs this device decodes reliably
+    DECODE_ENVELOPE_PIX_FMTS = ['yuv420p', 'yuvj420p']  # 8-bit 4:2:0 only
+    DECODE_ENVELOPE_MAX_FPS = 60
+    NORMALIZE_VIDEO_CODEC = os.getenv('NORMALIZE_VIDEO_CODEC', 'libx264')
+    NORMALIZE_VIDEO_BITRATE = '8M'  # For hardware encoders (libx264 uses CRF)
+    NORMALIZE_TIMEOUT = 3600  # seconds per video
+    
+    # Poster frames (first frame shown while a video opens)
+    ENABLE_POSTER_FRAMES = os.getenv('ENABLE_POSTER_FRAMES', 'true').lower() == 'true'
+    POSTER_TIMEOUT = 60  # seconds per video
+    
     # SignalR Configuration
     SIGNALR_RECONNECT_INTERVAL = 5  # seconds
     SIGNALR_MAX_RECONNECT_ATTEMPTS = 10
     
     # Network Check Configuration
     INTERNET_CHECK_INTERVAL = 5  # seconds
-    INTERNET_CHECK_HOST = '8.8.8.8'
     INTERNET_CHECK_TIMEOUT = 2  # seconds
     
+    # Connectivity Monitor (probes the endpoints the app actually uses)
+    BLOB_STORAGE_URL = os.getenv('BLOB_STORAGE_URL', '')  # Media host, probed alongside the backend
+    CONNECTIVITY_EXTRA_TARGETS = os.getenv('CONNECTIVITY_EXTRA_TARGETS', '')  # Comma-separated URLs or host:port
+    CONNECTIVITY_ONLINE_THRESHOLD = 2  # Consecutive successful probes before going online
+    CONNECTIVITY_OFFLINE_THRESHOLD = 3  # Consecutive failed probes before going offline
+    
     # Logging Configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_DIR = os.path.join(os.path.dirname(CACHE_DIR), 'logs')
     LOG_FILE = os.path.join(LOG_DIR, 'marketing-display.log')
     LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT = 5
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # File format: 'json' (needs python-json-logger) or 'text'
+    LOG_FLUSH_INTERVAL = 5  # seconds; log file is written in batches, warnings and errors at once
+    LOG_FLUSH_BATCH = 100  # records
+    LOG_RATE_LIMIT_WINDOW = 60  # seconds
+    LOG_RATE_LIMIT_BURST = int(os.getenv('LOG_RATE_LIMIT_BURST', '10'))  # Records per call site per window below WARNING (0 = off)
+    
+    # Playback Quality Instrumentation
+    PLAYBACK_QUALITY_FILE = os.path.join(LOG_DIR, 'playback_quality.json')
+    PLAYBACK_QUALITY_SAVE_INTERVAL = 300  # seconds between summary writes
+    PLAYBACK_QUALITY_WARN_LOST_RATIO = 0.02  # Log a warning above 2% lost frames
+    
+    # UI Stall Watchdog (Qt event-loop latency and frozen-thread stacks)
+    STALL_WATCHDOG = os.getenv('STALL_WATCHDOG', 'true').lower() == 'true'
+    STALL_HEARTBEAT_INTERVAL = 100  # milliseconds between heartbeat ticks
+    STALL_THRESHOLD_MS = 250  # Qt thread silent this long counts as a stall
+    STALL_RESAMPLE_MS = 1000  # Capture the stack again every second while stalled
+    STALL_MAX_SAMPLES = 5  # Stack samples per stall
+    STALL_STACK_DEPTH = 30  # Innermost frames kept per sample
+    STALL_RECENT_COUNT = 20  # Recent stalls (with stacks) kept in the report
+    STALL_REPORT_FILE = os.path.join(LOG_DIR, 'ui_stalls.json')
+    STALL_REPORT_SAVE_INTERVAL = 300  # seconds between report writes
+    
+    # Boot Timing (process start to first frame on screen)
+    BOOT_FIRST_FRAME_BUDGET_MS = int(os.getenv('BOOT_FIRST_FRAME_BUDGET_MS', '3000'))
+    BOOT_TIMING_FILE = os.path.join(LOG_DIR, 'boot_timing.json')
+    STARTUP_PROFILE_FILE = os.path.join(LOG_DIR, 'startup_profile.json')  # Written by --profile-startup
+    STARTUP_PROFILE_TIMEOUT = 60  # seconds to wait for a first frame before reporting anyway
+    
+    # Proof of Play (per-item journal, uploaded in gzipped NDJSON batches)
+    PROOF_OF_PLAY = os.getenv('PROOF_OF_PLAY', 'true').lower() == 'true'
+    PROOF_OF_PLAY_DIR = os.path.join(os.path.dirname(CACHE_DIR), 'proof-of-play')
+    PROOF_OF_PLAY_ENDPOINT = f"{BACKEND_API_URL}/api/proof-of-play"
+    PROOF_OF_PLAY_FSYNC_BATCH = 20  # entries per fsync
+    PROOF_OF_PLAY_FSYNC_INTERVAL = 10  # seconds; unsynced entries are fsynced at least this often
+    PROOF_OF_PLAY_BATCH_ENTRIES = 1000  # entries per upload batch
+    PROOF_OF_PLAY_BATCH_MAX_AGE = 300  # seconds before a partly filled batch is sealed
+    PROOF_OF_PLAY_SPLIT_SECONDS = 300  # Items looping in place are recorded in parts this long
+    PROOF_OF_PLAY_MAX_DISK_BYTES = 50 * 1024 * 1024  # Backlog kept while offline; oldest batches dropped beyond
+    PROOF_OF_PLAY_UPLOAD_INTERVAL = 300  # seconds between upload attempts
+    PROOF_OF_PLAY_UPLOAD_TIMEOUT = 30  # seconds per batch
+    
+    # Playback Rollups (hourly per-item aggregates instead of individual play events)
+    PLAYBACK_ROLLUPS = os.getenv('PLAYBACK_ROLLUPS', 'true').lower() == 'true'
+    ROLLUP_ENDPOINT = f"{BACKEND_API_URL}/api/playback-rollups"
+    ROLLUP_HOURS = 72  # Hour slots kept in the ring buffer (covers three days offline)
+    ROLLUP_TICK_INTERVAL = 60  # seconds between on-screen time credits and upload checks
+    ROLLUP_UPLOAD_TIMEOUT = 30  # seconds
+    ROLLUP_STATE_FILE = os.path.join(os.path.dirname(CACHE_DIR), 'proof-of-play', 'rollups.json')
+    
+    # Metrics (Prometheus text on a local endpoint, plus a periodic snapshot file)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_BIND_ADDRESS = os.getenv('METRICS_BIND_ADDRESS', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '9464'))  # 0 = snapshot file only
+    METRICS_SNAPSHOT_FILE = os.path.join(LOG_DIR, 'metrics.json')
+    METRICS_SNAPSHOT_INTERVAL = 60  # seconds between snapshot writes
     
     # Application Configuration
     APP_NAME = "Marketing Display"
@@ -122,7 +251,7 @@ class Config:
     
     @classmethod
     def ensure_directories(cls):
-        """Create necessary directories if they don't exist"""
+        """Create necessary directories if they don't exist (called by entry points, not on import)"""
         os.makedirs(cls.CACHE_DIR, exist_ok=True)
         os.makedirs(cls.LOG_DIR, exist_ok=True)
     
@@ -152,7 +281,3 @@ class Config:
         print(f"Fullscreen: {cls.FULLSCREEN}")
         print(f"Hardware Acceleration: {cls.USE_HARDWARE_ACCEL}")
         print(f"{'='*60}\n")
-
-
-# Initialize directories on import
-Config.ensure_directories()
@@ -0,0 +1,179 @@
+"""
+Connectivity Monitor for Marketing Display Application
+Probes the backend and media endpoints without blocking the UI
+"""
+import time
+import asyncio
+import logging
+from typing import Optional, List
+from urllib.parse import urlparse
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from config import Config
+from async_runtime import async_runtime
+
+logger = logging.getLogger(__name__)
+
+
+def get_probe_targets() -> List[str]:
+    """
+    Get the endpoints whose reachability decides online/offline
+
+    Returns:
+        URLs (HTTP HEAD probe) and host:port entries (TCP connect probe)
+    """
+    targets = [Config.BACKEND_API_URL]
+    if Config.BLOB_STORAGE_URL:
+        targets.append(Config.BLOB_STORAGE_URL)
+    targets.extend(t.strip() for t in Config.CONNECTIVITY_EXTRA_TARGETS.split(',') if t.strip())
+    return targets
+
+
+async def probe_http(session, url: str, timeout: float) -> bool:
+    """
+    Check an HTTP endpoint with a HEAD request
+
+    Any answer below 500 counts: the server is reachable even if it rejects
+    a bare HEAD on that path.
+
+    Args:
+        session: aiohttp session
+        url: Endpoint URL
+        timeout: Seconds
+
+    Returns:
+        True if reachable
+    """
+    import aiohttp
+
+    try:
+        async with session.head(
+            url,
+            allow_redirects=False,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            return response.status < 500
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.debug(f"Probe failed for {url}: {e}")
+        return False
+
+
+async def probe_tcp(target: str, timeout: float) -> bool:
+    """
+    Check a host:port with a TCP connect
+
+    Args:
+        target: 'host:port'
+        timeout: Seconds
+
+    Returns:
+        True if the connection was accepted
+    """
+    host, _, port = target.rpartition(':')
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), timeout)
+        writer.close()
+        return True
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        logger.debug(f"Probe failed for {target}: {e}")
+        return False
+
+
+class ConnectivityMonitor(QObject):
+    """
+    Debounced online/offline state from periodic async probes
+
+    Probes run on the async runtime, so a slow or dead network never stalls
+    the Qt thread. The first result sets the state right away; after that it
+    takes several consecutive results the other way to flip it, so one lost
+    probe does not bounce the app between online and offline.
+    """
+
+    online_changed = pyqtSignal(bool)
+
+    # Probe result, emitted from the async runtime thread (queued)
+    _probed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.online: Optional[bool] = None  # Unknown until the first probe completes
+        self.successes = 0
+        self.failures = 0
+        self.last_change: Optional[float] = None
+        self.future = None
+
+        self._probed.connect(self._on_probe_result)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check_now)
+
+    def start(self):
+        """Probe now and then every INTERNET_CHECK_INTERVAL seconds"""
+        if not self.timer.isActive():
+            self.timer.start(Config.INTERNET_CHECK_INTERVAL * 1000)
+            self.check_now()
+
+    def stop(self):
+        """Stop probing"""
+        self.timer.stop()
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+
+    def check_now(self):
+        """Start a probe unless one is still in flight (returns immediately)"""
+        if self.future is None or self.future.done():
+            self.future = async_runtime.submit(self._probe())
+
+    def is_online(self) -> bool:
+        """Current debounced state (False while unknown)"""
+        return bool(self.online)
+
+    async def _probe(self):
+        """Probe all targets concurrently (async runtime thread)"""
+        targets = get_probe_targets()
+        timeout = Config.INTERNET_CHECK_TIMEOUT
+        session = await async_runtime.get_session()
+
+        probes = []
+        for target in targets:
+            if urlparse(target).scheme in ('http', 'https'):
+                probes.append(probe_http(session, target, timeout))
+            else:
+                probes.append(probe_tcp(target, timeout))
+
+        results = await asyncio.gather(*probes)
+        for target, reachable in zip(targets, results):
+            if not reachable:
+                logger.debug(f"Unreachable: {target}")
+
+        self._probed.emit(all(results))
+
+    def _on_probe_result(self, reachable: bool):
+        """Apply hysteresis to a probe result (Qt thread)"""
+        if reachable:
+            self.successes += 1
+            self.failures = 0
+        else:
+            self.failures += 1
+            self.successes = 0
+
+        if self.online is None:
+            self._set_online(reachable)
+        elif not self.online and self.successes >= Config.CONNECTIVITY_ONLINE_THRESHOLD:
+            self._set_online(True)
+        elif self.online and self.failures >= Config.CONNECTIVITY_OFFLINE_THRESHOLD:
+            self._set_online(False)
+
+    def _set_online(self, online: bool):
+        """Change state and notify"""
+        now = time.monotonic()
+        if self.last_change is not None:
+            logger.info(f"Connectivity: {'online' if online else 'offline'} "
+                        f"(after {now - self.last_change:.0f}s {'offline' if online else 'online'})")
+        else:
+            logger.info(f"Connectivity: {'online' if online else 'offline'}")
+        self.online = online
+        self.last_change = now
+        self.online_changed.emit(online)
@@ -0,0 +1,327 @@
+"""
+Decode Profile Selection for Marketing Display Application
+Probes hardware decode / video output profiles once and persists the fastest stable one
+"""
+import os
+import json
+import time
+import platform
+import logging
+import threading
+from typing import Optional, Dict, Any, List, Callable
+import vlc
+
+from config import Config
+from utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+# libVLC options shared by every profile
+BASE_VLC_ARGS = [
+    '--no-xlib',  # Don't use Xlib
+    '--quiet',  # Suppress console output
+    '--no-video-title-show',  # Don't show video title on screen
+    '--mouse-hide-timeout=0',  # Hide mouse immediately
+    '--no-osd',  # Disable on-screen display
+    '--no-snapshot-preview',  # No snapshot preview
+    '--no-sub-autodetect-file',  # No subtitle detection
+]
+
+# Fallback when probing is disabled or fails (the previous hardcoded setup)
+DEFAULT_PROFILE = {
+    'name': 'gl-hw-any',
+    'args': ['--avcodec-hw=any', '--vout=gl', '--codec=avcodec,all'],
+}
+
+
+def get_candidate_profiles() -> List[Dict[str, Any]]:
+    """
+    Get decoder / video output profiles to probe, in order of preference
+
+    Returns:
+        List of profiles with 'name' and 'args' keys
+    """
+    profiles = []
+
+    # Platform profile (mmal on Raspberry Pi)
+    if Config.DEFAULT_VIDEO_OPTIONS:
+        profiles.append({'name': 'platform', 'args': list(Config.DEFAULT_VIDEO_OPTIONS)})
+
+    profiles.extend([
+        {'name': 'gl-drm', 'args': ['--avcodec-hw=drm', '--vout=gl']},  # V4L2 stateless (Pi 5 HEVC)
+        DEFAULT_PROFILE,
+        {'name': 'gl-vaapi', 'args': ['--avcodec-hw=vaapi', '--vout=gl']},
+        {'name': 'gl-software', 'args': ['--avcodec-hw=none', '--vout=gl']},
+        {'name': 'xcb-software', 'args': ['--avcodec-hw=none', '--vout=xcb_x11']},
+    ])
+    return profiles
+
+
+def get_frame_rate(media) -> Optional[float]:
+    """Frame rate of a playing Media's video track, if libVLC reports it"""
+    try:
+        for track in media.tracks_get() or []:
+            if track.type == vlc.TrackType.video:
+                video = track.u.video.contents
+                if video.frame_rate_den:
+                    return video.frame_rate_num / video.frame_rate_den
+    except Exception as e:
+        logger.debug(f"Could not read frame rate: {e}")
+    return None
+
+
+def get_hardware_fingerprint() -> Dict[str, str]:
+    """Identify hardware and libVLC build, so a stored choice is re-probed when either changes"""
+    try:
+        with open('/proc/device-tree/model', 'r') as f:
+            model = f.read().strip('\x00\n ')
+    except Exception:
+        model = platform.machine()
+
+    try:
+        vlc_version = vlc.libvlc_get_version().decode()
+    except Exception:
+        vlc_version = 'unknown'
+
+    return {
+        'model': model,
+        'vlc_version': vlc_version,
+        'profiles': ','.join(profile['name'] for profile in get_candidate_profiles()),
+    }
+
+
+class DecodeProfileSelector:
+    """
+    Picks the libVLC decode profile for this device
+
+    Each candidate profile decodes a test clip headless (dummy video
+    output, no audio) at the maximum rate, so the decoder rather than the
+    clock sets the pace. A profile is stable if it decodes without errors
+    and at least as fast as the clip's frame rate; the one decoding the most
+    frames per wall-clock second wins. The choice is persisted together with
+    a hardware fingerprint. A profile whose video output fails to load later
+    is caught when the player creates its instance (see clear()).
+
+    Probing takes several seconds per profile and competes for the hardware
+    decoder, so it never runs on the Qt thread or during playback: without a
+    valid stored choice the player uses DEFAULT_PROFILE and probes on a
+    worker thread while it is still idle (e.g. a first boot waiting for its
+    content to download). The first item to play interrupts the probe and
+    nothing is stored; the next start tries again. The result applies from
+    the next start (libVLC options are fixed per instance).
+    """
+
+    def __init__(self, profile_file: str = None):
+        self.profile_file = profile_file or Config.DECODE_PROFILE_FILE
+        self.probe_thread: Optional[threading.Thread] = None
+        self.fingerprint: Optional[Dict[str, str]] = None
+        self.probe_needed = False
+
+    def get_profile(self) -> Dict[str, Any]:
+        """
+        Get the decode profile to use (returns immediately, never probes)
+
+        Returns:
+            Stored profile, or DEFAULT_PROFILE while no valid choice is stored
+        """
+        self.fingerprint = get_hardware_fingerprint()
+
+        stored = self.load_profile()
+        if stored and stored.get('fingerprint') == self.fingerprint:
+            logger.info(f"Using stored decode profile: {stored['profile']['name']}")
+            return stored['profile']
+
+        if not Config.DECODE_PROBE_ENABLED or not os.path.exists(Config.DECODE_PROBE_CLIP):
+            logger.info(f"Decode probing unavailable, using default profile: {DEFAULT_PROFILE['name']}")
+            return DEFAULT_PROFILE
+
+        logger.info(f"No stored decode profile, using default ({DEFAULT_PROFILE['name']}) until probed")
+        self.probe_needed = True
+        return DEFAULT_PROFILE
+
+    def probe_when_idle(self, is_busy: Callable[[], bool]):
+        """
+        Probe on a worker thread if a probe is still needed (returns immediately)
+
+        Args:
+            is_busy: Returns True once the player has media to show; the probe
+                stops at the next check and nothing is stored
+        """
+        if not self.probe_needed or is_busy():
+            return
+        if self.probe_thread is not None and self.probe_thread.is_alive():
+            return
+
+        def run():
+            profile, results = self.probe_all(is_busy)
+            if profile is None:
+                logger.info("Decode probe interrupted by playback, retrying when idle")
+                return
+            self.save_profile(profile, self.fingerprint, results)
+            self.probe_needed = False
+            logger.info(f"Decode profile '{profile['name']}' takes effect on the next start")
+
+        self.probe_thread = threading.Thread(target=run, name="decode-probe", daemon=True)
+        self.probe_thread.start()
+
+    def probe_all(self, is_busy: Callable[[], bool] = None):
+        """
+        Probe every candidate profile
+
+        Args:
+            is_busy: Checked while probing; True aborts
+
+        Returns:
+            Tuple of (best profile, list of probe results); profile is None if aborted
+        """
+        logger.info("Probing video decode profiles...")
+
+        results = []
+        best_profile = None
+        best_result = None
+
+        for profile in get_candidate_profiles():
+            if is_busy is not None and is_busy():
+                return None, results
+            result = self.probe_profile(profile, is_busy)
+            if result.get('aborted'):
+                return None, results
+            results.append(result)
+
+            if not result['stable']:
+                logger.info(f"  ✗ {profile['name']}: {result.get('error') or 'unstable'}")
+                continue
+
+            logger.info(f"  ✓ {profile['name']}: {result['decode_fps']:.1f} fps decoded")
+
+            # Fastest decoder wins; earlier (preferred) profiles win ties
+            if best_result is None or result['decode_fps'] > best_result['decode_fps'] * 1.05:
+                best_profile, best_result = profile, result
+
+        if best_profile is None:
+            logger.warning(f"No stable decode profile found, using default: {DEFAULT_PROFILE['name']}")
+            return DEFAULT_PROFILE, results
+
+        logger.info(f"Selected decode profile: {best_profile['name']}")
+        return best_profile, results
+
+    def probe_profile(self, profile: Dict[str, Any], is_busy: Callable[[], bool] = None) -> Dict[str, Any]:
+        """
+        Decode the test clip headless with one profile and measure its speed
+
+        Args:
+            profile: Profile to probe
+            is_busy: Checked while probing; True aborts
+
+        Returns:
+            Result dict with 'stable', 'decode_fps' (unthrottled decoded frames
+            per wall-clock second), 'clip_fps' and 'decoded_frames'
+            ('aborted' is set if playback started meanwhile)
+        """
+        result = {
+            'profile': profile['name'],
+            'stable': False,
+            'decode_fps': 0.0,
+            'clip_fps': None,
+            'decoded_frames': 0,
+            'error': None,
+        }
+
+        instance = None
+        player = None
+        try:
+            # Dummy video output last, so it overrides the profile's: nothing reaches the screen
+            instance = vlc.Instance(' '.join(BASE_VLC_ARGS + profile['args'] + ['--no-audio', '--vout=dummy']))
+            if instance is None:
+                result['error'] = 'instance creation failed'
+                return result
+
+            player = instance.media_player_new()
+            # Repeated, so the unthrottled run never runs out of clip
+            media = instance.media_new(Config.DECODE_PROBE_CLIP, 'input-repeat=65535')
+            player.set_media(media)
+            player.play()
+            player.set_rate(Config.DECODE_PROBE_RATE)
+
+            started = time.monotonic()
+            status = self._play_for(player, Config.DECODE_PROBE_SECONDS, is_busy)
+            elapsed = time.monotonic() - started
+            if status == 'busy':
+                result['aborted'] = True
+                return result
+            if status == 'error':
+                result['error'] = 'playback error'
+                return result
+
+            stats = vlc.MediaStats()
+            if not media.get_stats(stats):
+                result['error'] = 'no statistics'
+                return result
+
+            result['decoded_frames'] = stats.decoded_video
+            result['decode_fps'] = stats.decoded_video / elapsed if elapsed > 0 else 0.0
+            result['clip_fps'] = get_frame_rate(media)
+
+            # Must at least keep up with real time (unknown frame rate: any decoded frames)
+            required_fps = result['clip_fps'] or 0.0
+            result['stable'] = stats.decoded_video > 0 and result['decode_fps'] >= required_fps
+            if not result['stable']:
+                result['error'] = (f"{result['decode_fps']:.1f} fps, slower than real time"
+                                   if stats.decoded_video else 'no frames decoded')
+            return result
+
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+        finally:
+            if player is not None:
+                player.stop()
+                player.release()
+            if instance is not None:
+                instance.release()
+
+    @staticmethod
+    def _play_for(player, seconds: float, is_busy: Callable[[], bool] = None) -> str:
+        """
+        Let the probe play (probe thread)
+
+        Returns:
+            'ok', 'error' if playback failed, or 'busy' if the player needs the decoder
+        """
+        started = time.monotonic()
+        while time.monotonic() - started < seconds:
+            if is_busy is not None and is_busy():
+                return 'busy'
+            if player.get_state() in (vlc.State.Error, vlc.State.Ended):
+                break
+            time.sleep(0.1)
+        return 'error' if player.get_state() == vlc.State.Error else 'ok'
+
+    def load_profile(self) -> Optional[Dict[str, Any]]:
+        """Load the stored profile choice"""
+        try:
+            if os.path.exists(self.profile_file):
+                with open(self.profile_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load decode profile: {e}")
+        return None
+
+    def save_profile(self, profile: Dict[str, Any], fingerprint: Dict[str, str], results: list):
+        """Persist the profile choice with the probe results"""
+        try:
+            write_json_atomic(self.profile_file, {
+                'profile': profile,
+                'fingerprint': fingerprint,
+                'results': results,
+                'probed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }, indent=2)
+            logger.info(f"Saved decode profile: {profile['name']}")
+        except Exception as e:
+            logger.error(f"Failed to save decode profile: {e}")
+
+    def clear(self):
+        """Forget the stored choice so the next start probes again"""
+        if os.path.exists(self.profile_file):
+            os.remove(self.profile_file)
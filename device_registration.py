@@ -9,12 +9,12 @@ import asyncio
 import base64
 from typing import Optional, Dict, Any
 from datetime import datetime
-import aiohttp
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QPixmap
 
 from config import Config
+from async_runtime import async_runtime
 
 logger = logging.getLogger(__name__)
 
@@ -113,16 +113,16 @@ class DeviceRegistrationManager:
         
         logger.info(f"Requesting QR registration from {endpoint}")
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(endpoint, json=payload, headers=headers) as response:
-                if response.status not in [200, 201]:
-                    text = await response.text()
-                    raise Exception(f"Registration failed: {response.status} - {text}")
-                
-                data = await response.json()
-                logger.info(f"QR registration response: {data}")
-                logger.info(f"QR registration successful: GUID={data.get('assignedGuid')}")
-                return data
+        session = await async_runtime.get_session()
+        async with session.post(endpoint, json=payload, headers=headers) as response:
+            if response.status not in [200, 201]:
+                text = await response.text()
+                raise Exception(f"Registration failed: {response.status} - {text}")
+            
+            data = await response.json()
+            logger.info(f"QR registration response: {data}")
+            logger.info(f"QR registration successful: GUID={data.get('assignedGuid')}")
+            return data
     
     async def check_device_status(self, guid: str, access_token: str) -> Dict[str, Any]:
         """Poll device status from backend"""
@@ -135,14 +135,14 @@ class DeviceRegistrationManager:
             'Authorization': f'Bearer {access_token}'
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(endpoint, headers=headers) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    raise Exception(f"Status check failed: {response.status} - {text}")
-                
-                data = await response.json()
-                return data
+        session = await async_runtime.get_session()
+        async with session.get(endpoint, headers=headers) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise Exception(f"Status check failed: {response.status} - {text}")
+            
+            data = await response.json()
+            return data
     
     async def fetch_branch_info(self, api_key: str) -> Dict[str, Any]:
         """Fetch branch information from inventory API"""
@@ -157,16 +157,16 @@ class DeviceRegistrationManager:
         
         logger.info(f"Fetching branch info from {endpoint}")
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(endpoint, headers=headers) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    raise Exception(f"Branch fetch failed: {response.status} - {text}")
-                
-                data = await response.json()
-                # Extract the 'success' object if present
-                branch_data = data.get('success', data)
-                return branch_data
+        session = await async_runtime.get_session()
+        async with session.get(endpoint, headers=headers) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise Exception(f"Branch fetch failed: {response.status} - {text}")
+            
+            data = await response.json()
+            # Extract the 'success' object if present
+            branch_data = data.get('success', data)
+            return branch_data
     
     async def start_registration(self) -> RegistrationState:
         """Start the registration process"""
@@ -257,10 +257,23 @@ class RegistrationUI(QWidget):
     
     registration_complete = pyqtSignal(RegistrationState)
     
+    # Registration runs on the async runtime thread; widgets are only
+    # updated through these (queued) signals
+    status_text_changed = pyqtSignal(str)
+    status_changed = pyqtSignal(RegistrationState)
+    qr_received = pyqtSignal(str, str)  # QR image (base64), registration URL
+    activated = pyqtSignal(RegistrationState)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.manager = DeviceRegistrationManager()
+        self.registration_future = None
         self.init_ui()
+        
+        self.status_text_changed.connect(self.status_label.setText)
+        self.status_changed.connect(self.update_status)
+        self.qr_received.connect(self.show_registration_code)
+        self.activated.connect(self.on_activated)
     
     def init_ui(self):
         """Initialize UI"""
@@ -336,6 +349,15 @@ class RegistrationUI(QWidget):
             logger.error(f"Failed to display QR code: {e}")
             self.status_label.setText(f"❌ Error displaying QR code: {e}")
     
+    def show_registration_code(self, qr_base64: str, qr_url: str):
+        """Display QR code and the activation code from the registration URL"""
+        self.show_qr_code(qr_base64)
+        
+        # Extract and display last 8 characters from URL
+        if qr_url:
+            activation_code = qr_url.split('/')[-1]  # Get last part of URL
+            self.activation_code_label.setText(f"Code: {activation_code}")
+    
     def update_status(self, state: RegistrationState):
         """Update status message"""
         status_messages = {
@@ -352,8 +374,24 @@ class RegistrationUI(QWidget):
         
         self.status_label.setText(message)
     
+    def start(self):
+        """Start the registration flow on the async runtime (Qt thread)"""
+        if self.registration_future is None or self.registration_future.done():
+            self.registration_future = async_runtime.submit(self.start_registration_process())
+    
+    def stop(self):
+        """Cancel registration and activation polling"""
+        if self.registration_future is not None:
+            self.registration_future.cancel()
+            self.registration_future = None
+    
+    def closeEvent(self, event):
+        """Stop polling when the window closes"""
+        self.stop()
+        super().closeEvent(event)
+    
     async def start_registration_process(self):
-        """Start the full registration flow"""
+        """Start the full registration flow (async runtime thread)"""
         try:
             # Check if already registered
             existing = await self.manager.load_registration()
@@ -363,40 +401,39 @@ class RegistrationUI(QWidget):
                 return
             
             # Start new registration
-            self.status_label.setText("🔄 Requesting QR code...")
+            self.status_text_changed.emit("🔄 Requesting QR code...")
             state = await self.manager.start_registration()
             
-            # Display QR code
-            self.show_qr_code(state.qr_image)
-            
-            # Extract and display last 8 characters from URL
-            if state.qr_url:
-                activation_code = state.qr_url.split('/')[-1]  # Get last part of URL
-                self.activation_code_label.setText(f"Code: {activation_code}")
-            
-            self.update_status(state)
-            
-            # Start polling in background
-            asyncio.create_task(self._poll_for_activation(state))
+            # Display QR code and activation code
+            self.qr_received.emit(state.qr_image or '', state.qr_url or '')
+            self.status_changed.emit(state)
             
         except Exception as e:
             logger.error(f"Registration failed: {e}")
-            self.status_label.setText(f"❌ Registration failed: {e}")
+            self.status_text_changed.emit(f"❌ Registration failed: {e}")
+            return
+        
+        # Poll on the same persistent loop until activated
+        await self._poll_for_activation(state)
     
     async def _poll_for_activation(self, state: RegistrationState):
         """Background polling task"""
         try:
             activated_state = await self.manager.poll_until_activated(
                 state, 
-                callback=self.update_status
+                callback=self.status_changed.emit
             )
             
-            # Show success
-            self.update_status(activated_state)
-            
-            # Emit completion signal
-            QTimer.singleShot(2000, lambda: self.registration_complete.emit(activated_state))
+            self.activated.emit(activated_state)
             
+        except asyncio.CancelledError:
+            logger.info("Activation polling cancelled")
+            raise
         except Exception as e:
             logger.error(f"Polling failed: {e}")
-            self.status_label.setText(f"❌ Activation failed: {e}")
+            self.status_text_changed.emit(f"❌ Activation failed: {e}")
+    
+    def on_activated(self, state: RegistrationState):
+        """Show success, then report completion (Qt thread)"""
+        self.update_status(state)
+        QTimer.singleShot(2000, lambda: self.registration_complete.emit(state))
@@ -0,0 +1,202 @@
+"""
+Media Catalog for Marketing Display Application
+Pre-parses cached videos with libVLC and reuses Media objects across playlist loops
+"""
+import os
+import struct
+import logging
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+import vlc
+
+from config import Config
+from utils import is_video_file
+
+logger = logging.getLogger(__name__)
+
+
+class MediaEntry:
+    """libVLC Media objects and probed information for one video file"""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.mtime = os.path.getmtime(filepath) if os.path.exists(filepath) else None  # None for stream URLs
+        self.media: Optional[vlc.Media] = None  # Parsed by the preparser, never played
+        self.players: Dict[Tuple[int, bool, bool], vlc.Media] = {}  # (slot, paused, repeat) -> playback copy
+        self.parsed = threading.Event()
+        self.info: Optional[Dict[str, Any]] = None
+
+    def release(self):
+        """Release libVLC references"""
+        for media in [self.media, *self.players.values()]:
+            if media is not None:
+                media.release()
+        self.media = None
+        self.players.clear()
+
+
+class MediaCatalog:
+    """
+    Keeps one parsed libVLC Media per cached video
+
+    Videos are pre-parsed in the background by libVLC's preparser (local only,
+    no network lookups) as soon as the playlist is known, so duration,
+    resolution and codec are available before an item plays. Each player
+    slot gets its own copy of the parsed Media per variant (a Media must not
+    be open in two players at once, e.g. when both slots preroll the same
+    video), and that copy is reused on every loop of the playlist instead of
+    being re-created per play.
+    """
+
+    def __init__(self, vlc_instance: vlc.Instance, on_parsed=None):
+        """
+        Args:
+            vlc_instance: libVLC instance the Media objects belong to
+            on_parsed: Called with the file path once a video has been parsed
+                (preparser thread, so it must only hand off, e.g. emit a Qt signal)
+        """
+        self.vlc_instance = vlc_instance
+        self.on_parsed = on_parsed
+        self.entries: Dict[str, MediaEntry] = {}
+        self.lock = threading.Lock()
+
+    def prepare(self, filepaths: List[str]):
+        """
+        Start pre-parsing the given videos and drop entries no longer needed
+
+        Args:
+            filepaths: Media files of the current playlist (non-videos are ignored)
+        """
+        wanted = {path for path in filepaths if path and is_video_file(path) and os.path.exists(path)}
+
+        with self.lock:
+            for path in list(self.entries):
+                if path not in wanted:
+                    self.entries.pop(path).release()
+
+        for path in wanted:
+            self._get_entry(path)
+
+        logger.info(f"Media catalog: {len(wanted)} videos prepared")
+
+    def get_media(self, filepath: str, paused: bool = False, repeat: bool = False, slot: int = 0) -> vlc.Media:
+        """
+        Get the reusable Media for a video in one player slot
+
+        Args:
+            filepath: Path to video file
+            paused: Get the preroll variant (opens paused on the first frame)
+            repeat: Get the loop variant (libVLC repeats the input without closing the decoder)
+            slot: Index of the player slot that will open it
+
+        Returns:
+            libVLC Media object owned by the catalog
+        """
+        entry = self._get_entry(filepath)
+
+        key = (slot, paused, repeat)
+        with self.lock:
+            media = entry.players.get(key)
+            if media is None:
+                # A duplicate keeps what the preparser found
+                media = entry.players[key] = entry.media.duplicate()
+                if paused:
+                    media.add_option(':start-paused')
+                if repeat:
+                    media.add_option(f':input-repeat={Config.VIDEO_LOOP_REPEAT}')
+        return media
+
+    def get_info(self, filepath: str) -> Optional[Dict[str, Any]]:
+        """
+        Get probed information for a video
+
+        Args:
+            filepath: Path to video file
+
+        Returns:
+            Dict with 'duration' (seconds), 'width', 'height' and 'codec',
+            or None if the file has not been parsed (yet)
+        """
+        with self.lock:
+            entry = self.entries.get(filepath)
+
+        if entry is None or not entry.parsed.is_set():
+            return None
+
+        if entry.info is None:
+            entry.info = self._extract_info(entry.media)
+        return entry.info
+
+    def release(self):
+        """Release all Media objects"""
+        with self.lock:
+            for entry in self.entries.values():
+                entry.release()
+            self.entries.clear()
+
+    def _get_entry(self, filepath: str) -> MediaEntry:
+        """Get the catalog entry for a file, creating and parsing it if needed"""
+        with self.lock:
+            entry = self.entries.get(filepath)
+
+            # Re-create entries whose file was replaced on disk
+            if entry is not None and entry.mtime is not None and entry.mtime != os.path.getmtime(filepath):
+                self.entries.pop(filepath).release()
+                entry = None
+
+            if entry is None:
+                entry = MediaEntry(filepath)
+                entry.media = self.vlc_instance.media_new(filepath)
+                self.entries[filepath] = entry
+                self._start_parse(entry)
+
+        return entry
+
+    def _start_parse(self, entry: MediaEntry):
+        """Ask libVLC's preparser to probe the file asynchronously"""
+        try:
+            event_manager = entry.media.event_manager()
+            event_manager.event_attach(
+                vlc.EventType.MediaParsedChanged,
+                self._on_parsed,
+                entry
+            )
+            entry.media.parse_with_options(vlc.MediaParseFlag.local, Config.MEDIA_PARSE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to start parsing {os.path.basename(entry.filepath)}: {e}")
+
+    def _on_parsed(self, event, entry: MediaEntry):
+        """
+        libVLC callback (preparser thread)
+
+        Only flags the entry and notifies; information is read on the caller's thread.
+        """
+        entry.parsed.set()
+        if self.on_parsed is not None:
+            self.on_parsed(entry.filepath)
+
+    def _extract_info(self, media: vlc.Media) -> Dict[str, Any]:
+        """Read duration and video track information from a parsed Media"""
+        info = {
+            'duration': None,
+            'width': None,
+            'height': None,
+            'codec': None,
+        }
+
+        duration_ms = media.get_duration()
+        if duration_ms and duration_ms > 0:
+            info['duration'] = duration_ms / 1000.0
+
+        try:
+            for track in media.tracks_get() or []:
+                if track.type == vlc.TrackType.video:
+                    video = track.u.video.contents
+                    info['width'] = video.width
+                    info['height'] = video.height
+                    info['codec'] = struct.pack('<I', track.codec).decode('ascii', 'replace').strip()
+                    break
+        except Exception as e:
+            logger.debug(f"Could not read track info: {e}")
+
+        return info
@@ -3,6 +3,7 @@ Media Downloader for Marketing Display Application
 Handles downloading and caching media files from Azure Blob Storage
 """
 import os
+import time
 import asyncio
 import aiohttp
 import logging
@@ -10,26 +11,60 @@ from typing import Optional, Callable
 from urllib.parse import urlparse
 
 from config import Config
-from utils import get_url_filename, get_file_hash, format_bytes, sanitize_filename
+from utils import get_url_filename, get_file_hash, format_bytes, sanitize_filename, is_video_file
+from media_ingest import ingest_pipeline, probe_video
+from progressive_server import ProgressiveDownload, progressive_server
+from metrics import metrics, RATE_BUCKETS
 
 logger = logging.getLogger(__name__)
 
+download_bytes = metrics.counter('display_download_bytes_total', 'Media bytes received, including failed attempts')
+download_rate = metrics.histogram('display_download_rate_bytes_per_second', 'Throughput of completed downloads',
+                                  buckets=RATE_BUCKETS)
+download_retries = metrics.counter('display_download_retries_total', 'Download attempts after the first')
+downloads = metrics.counter('display_downloads_total', 'Media downloads by result')
+cache_lookups = metrics.counter('display_cache_lookups_total', 'Media cache lookups by result (hit/miss)')
+cache_hit_ratio = metrics.gauge('display_cache_hit_ratio', 'Share of media cache lookups that were hits')
+
+
+def get_cache_path(url: str) -> str:
+    """
+    Get local cache path for URL
+    
+    Args:
+        url: Media URL
+        
+    Returns:
+        Local cache path
+    """
+    filename = get_url_filename(url)
+    filename = sanitize_filename(filename)
+    return os.path.join(Config.CACHE_DIR, filename)
+
 
 class MediaDownloader:
     """Handles media file downloads with caching"""
     
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        """
+        Args:
+            session: Shared HTTP session to use (left open on exit); a private
+                one is created and closed otherwise
+        """
+        self.session: Optional[aiohttp.ClientSession] = session
+        self.owns_session = session is None
         self.download_progress_callback: Optional[Callable] = None
+        self.progressive_callback: Optional[Callable] = None  # Urgent item ready, 'path' set to a stream URL
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        if not self.session:
+            self.session = aiohttp.ClientSession()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
+        if self.session and self.owns_session:
             await self.session.close()
     
     def get_cached_path(self, url: str) -> str:
@@ -42,9 +77,7 @@ class MediaDownloader:
         Returns:
             Local cache path
         """
-        filename = get_url_filename(url)
-        filename = sanitize_filename(filename)
-        return os.path.join(Config.CACHE_DIR, filename)
+        return get_cache_path(url)
     
     def is_cached(self, url: str) -> bool:
         """
@@ -59,23 +92,42 @@ class MediaDownloader:
         cache_path = self.get_cached_path(url)
         return os.path.exists(cache_path) and os.path.getsize(cache_path) > 0
     
-    async def download_media(self, url: str, force_download: bool = False) -> Optional[str]:
+    @staticmethod
+    def record_cache_lookup(hit: bool):
+        """Count a cache lookup and update the hit ratio"""
+        cache_lookups.inc(result='hit' if hit else 'miss')
+        hits = cache_lookups.get(result='hit')
+        total = hits + cache_lookups.get(result='miss')
+        cache_hit_ratio.set(round(hits / total, 4))
+    
+    async def download_media(self, url: str, force_download: bool = False,
+                             on_playable: Optional[Callable] = None) -> Optional[str]:
         """
         Download media file from URL
         
         Args:
             url: Media URL to download
             force_download: Force re-download even if cached
+            on_playable: Called with a local stream URL as soon as enough of a
+                video is buffered to play it while the download continues
+                (or with the cache path if it completed first or was already cached)
             
         Returns:
             Local path to downloaded file or None if failed
         """
         cache_path = self.get_cached_path(url)
+        part_path = f"{cache_path}.part"
         
         # Return cached file if exists and not forcing download
-        if self.is_cached(url) and not force_download:
-            logger.info(f"Using cached file: {os.path.basename(cache_path)}")
-            return cache_path
+        if not force_download:
+            cached = self.is_cached(url)
+            self.record_cache_lookup(cached)
+            if cached:
+                logger.info(f"Using cached file: {os.path.basename(cache_path)}")
+                ingest_pipeline.submit(cache_path)
+                if on_playable:
+                    on_playable(cache_path)
+                return cache_path
         
         # Ensure session exists
         if not self.session:
@@ -85,6 +137,8 @@ class MediaDownloader:
         
         # Try download with retries
         for attempt in range(Config.MAX_DOWNLOAD_RETRIES):
+            if attempt > 0:
+                download_retries.inc()
             try:
                 async with self.session.get(
                     url,
@@ -101,17 +155,61 @@ class MediaDownloader:
                         # Download in chunks
                         os.makedirs(os.path.dirname(cache_path), exist_ok=True)
                         
-                        with open(cache_path, 'wb') as f:
-                            async for chunk in response.content.iter_chunked(Config.DOWNLOAD_CHUNK_SIZE):
-                                f.write(chunk)
-                                downloaded_size += len(chunk)
-                                
-                                # Progress callback
-                                if self.download_progress_callback and total_size > 0:
-                                    progress = (downloaded_size / total_size) * 100
-                                    self.download_progress_callback(url, progress)
+                        # Stream-while-downloading needs a known size to serve byte ranges
+                        progressive = None
+                        if (on_playable and Config.ENABLE_PROGRESSIVE_PLAYBACK
+                                and total_size > 0 and is_video_file(cache_path)):
+                            progressive = ProgressiveDownload(url, part_path, cache_path, total_size)
+                        notified = False
+                        started = time.monotonic()
+                        
+                        try:
+                            # Written to a .part file, so is_cached() never sees a partial download
+                            with open(part_path, 'wb') as f:
+                                async for chunk in response.content.iter_chunked(Config.DOWNLOAD_CHUNK_SIZE):
+                                    f.write(chunk)
+                                    downloaded_size += len(chunk)
+                                    
+                                    # Progress callback
+                                    if self.download_progress_callback and total_size > 0:
+                                        progress = (downloaded_size / total_size) * 100
+                                        self.download_progress_callback(url, progress)
+                                    
+                                    if progressive:
+                                        f.flush()
+                                        progressive.update(downloaded_size)
+                                        if not notified and await self._check_playable(progressive):
+                                            notified = True
+                                            logger.info(
+                                                f"Progressive playback ready at {format_bytes(downloaded_size)}"
+                                                f"/{format_bytes(total_size)}: {os.path.basename(cache_path)}"
+                                            )
+                                            on_playable(progressive_server.register(progressive))
+                            
+                            os.replace(part_path, cache_path)
+                        except BaseException:
+                            if progressive:
+                                progressive.finish(failed=True)
+                            raise
+                        finally:
+                            download_bytes.inc(downloaded_size)
+                        
+                        if progressive:
+                            progressive.finish()
+                        
+                        elapsed = time.monotonic() - started
+                        if elapsed > 0:
+                            download_rate.observe(downloaded_size / elapsed)
+                        downloads.inc(result='ok')
                         
                         logger.info(f"Downloaded successfully: {os.path.basename(cache_path)}")
+                        
+                        # Urgent item that never became playable early still goes on air now
+                        if on_playable and not notified:
+                            on_playable(cache_path)
+                        
+                        # Normalize in the background if this device can't decode it well
+                        ingest_pipeline.submit(cache_path)
                         return cache_path
                     
                     else:
@@ -127,8 +225,26 @@ class MediaDownloader:
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
         
         logger.error(f"Failed to download after {Config.MAX_DOWNLOAD_RETRIES} attempts: {url}")
+        downloads.inc(result='failed')
         return None
     
+    async def _check_playable(self, download: ProgressiveDownload) -> bool:
+        """
+        Check if a download in progress can start playing
+        
+        The duration is probed once from the partial file; files with their
+        index at the end can't be probed early and wait for the full download.
+        """
+        if not download.probed and download.written >= Config.PROGRESSIVE_PROBE_BYTES:
+            download.probed = True
+            info = await asyncio.get_event_loop().run_in_executor(None, probe_video, download.part_path)
+            if info and info['duration'] > 0:
+                download.duration = info['duration']
+            else:
+                logger.info(f"Duration not readable from partial file: {os.path.basename(download.final_path)}")
+        
+        return download.is_playable()
+    
     async def download_playlist(self, items: list) -> list:
         """
         Download all media from playlist
@@ -149,14 +265,25 @@ class MediaDownloader:
         semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_DOWNLOADS)
         
         async def download_item(item):
-            async with semaphore:
-                url = item.get('url')
-                if url:
-                    path = await self.download_media(url)
-                    if path:
-                        item['path'] = path
-                        return item
+            url = item.get('url')
+            if not url:
                 return None
+            
+            # Urgent items skip the queue and go on air as soon as they can play
+            # (right away if already cached, else possibly before they finish)
+            if item.get('urgent'):
+                on_playable = None
+                if self.progressive_callback:
+                    on_playable = lambda path, item=item: self.progressive_callback({**item, 'path': path})
+                path = await self.download_media(url, on_playable=on_playable)
+            else:
+                async with semaphore:
+                    path = await self.download_media(url)
+            
+            if path:
+                item['path'] = path
+                return item
+            return None
         
         # Download all items
         tasks = [download_item(item) for item in items]
@@ -191,7 +318,9 @@ class MediaDownloader:
         
         try:
             for filename in os.listdir(Config.CACHE_DIR):
-                if filename not in keep_basenames:
+                # Keep derived files (e.g. '<name>.svg.1920x1080.png') with their source
+                is_derived = any(filename.startswith(f"{name}.") for name in keep_basenames)
+                if filename not in keep_basenames and not is_derived:
                     filepath = os.path.join(Config.CACHE_DIR, filename)
                     if os.path.isfile(filepath):
                         file_size = os.path.getsize(filepath)
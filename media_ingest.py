@@ -0,0 +1,426 @@
+"""
+Media Ingest Pipeline for Marketing Display Application
+Post-download processing of cached media (poster frames, video normalization) in the background
+"""
+import os
+import json
+import queue
+import shutil
+import logging
+import threading
+import subprocess
+from typing import Optional, Dict, Any
+
+from config import Config
+from utils import is_video_file
+
+logger = logging.getLogger(__name__)
+
+
+NORMALIZED_SUFFIX = '.normalized.mp4'
+POSTER_SUFFIX = '.poster.jpg'
+
+
+def get_normalized_path(filepath: str) -> str:
+    """
+    Get the path of the display-native copy of a video
+
+    Args:
+        filepath: Path to original video
+
+    Returns:
+        Path of the normalized copy ('<name>.normalized.mp4', next to the original)
+    """
+    return f"{filepath}{NORMALIZED_SUFFIX}"
+
+
+def get_poster_path(filepath: str) -> str:
+    """
+    Get the path of a video's poster frame
+
+    Args:
+        filepath: Path to original or normalized video
+
+    Returns:
+        Path of the poster ('<original>.poster.jpg'; a normalized copy shares its original's poster)
+    """
+    if filepath.endswith(NORMALIZED_SUFFIX):
+        filepath = filepath[:-len(NORMALIZED_SUFFIX)]
+    return f"{filepath}{POSTER_SUFFIX}"
+
+
+def run_low_priority(command: list, timeout: float) -> subprocess.CompletedProcess:
+    """
+    Run a command at the lowest CPU and I/O priority so playback is never starved
+
+    The priorities are set through 'nice' / 'ionice' argv prefixes rather
+    than preexec_fn, which is unsafe in a threaded process.
+
+    Args:
+        command: Command and arguments
+        timeout: Max seconds (raises subprocess.TimeoutExpired)
+
+    Returns:
+        Completed process with text stdout/stderr
+    """
+    if shutil.which('ionice'):
+        command = ['ionice', '-c', '3'] + command
+    if shutil.which('nice'):
+        command = ['nice', '-n', '19'] + command
+    return subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+
+
+def probe_video(filepath: str) -> Optional[Dict[str, Any]]:
+    """
+    Probe the first video stream of a file with ffprobe
+
+    Args:
+        filepath: Path to video file
+
+    Returns:
+        Dict with 'codec', 'width', 'height', 'pix_fmt', 'fps' and 'duration', or None if probing failed
+    """
+    try:
+        result = subprocess.run(
+            [
+                'ffprobe', '-v', 'error',
+                '-select_streams', 'v:0',
+                '-show_entries', 'stream=codec_name,width,height,pix_fmt,avg_frame_rate:format=duration',
+                '-of', 'json',
+                filepath
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        if result.returncode != 0:
+            logger.warning(f"ffprobe failed for {os.path.basename(filepath)}: {result.stderr.strip()}")
+            return None
+
+        data = json.loads(result.stdout)
+        streams = data.get('streams') or []
+        if not streams:
+            return None
+        stream = streams[0]
+
+        fps = 0.0
+        rate = stream.get('avg_frame_rate', '0/0')
+        if '/' in rate:
+            num, den = rate.split('/', 1)
+            if float(den):
+                fps = float(num) / float(den)
+
+        return {
+            'codec': stream.get('codec_name'),
+            'width': int(stream.get('width') or 0),
+            'height': int(stream.get('height') or 0),
+            'pix_fmt': stream.get('pix_fmt'),
+            'fps': fps,
+            'duration': float(data.get('format', {}).get('duration') or 0),
+        }
+    except Exception as e:
+        logger.error(f"Error probing video: {e}")
+        return None
+
+
+def exceeds_decode_envelope(info: Dict[str, Any]) -> bool:
+    """
+    Check if a video is outside what this device decodes reliably
+
+    Args:
+        info: Probe result from probe_video()
+
+    Returns:
+        True if the video should be normalized
+    """
+    if info['codec'] not in Config.DECODE_ENVELOPE_CODECS:
+        return True
+    if info['width'] > Config.WINDOW_WIDTH or info['height'] > Config.WINDOW_HEIGHT:
+        return True
+    if info['pix_fmt'] not in Config.DECODE_ENVELOPE_PIX_FMTS:
+        return True  # e.g. 10-bit
+    if info['fps'] > Config.DECODE_ENVELOPE_MAX_FPS:
+        return True
+    return False
+
+
+class MediaIngestPipeline:
+    """
+    Background worker for post-download media processing
+
+    Downloads hand finished files to submit(); a single low-priority worker
+    thread extracts a first-frame poster of each video, then probes it and,
+    if it is outside the device's decode envelope, transcodes it with a local
+    ffmpeg to the screen resolution and a hardware-friendly codec. The
+    original file is never modified and stays the fallback; the player picks
+    up the normalized copy through resolve_playback_path() and the poster
+    through get_poster() once they exist.
+    """
+
+    def __init__(self):
+        self.jobs: queue.Queue = queue.Queue()
+        self.pending = set()
+        self.rejected = set()  # Normalized copies that failed to play this session
+        self.checked = set()  # Originals already inside the envelope (not probed again)
+        self.failed = set()  # Originals whose transcode failed or timed out (not retried this session)
+        self.lock = threading.Lock()
+        self.worker: Optional[threading.Thread] = None
+
+    def submit(self, filepath: str):
+        """
+        Queue a downloaded file for ingest processing
+
+        Args:
+            filepath: Path to cached media file
+        """
+        if not (Config.ENABLE_POSTER_FRAMES or Config.ENABLE_VIDEO_NORMALIZATION) or not is_video_file(filepath):
+            return
+
+        # Poster and normalized copy are independent: either may still be needed
+        if not self._needs_processing(filepath):
+            return
+
+        with self.lock:
+            if filepath in self.pending:
+                return
+            self.pending.add(filepath)
+
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, name="media-ingest", daemon=True)
+                self.worker.start()
+
+        self.jobs.put(filepath)
+
+    def resolve_playback_path(self, filepath: str) -> str:
+        """
+        Get the file the player should open for a cached media file
+
+        Args:
+            filepath: Path to original media file
+
+        Returns:
+            Normalized copy if ready and usable, otherwise the original
+        """
+        if not filepath or not is_video_file(filepath):
+            return filepath
+
+        normalized = get_normalized_path(filepath)
+        if normalized in self.rejected or not self._is_normalized(filepath):
+            return filepath
+        return normalized
+
+    def get_poster(self, filepath: str) -> Optional[str]:
+        """
+        Get the poster frame for a video
+
+        Args:
+            filepath: Path to original or normalized video
+
+        Returns:
+            Path to the poster image, or None if not extracted (yet)
+        """
+        if not Config.ENABLE_POSTER_FRAMES or not filepath:
+            return None
+
+        poster_path = get_poster_path(filepath)
+        source_path = poster_path[:-len(POSTER_SUFFIX)]
+        try:
+            if os.path.getmtime(poster_path) >= os.path.getmtime(source_path):
+                return poster_path
+        except OSError:
+            pass
+        return None
+
+    def reject(self, playback_path: str) -> bool:
+        """
+        Stop using a normalized copy after it failed to play
+
+        Args:
+            playback_path: Path that failed
+
+        Returns:
+            True if it was a normalized copy (the original will be used instead)
+        """
+        if playback_path and playback_path.endswith(NORMALIZED_SUFFIX):
+            logger.warning(f"Normalized copy failed, falling back to original: {os.path.basename(playback_path)}")
+            self.rejected.add(playback_path)
+            return True
+        return False
+
+    def _is_normalized(self, filepath: str) -> bool:
+        """Check if a normalized copy exists and is not older than the original"""
+        try:
+            return os.path.getmtime(get_normalized_path(filepath)) >= os.path.getmtime(filepath)
+        except OSError:
+            return False
+
+    def _mark_failed(self, filepath: str):
+        """Keep playing the original; later playlist refreshes don't queue the transcode again"""
+        with self.lock:
+            self.failed.add(filepath)
+
+    def _needs_poster(self, filepath: str) -> bool:
+        """Check if a poster should be extracted"""
+        return Config.ENABLE_POSTER_FRAMES and self.get_poster(filepath) is None
+
+    def _needs_normalization_check(self, filepath: str) -> bool:
+        """Check if a video still has to be probed / normalized"""
+        return (
+            Config.ENABLE_VIDEO_NORMALIZATION
+            and filepath not in self.checked
+            and filepath not in self.failed
+            and not self._is_normalized(filepath)
+        )
+
+    def _needs_processing(self, filepath: str) -> bool:
+        """Check if any ingest stage is outstanding for a video"""
+        return self._needs_poster(filepath) or self._needs_normalization_check(filepath)
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            filepath = self.jobs.get()
+            try:
+                # Posters first: cheap, and they help every cold video start
+                if self._needs_poster(filepath):
+                    self.extract_poster(filepath)
+                if self._needs_normalization_check(filepath):
+                    self.normalize_video(filepath)
+            except Exception as e:
+                logger.error(f"Ingest failed for {os.path.basename(filepath)}: {e}")
+            finally:
+                with self.lock:
+                    self.pending.discard(filepath)
+                self.jobs.task_done()
+
+    def extract_poster(self, filepath: str) -> Optional[str]:
+        """
+        Extract the first frame of a video as a JPEG poster
+
+        The poster is scaled to fit the screen (not cropped), matching how
+        the video itself is displayed.
+
+        Args:
+            filepath: Path to original video
+
+        Returns:
+            Path to poster, or None if failed
+        """
+        if not shutil.which('ffmpeg'):
+            logger.debug("ffmpeg not available, skipping poster extraction")
+            return None
+
+        output_path = get_poster_path(filepath)
+        temp_path = f"{output_path}.tmp"
+
+        command = [
+            'ffmpeg', '-nostdin', '-y', '-loglevel', 'error',
+            '-i', filepath,
+            '-map', '0:v:0', '-frames:v', '1',
+            '-vf', f"scale='min({Config.WINDOW_WIDTH},iw)':'min({Config.WINDOW_HEIGHT},ih)':force_original_aspect_ratio=decrease",
+            '-q:v', '2',
+            '-f', 'image2', temp_path
+        ]
+
+        try:
+            result = run_low_priority(command, Config.POSTER_TIMEOUT)
+            if result.returncode != 0 or not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+                logger.warning(f"Poster extraction failed for {os.path.basename(filepath)}: {result.stderr.strip()}")
+                return None
+
+            os.replace(temp_path, output_path)
+            logger.info(f"Poster frame ready: {os.path.basename(output_path)}")
+            return output_path
+
+        except subprocess.TimeoutExpired:
+            logger.error(f"Poster extraction timed out for {os.path.basename(filepath)}")
+            return None
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def normalize_video(self, filepath: str) -> Optional[str]:
+        """
+        Transcode a video to the display-native profile if it exceeds the decode envelope
+
+        Args:
+            filepath: Path to original video
+
+        Returns:
+            Path to normalized copy, or None if not needed / failed
+        """
+        if not shutil.which('ffmpeg') or not shutil.which('ffprobe'):
+            logger.debug("ffmpeg not available, skipping video normalization")
+            return None
+
+        info = probe_video(filepath)
+        if info is None:
+            return None
+        if not exceeds_decode_envelope(info):
+            with self.lock:
+                self.checked.add(filepath)
+            return None
+
+        output_path = get_normalized_path(filepath)
+        temp_path = f"{output_path}.tmp"
+
+        logger.info(
+            f"Normalizing {os.path.basename(filepath)} "
+            f"({info['codec']} {info['width']}x{info['height']} {info['pix_fmt']} {info['fps']:.0f}fps)"
+        )
+
+        filters = [
+            # Even dimensions: libx264 rejects odd widths/heights with yuv420p
+            f"scale='min({Config.WINDOW_WIDTH},iw)':'min({Config.WINDOW_HEIGHT},ih)'"
+            f":force_original_aspect_ratio=decrease:force_divisible_by=2",
+            'format=yuv420p',
+        ]
+        if info['fps'] > Config.DECODE_ENVELOPE_MAX_FPS:
+            filters.append(f"fps={Config.DECODE_ENVELOPE_MAX_FPS}")
+
+        command = [
+            'ffmpeg', '-nostdin', '-y', '-loglevel', 'error',
+            '-i', filepath,
+            '-map', '0:v:0', '-map', '0:a:0?',
+            '-vf', ','.join(filters),
+            '-c:v', Config.NORMALIZE_VIDEO_CODEC,
+        ]
+        if Config.NORMALIZE_VIDEO_CODEC == 'libx264':
+            command += ['-preset', 'veryfast', '-crf', '20', '-profile:v', 'high', '-level', '4.1']
+        else:
+            command += ['-b:v', Config.NORMALIZE_VIDEO_BITRATE]
+        command += [
+            '-c:a', 'aac', '-b:a', '128k',
+            '-movflags', '+faststart',
+            '-f', 'mp4', temp_path
+        ]
+
+        try:
+            result = run_low_priority(command, Config.NORMALIZE_TIMEOUT)
+            if result.returncode != 0:
+                logger.error(f"Normalization failed for {os.path.basename(filepath)}: {result.stderr.strip()}")
+                self._mark_failed(filepath)
+                return None
+
+            # Sanity check before the player is allowed to pick it up
+            normalized_info = probe_video(temp_path)
+            if normalized_info is None or normalized_info['duration'] < info['duration'] * 0.95:
+                logger.error(f"Normalized output invalid for {os.path.basename(filepath)}")
+                self._mark_failed(filepath)
+                return None
+
+            os.replace(temp_path, output_path)
+            logger.info(f"Normalized video ready: {os.path.basename(output_path)}")
+            return output_path
+
+        except subprocess.TimeoutExpired:
+            logger.error(f"Normalization timed out for {os.path.basename(filepath)}")
+            self._mark_failed(filepath)
+            return None
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+# Shared pipeline: downloads from every content update feed the same worker
+ingest_pipeline = MediaIngestPipeline()
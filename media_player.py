@@ -13,21 +13,27 @@ from PyQt5.QtCore import QUrl
 
 from config import Config
 from utils import is_video_file, is_image_file
+from playback_backend import PlaybackBackend, PlaybackBackendMeta
+from progressive_server import is_stream_url
 
 logger = logging.getLogger(__name__)
 
 
-class MediaPlayerWidget(QWidget):
-    """Widget for displaying photos and videos"""
+class MediaPlayerWidget(QWidget, PlaybackBackend, metaclass=PlaybackBackendMeta):
+    """Widget for displaying photos and videos using QtMultimedia"""
     
     # Signals
+    media_started = pyqtSignal()  # Emitted when new media is on screen
     media_finished = pyqtSignal()  # Emitted when current media finishes
     media_error = pyqtSignal(str)  # Emitted on playback error
+    media_info_ready = pyqtSignal(str)  # Duration of the current video became known
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_media_path = None
         self.current_media_type = None
+        self.looping = False  # Current item repeats in place (single-item playlist)
+        self.image_duration = Config.DEFAULT_IMAGE_DURATION
         self.init_ui()
     
     def init_ui(self):
@@ -57,6 +63,7 @@ class MediaPlayerWidget(QWidget):
         self.media_player.stateChanged.connect(self.on_state_changed)
         self.media_player.mediaStatusChanged.connect(self.on_media_status_changed)
         self.media_player.error.connect(self.on_player_error)
+        self.media_player.durationChanged.connect(self.on_duration_changed)
         
         # Timer for image duration
         self.image_timer = QTimer()
@@ -65,36 +72,45 @@ class MediaPlayerWidget(QWidget):
         
         self.setLayout(layout)
     
-    def play_media(self, filepath: str, duration: int = None):
+    def play_media(self, filepath: str, duration: int = None, loop: bool = False, start_at: float = 0.0):
         """
         Play media file (video or image)
         
         Args:
             filepath: Path to media file
             duration: Duration in seconds (for images only)
+            loop: Repeat this item in place until other media is played
+            start_at: Start position in seconds (for videos only)
         """
-        if not os.path.exists(filepath):
+        if not os.path.exists(filepath) and not is_stream_url(filepath):
             error_msg = f"Media file not found: {filepath}"
             logger.error(error_msg)
             self.media_error.emit(error_msg)
             return
         
+        # Same single item again (e.g. playlist refresh): keep it running untouched
+        if loop and self.looping and filepath == self.current_media_path:
+            self.image_duration = duration or Config.DEFAULT_IMAGE_DURATION
+            return
+        
         logger.info(f"Playing media: {os.path.basename(filepath)}")
         
         self.current_media_path = filepath
+        self.looping = loop
+        self.image_duration = duration or Config.DEFAULT_IMAGE_DURATION
         
         # Determine media type
         if is_video_file(filepath):
-            self.play_video(filepath)
+            self.play_video(filepath, start_at)
         elif is_image_file(filepath):
-            self.play_image(filepath, duration or Config.DEFAULT_IMAGE_DURATION)
+            self.play_image(filepath, self.image_duration)
         else:
             error_msg = f"Unsupported media type: {filepath}"
             logger.error(error_msg)
             self.media_error.emit(error_msg)
     
-    def play_video(self, filepath: str):
-        """Play video file"""
+    def play_video(self, filepath: str, start_at: float = 0.0):
+        """Play video file, optionally from a position in seconds"""
         self.current_media_type = 'video'
         
         # Stop any current playback
@@ -105,8 +121,11 @@ class MediaPlayerWidget(QWidget):
         self.video_widget.show()
         
         # Load and play video
-        media_content = QMediaContent(QUrl.fromLocalFile(filepath))
+        url = QUrl(filepath) if is_stream_url(filepath) else QUrl.fromLocalFile(filepath)
+        media_content = QMediaContent(url)
         self.media_player.setMedia(media_content)
+        if start_at > 0:
+            self.media_player.setPosition(int(start_at * 1000))
         self.media_player.play()
         
         logger.info(f"Started video playback: {os.path.basename(filepath)}")
@@ -146,6 +165,8 @@ class MediaPlayerWidget(QWidget):
         
         self.image_label.setPixmap(scaled_pixmap)
         
+        self.media_started.emit()
+        
         # Start timer for image duration
         self.image_timer.start(duration * 1000)  # Convert to milliseconds
         
@@ -161,6 +182,14 @@ class MediaPlayerWidget(QWidget):
         if self.image_timer.isActive():
             self.image_timer.stop()
     
+    def get_position(self) -> float:
+        """Get seconds since the current item started"""
+        if self.current_media_type == 'video':
+            return self.media_player.position() / 1000.0
+        if self.current_media_type == 'image' and self.image_timer.isActive():
+            return max(self.image_duration * 1000 - self.image_timer.remainingTime(), 0) / 1000.0
+        return 0.0
+    
     def pause(self):
         """Pause current playback"""
         if self.current_media_type == 'video':
@@ -176,6 +205,11 @@ class MediaPlayerWidget(QWidget):
             # Can't truly resume image, would need to track remaining time
             pass
     
+    def cleanup(self):
+        """Release the media player"""
+        self.stop()
+        self.media_player.setMedia(QMediaContent())
+    
     def on_state_changed(self, state):
         """Handle media player state changes"""
         if state == QMediaPlayer.StoppedState:
@@ -183,22 +217,56 @@ class MediaPlayerWidget(QWidget):
     
     def on_media_status_changed(self, status):
         """Handle media status changes"""
-        if status == QMediaPlayer.EndOfMedia:
+        if status == QMediaPlayer.BufferedMedia and self.current_media_type == 'video':
+            self.media_started.emit()
+        elif status == QMediaPlayer.EndOfMedia and self.looping:
+            # Rewind in place instead of reloading the media
+            self.media_player.setPosition(0)
+            self.media_player.play()
+        elif status == QMediaPlayer.EndOfMedia:
             logger.info("Video playback completed")
             self.media_finished.emit()
         elif status == QMediaPlayer.InvalidMedia:
+            self.looping = False
             error_msg = "Invalid media format"
             logger.error(error_msg)
             self.media_error.emit(error_msg)
     
+    def on_duration_changed(self, duration_ms: int):
+        """Report the current video's duration once the backend knows it"""
+        if duration_ms > 0 and self.current_media_type == 'video':
+            self.media_info_ready.emit(self.current_media_path)
+    
+    def get_media_info(self, filepath: str):
+        """
+        Get probed information for a media file
+        
+        Only the current video is known to QMediaPlayer (once loaded).
+        
+        Args:
+            filepath: Path to media file
+            
+        Returns:
+            Dict with 'duration' (seconds), or None if unknown
+        """
+        if filepath != self.current_media_path or self.current_media_type != 'video':
+            return None
+        duration_ms = self.media_player.duration()
+        return {'duration': duration_ms / 1000.0} if duration_ms > 0 else None
+    
     def on_player_error(self, error):
         """Handle media player errors"""
+        self.looping = False
         error_msg = f"Player error: {self.media_player.errorString()}"
         logger.error(error_msg)
         self.media_error.emit(error_msg)
     
     def on_image_timeout(self):
         """Called when image display duration expires"""
+        if self.looping:
+            self.image_timer.start(self.image_duration * 1000)
+            return
+        
         logger.info("Image display duration completed")
         self.media_finished.emit()
     
@@ -217,128 +285,12 @@ class MediaPlayerWidget(QWidget):
             self.image_label.setPixmap(scaled_pixmap)
 
 
-class MediaPlayerApp(QWidget):
-    """Main application window with media player"""
-    
-    def __init__(self, playlist=None):
-        super().__init__()
-        self.playlist = playlist or []
-        self.current_index = 0
-        self.init_ui()
-    
-    def init_ui(self):
-        """Initialize the application window"""
-        self.setWindowTitle(Config.APP_NAME)
-        self.setStyleSheet("background-color: black;")
-        
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Media player widget
-        self.player = MediaPlayerWidget()
-        self.player.media_finished.connect(self.play_next)
-        self.player.media_error.connect(self.handle_media_error)
-        layout.addWidget(self.player)
-        
-        self.setLayout(layout)
-        
-        # Set window size
-        if Config.FULLSCREEN:
-            self.showFullScreen()
-        else:
-            self.resize(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
-    
-    def set_playlist(self, playlist: list):
-        """
-        Set new playlist
-        
-        Args:
-            playlist: List of media items with 'path' and 'duration' keys
-        """
-        logger.info(f"Loading playlist with {len(playlist)} items")
-        self.playlist = playlist
-        self.current_index = 0
-        
-        if self.playlist:
-            self.play_current()
-    
-    def play_current(self):
-        """Play current media item"""
-        if not self.playlist:
-            logger.warning("Playlist is empty")
-            self.show_no_content_message()
-            return
-        
-        if self.current_index >= len(self.playlist):
-            self.current_index = 0
-        
-        item = self.playlist[self.current_index]
-        filepath = item.get('path')
-        duration = item.get('duration')
-        
-        if filepath:
-            self.player.play_media(filepath, duration)
-        else:
-            logger.error(f"Invalid playlist item: {item}")
-            self.play_next()
-    
-    def play_next(self):
-        """Play next media item in playlist"""
-        if not self.playlist:
-            return
-        
-        self.current_index = (self.current_index + 1) % len(self.playlist)
-        logger.debug(f"Playing item {self.current_index + 1}/{len(self.playlist)}")
-        self.play_current()
-    
-    def play_previous(self):
-        """Play previous media item in playlist"""
-        if not self.playlist:
-            return
-        
-        self.current_index = (self.current_index - 1) % len(self.playlist)
-        self.play_current()
-    
-    def handle_media_error(self, error_msg: str):
-        """Handle media playback errors"""
-        logger.error(f"Media error: {error_msg}")
-        # Skip to next item on error
-        QTimer.singleShot(2000, self.play_next)
-    
-    def show_no_content_message(self):
-        """Show message when no content is available"""
-        logger.warning("No content available to display")
-        # Could show a "No Content" screen here
-    
-    def keyPressEvent(self, event):
-        """Handle keyboard events"""
-        key = event.key()
-        
-        if key == Qt.Key_Escape:
-            # Exit fullscreen or quit
-            if self.isFullScreen():
-                self.showNormal()
-            else:
-                self.close()
-        elif key == Qt.Key_Right or key == Qt.Key_Space:
-            # Next media
-            self.play_next()
-        elif key == Qt.Key_Left:
-            # Previous media
-            self.play_previous()
-        elif key == Qt.Key_F:
-            # Toggle fullscreen
-            if self.isFullScreen():
-                self.showNormal()
-            else:
-                self.showFullScreen()
-
-
 if __name__ == '__main__':
-    # Test media player with sample media
+    # Test the QtMultimedia backend with sample media
     import sys
     from PyQt5.QtWidgets import QApplication
     from utils import setup_logging
+    from media_player_app import MediaPlayerApp
     
     setup_logging(Config.LOG_FILE, Config.LOG_LEVEL)
     
@@ -350,7 +302,7 @@ if __name__ == '__main__':
     ]
     
     app = QApplication(sys.argv)
-    player_app = MediaPlayerApp(test_playlist)
-    player_app.show()
+    player_app = MediaPlayerApp(test_playlist, backend='qt')
+    player_app.showFullScreen()
     
     sys.exit(app.exec_())
@@ -0,0 +1,456 @@
+"""
+Media Player Application Window for Marketing Display Application
+Drives playlist playback through a selectable playback backend
+"""
+import os
+import time
+import logging
+from PyQt5.QtWidgets import QMainWindow, QApplication
+from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal
+from PyQt5.QtGui import QCursor
+
+from config import Config
+from utils import is_video_file
+from media_ingest import ingest_pipeline
+from playback_backend import create_backend
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+transition_gap_ms = metrics.histogram('display_transition_gap_ms', 'Time from media finished to the next item on screen')
+
+
+class MediaPlayerApp(QMainWindow):
+    """Main application window for media playback"""
+    
+    # Emitted from the SignalR thread; delivered queued on the Qt thread
+    override_requested = pyqtSignal(dict)
+    
+    # Proof of play: {'item', 'source', 'period'} on screen, and how it ended ('completed', 'error', 'interrupted')
+    item_started = pyqtSignal(dict)
+    item_ended = pyqtSignal(dict, str)
+    item_updated = pyqtSignal(dict)  # The item on screen got a (better) loop period
+    
+    def __init__(self, playlist: list = None, backend: str = None):
+        super().__init__()
+        self.playlist = playlist or []
+        self.current_index = 0
+        self.backend = backend or Config.PLAYBACK_BACKEND
+        self.urgent_item = None  # Urgent item on air ahead of the playlist
+        self.override = None  # Active priority override
+        self.resume_point = None  # Playlist index and position interrupted by the override
+        self.pending_playlist = None  # Playlist that arrived while urgent or override content was playing
+        self.finished_at = None  # When the last item finished, until the next one is on screen
+        self.airing = None  # Item last handed to the player ({'item', 'source', 'period'})
+        self.airing_shown = False  # It reached the screen and has not ended yet
+        self.airing_loop = None  # (filepath, duration) while it loops in place
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the UI"""
+        self.setWindowTitle("Marketing Display")
+        self.setStyleSheet("background-color: black;")
+        
+        # Hide mouse cursor globally for the entire app
+        self.setCursor(Qt.BlankCursor)
+        self.setMouseTracking(True)  # Track mouse to keep cursor hidden
+        QApplication.instance().setOverrideCursor(QCursor(Qt.BlankCursor))
+        
+        # Create media player widget for the selected backend
+        self.player_widget = create_backend(self.backend, self)
+        self.player_widget.media_finished.connect(self.on_media_finished)
+        self.player_widget.media_started.connect(self.on_media_started)
+        self.player_widget.media_error.connect(self.on_media_error)
+        self.player_widget.media_info_ready.connect(self.on_media_info_ready)
+        
+        self.setCentralWidget(self.player_widget)
+        
+        # Priority overrides: preempt the loop, hold, then resume where it left off
+        self.override_timer = QTimer(self)
+        self.override_timer.setSingleShot(True)
+        self.override_timer.timeout.connect(self.end_override)
+        self.override_requested.connect(self.on_override_requested)
+        
+        # Set window properties - frameless and fullscreen
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        
+        # Force window to cover entire screen
+        screen = QApplication.primaryScreen()
+        if screen:
+            screen_geometry = screen.geometry()
+            self.setGeometry(screen_geometry)
+            logger.info(f"Setting window geometry to screen size: {screen_geometry.width()}x{screen_geometry.height()}")
+        
+        # Install event filter to keep cursor hidden
+        self.installEventFilter(self)
+        
+        # Delay start to ensure window is fully initialized; meanwhile the
+        # first item is decoded (image) or prerolled (video) in the background
+        if self.playlist:
+            self.prepare_playlist()
+            self.player_widget.preload(self.get_item_path(self.playlist[0]))
+            QTimer.singleShot(100, self.play_current)
+    
+    def eventFilter(self, obj, event):
+        """Filter events to keep mouse cursor hidden"""
+        if event.type() == QEvent.HoverMove or event.type() == QEvent.MouseMove:
+            # Keep cursor hidden even when mouse moves
+            QApplication.instance().setOverrideCursor(QCursor(Qt.BlankCursor))
+        return super().eventFilter(obj, event)
+    
+    def set_playlist(self, playlist: list):
+        """Set new playlist and start playing"""
+        if self.urgent_item is not None or self.override is not None:
+            # Don't cut urgent or override content short; switch once it has played
+            self.pending_playlist = playlist
+            return
+        
+        self.playlist = playlist
+        self.current_index = 0
+        self.prepare_playlist()
+        if self.playlist:
+            self.play_current()
+    
+    def play_current(self, start_at: float = 0.0):
+        """
+        Play current media item
+        
+        Args:
+            start_at: Position in seconds to resume from
+        """
+        if not self.playlist or self.current_index >= len(self.playlist):
+            logger.warning("No media to play")
+            return
+        
+        item = self.playlist[self.current_index]
+        filepath = self.get_item_path(item)
+        duration = item.get('duration')
+        
+        if start_at > 0 and filepath and not is_video_file(filepath):
+            # Images resume with the time they had left
+            duration = max(int(round((duration or Config.DEFAULT_IMAGE_DURATION) - start_at)), 1)
+            start_at = 0.0
+        
+        logger.info(f"▶️  Playing [{self.current_index + 1}/{len(self.playlist)}]: {os.path.basename(filepath)}")
+        
+        info = self.player_widget.get_media_info(filepath)
+        if info:
+            logger.debug(f"Probed: {info.get('width')}x{info.get('height')} {info.get('codec')}, "
+                         f"{info.get('duration')}s")
+        
+        if filepath:
+            # A single item repeats in place instead of being torn down and reopened
+            loop = self.is_single_item_loop()
+            self.set_airing(item.get('id') or os.path.basename(filepath), 'playlist',
+                            filepath if loop else None, duration)
+            self.player_widget.play_media(filepath, duration, loop=loop, start_at=start_at)
+            self.preload_next()
+        else:
+            logger.error(f"Invalid playlist item: {item}")
+            self.next_media()
+    
+    def prepare_playlist(self):
+        """Start probing playlist media in the background"""
+        self.player_widget.prepare_playlist([self.get_item_path(item) for item in self.playlist])
+    
+    def get_loop_period(self, filepath: str, duration: float = None) -> float:
+        """
+        Get how long one pass of an item looping in place takes
+        
+        A looping item never ends between passes (the player restarts an
+        image's timer, or libVLC repeats the input), so the period is what
+        plays are counted by.
+        
+        Args:
+            filepath: Media file
+            duration: Image display time in seconds
+            
+        Returns:
+            Image duration, or the probed video duration (PROOF_OF_PLAY_SPLIT_SECONDS
+            until the backend reports it through media_info_ready)
+        """
+        if not is_video_file(filepath):
+            return duration or Config.DEFAULT_IMAGE_DURATION
+        info = self.player_widget.get_media_info(filepath)
+        return (info and info.get('duration')) or Config.PROOF_OF_PLAY_SPLIT_SECONDS
+    
+    def get_item_path(self, item: dict):
+        """Get the file to play for an item (normalized copy once it is ready)"""
+        return ingest_pipeline.resolve_playback_path(item.get('path'))
+    
+    def is_single_item_loop(self) -> bool:
+        """Check if the playlist loops a single item"""
+        return len(self.playlist) == 1
+    
+    def preload_next(self):
+        """Let the player preroll the item after the current one"""
+        # Multi-item loops (including all-video ones) wrap through the preroll like any other item
+        if not self.playlist or self.is_single_item_loop():
+            return
+        next_item = self.playlist[(self.current_index + 1) % len(self.playlist)]
+        self.player_widget.preload(self.get_item_path(next_item))
+    
+    def next_media(self):
+        """Play next media in playlist"""
+        self.current_index = (self.current_index + 1) % len(self.playlist)
+        if self.current_index == 0:
+            logger.info("🔄 Playlist loop completed, restarting from beginning")
+        self.play_current()
+    
+    def previous_media(self):
+        """Play previous media in playlist"""
+        self.current_index = (self.current_index - 1) % len(self.playlist)
+        self.play_current()
+    
+    def play_urgent(self, item: dict):
+        """
+        Put an urgent item on air now, ahead of the playlist
+        
+        Args:
+            item: Playlist item whose 'path' may be a progressive stream URL
+                (the file is still downloading)
+        """
+        if self.override is not None:
+            logger.warning(f"Override active, urgent content not shown: {os.path.basename(item['path'])}")
+            return
+        
+        logger.info(f"🚨 Urgent content on air: {os.path.basename(item['path'])}")
+        self.urgent_item = item
+        self.set_airing(item.get('id') or os.path.basename(item['path']), 'urgent')
+        self.player_widget.play_media(item['path'], item.get('duration'))
+    
+    def finish_urgent(self):
+        """Return to the playlist after urgent content"""
+        self.urgent_item = None
+        if self.pending_playlist is not None:
+            playlist, self.pending_playlist = self.pending_playlist, None
+            self.set_playlist(playlist)
+        elif self.playlist:
+            self.play_current()
+    
+    def on_override_requested(self, message: dict):
+        """Handle a PlaybackOverride message (Qt thread)"""
+        if message.get('action', 'start') == 'stop':
+            if self.override is not None:
+                logger.info("Override stopped by backend")
+                self.end_override()
+            return
+        
+        filepath = self.resolve_override_path(message)
+        if not filepath:
+            logger.error(f"Override content not available locally: {message}")
+            return
+        
+        self.start_override(filepath, message.get('duration'), message.get('overrideId'))
+    
+    def resolve_override_path(self, message: dict):
+        """
+        Find the local file for override content
+        
+        Args:
+            message: Override message referencing 'itemId' (playlist item),
+                'url' (cached download) or 'pinned' (file in PINNED_CONTENT_DIR)
+        
+        Returns:
+            Path to play, or None if the content is not on this device
+        """
+        from media_downloader import get_cache_path  # Keeps aiohttp off the player's import path
+        
+        candidates = []
+        if message.get('itemId'):
+            candidates += [item.get('path') for item in self.playlist if item.get('id') == message['itemId']]
+        if message.get('url'):
+            candidates.append(get_cache_path(message['url']))
+        if message.get('pinned'):
+            candidates.append(os.path.join(Config.PINNED_CONTENT_DIR, os.path.basename(message['pinned'])))
+        
+        for path in candidates:
+            if path and os.path.exists(path):
+                return ingest_pipeline.resolve_playback_path(path)
+        return None
+    
+    def start_override(self, filepath: str, duration: float = None, override_id: str = None):
+        """
+        Preempt the playlist with override content
+        
+        Args:
+            filepath: Local file to show
+            duration: Hold time in seconds (None or 0 holds until stopped)
+            override_id: Backend identifier, for logging
+        """
+        # The backend may send the hold time as a number or a string
+        try:
+            duration = int(float(duration)) if duration else None
+        except (TypeError, ValueError):
+            logger.error(f"Override {override_id or ''} rejected: invalid duration {duration!r}")
+            return
+        
+        # A second override replaces the first but keeps the original resume point
+        if self.override is None:
+            self.resume_point = {
+                'index': self.current_index,
+                'position': self.player_widget.get_position(),
+                'urgent': self.urgent_item is not None,
+            }
+            self.urgent_item = None
+        
+        self.override = {'id': override_id, 'path': filepath, 'duration': duration}
+        logger.info(f"⚠️  Override {override_id or ''} on air for {duration or 'until stopped'}s: "
+                    f"{os.path.basename(filepath)}")
+        
+        # Loop the content in place so it covers the whole hold time
+        self.set_airing(override_id or os.path.basename(filepath), 'override', filepath, duration)
+        self.player_widget.play_media(filepath, duration, loop=True)
+        
+        if duration:
+            self.override_timer.start(duration * 1000)
+        else:
+            self.override_timer.stop()
+    
+    def end_override(self):
+        """End the override and resume the interrupted item at its position"""
+        if self.override is None:
+            return
+        
+        logger.info(f"Override {self.override.get('id') or ''} ended")
+        self.override = None
+        self.override_timer.stop()
+        self.end_airing('completed')  # Held for its full time (or stopped by the backend)
+        
+        resume_point, self.resume_point = self.resume_point, None
+        
+        if self.pending_playlist is not None:
+            # Playlist changed meanwhile: the old position means nothing
+            playlist, self.pending_playlist = self.pending_playlist, None
+            self.set_playlist(playlist)
+        elif resume_point and self.playlist and not resume_point['urgent']:
+            self.current_index = resume_point['index'] % len(self.playlist)
+            logger.info(f"Resuming item {self.current_index + 1} at {resume_point['position']:.1f}s")
+            self.play_current(start_at=resume_point['position'])
+        elif self.playlist:
+            self.play_current()
+    
+    def set_airing(self, item_id: str, source: str, loop_path: str = None, duration: float = None):
+        """
+        Note the item about to be handed to the player
+        
+        An item still on screen is reported as interrupted, unless it is the
+        same one (a single item looping in place keeps running).
+        
+        Args:
+            item_id: Playlist item id (file name if it has none)
+            source: 'playlist', 'urgent' or 'override'
+            loop_path: File being looped in place, or None if the item plays once
+            duration: Image display time in seconds
+        """
+        self.airing_loop = (loop_path, duration) if loop_path else None
+        if self.airing_shown and (item_id, source) == (self.airing['item'], self.airing['source']):
+            self.update_airing_period()
+            return
+        self.end_airing('interrupted')
+        self.airing = {
+            'item': item_id,
+            'source': source,
+            'period': self.get_loop_period(*self.airing_loop) if self.airing_loop else None,
+        }
+    
+    def update_airing_period(self):
+        """Recompute the loop period of the item on air and report a change"""
+        period = self.get_loop_period(*self.airing_loop) if self.airing_loop else None
+        if self.airing is None or period == self.airing['period']:
+            return
+        self.airing['period'] = period
+        if self.airing_shown:
+            self.item_updated.emit(dict(self.airing))
+    
+    def on_media_info_ready(self, filepath: str):
+        """Probed information arrived: a looping video may now have its real period"""
+        if self.airing_loop and self.airing_loop[0] == filepath:
+            self.update_airing_period()
+    
+    def end_airing(self, status: str):
+        """Report the item on screen as ended"""
+        if self.airing_shown:
+            self.airing_shown = False
+            self.item_ended.emit(dict(self.airing), status)
+    
+    def on_media_started(self):
+        """Called when new media is on screen"""
+        if self.finished_at is not None:
+            transition_gap_ms.observe((time.monotonic() - self.finished_at) * 1000)
+            self.finished_at = None
+        
+        if self.airing is not None and not self.airing_shown:
+            self.airing_shown = True
+            self.item_started.emit(dict(self.airing))
+    
+    def on_media_finished(self):
+        """Called when current media finishes"""
+        self.finished_at = time.monotonic()
+        self.end_airing('completed')
+        
+        if self.override is not None:
+            # Loop repeats exhausted before the hold time: show it again
+            self.player_widget.play_media(self.override['path'], self.override['duration'], loop=True)
+            return
+        
+        if self.urgent_item is not None:
+            logger.info("Urgent content finished, resuming playlist")
+            self.finish_urgent()
+            return
+        
+        logger.info("Media finished, playing next")
+        self.next_media()
+    
+    def on_media_error(self, error_msg: str):
+        """Called when media error occurs"""
+        logger.error(f"Media error: {error_msg}")
+        
+        # Recorded even if the item never reached the screen
+        if self.airing is not None:
+            self.airing_shown = False
+            self.item_ended.emit(dict(self.airing), 'error')
+        
+        if self.override is not None:
+            self.end_override()
+            return
+        
+        if self.urgent_item is not None:
+            self.finish_urgent()
+            return
+        
+        # A failing normalized copy is dropped in favour of the original
+        ingest_pipeline.reject(self.player_widget.current_media_path)
+        
+        # Try next media
+        self.next_media()
+    
+    def keyPressEvent(self, event: QEvent):
+        """Handle keyboard events"""
+        key = event.key()
+        
+        if key == Qt.Key_Escape or key == Qt.Key_Q:
+            logger.info("Exit key pressed")
+            self.close()
+        elif key == Qt.Key_Space or key == Qt.Key_Right:
+            logger.info("Next media requested")
+            self.next_media()
+        elif key == Qt.Key_Left:
+            logger.info("Previous media requested")
+            self.previous_media()
+        elif key == Qt.Key_P:
+            logger.info("Pause/Resume requested")
+            # Toggle pause (not implemented yet)
+        elif key == Qt.Key_F or key == Qt.Key_F11:
+            # Toggle fullscreen
+            if self.isFullScreen():
+                self.showNormal()
+            else:
+                self.showFullScreen()
+    
+    def closeEvent(self, event):
+        """Handle window close event"""
+        logger.info("Closing media player")
+        self.end_airing('interrupted')
+        self.player_widget.cleanup()
+        event.accept()
@@ -4,32 +4,194 @@ Handles video and photo playback using VLC for better compatibility
 """
 import os
 import sys
+import time
 import logging
+import threading
 import vlc
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QFrame, QMainWindow, QApplication
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QEvent
-from PyQt5.QtGui import QPixmap, QCursor, QImage
-from PIL import Image
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QFrame, QApplication
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QPixmap, QPainter, QImage
+from PIL import Image, ImageOps
 
 from config import Config
-from utils import is_video_file, is_image_file
+from playback_backend import PlaybackBackend, PlaybackBackendMeta
+from utils import is_video_file, is_image_file, is_svg_file
+from animated_image import AnimatedImageStream, is_animated_image
+from media_catalog import MediaCatalog
+from media_ingest import ingest_pipeline
+from progressive_server import is_stream_url
+from playback_quality import PlaybackQualityCollector
+from decode_profile import DecodeProfileSelector, BASE_VLC_ARGS, DEFAULT_PROFILE
+from metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+image_decode_ms = metrics.histogram('display_image_decode_ms', 'Still image decode and scale time (path=predecode/inline)')
 
-class MediaPlayerWidget(QWidget):
+
+class VideoSurfaceStack(QWidget):
+    """
+    Container that keeps all video surfaces mapped and overlapping
+    
+    Unlike QStackedWidget, inactive surfaces are not hidden: they stay mapped
+    underneath the active one, so a prerolled player already has its first
+    frame on screen and a swap is just a raise.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.surfaces = []
+        self.setStyleSheet("background-color: black;")
+    
+    def add_surface(self, surface: QWidget):
+        """Add a surface covering the whole container"""
+        surface.setParent(self)
+        surface.setGeometry(self.rect())
+        self.surfaces.append(surface)
+    
+    def resizeEvent(self, event):
+        """Keep all surfaces covering the container"""
+        super().resizeEvent(event)
+        for surface in self.surfaces:
+            surface.setGeometry(self.rect())
+
+
+class VideoSlot:
+    """
+    One video surface with its own libVLC player
+    
+    A preroll opens media with ':start-paused', so the player decodes the
+    first frame and pauses (reported by a 'paused' event). start() then only
+    needs to unpause.
+    """
+    
+    def __init__(self, index: int, vlc_instance, catalog: MediaCatalog, frame: QFrame, event_callback):
+        self.index = index
+        self.catalog = catalog
+        self.frame = frame
+        self.filepath = None
+        self.generation = 0  # Bumped per opened media so stale events are dropped
+        self.media_generation = 0  # Generation of the media the player holds (tags its events)
+        self.ready = False  # First frame decoded, paused
+        self.started = False
+        self.repeat = False  # Opened with input-repeat (single-video loop)
+        
+        self.player = vlc_instance.media_player_new()
+        
+        # Subscribe to end-of-media, error, playing and paused events
+        event_manager = self.player.event_manager()
+        vlc_events = {
+            vlc.EventType.MediaPlayerEndReached: 'ended',
+            vlc.EventType.MediaPlayerEncounteredError: 'error',
+            vlc.EventType.MediaPlayerPlaying: 'playing',
+            vlc.EventType.MediaPlayerPaused: 'paused',
+        }
+        for event_type, name in vlc_events.items():
+            event_manager.event_attach(event_type, event_callback, self, name)
+        
+        # Video output is bound once per slot, not per item
+        window_id = int(self.frame.winId())
+        if sys.platform.startswith('linux'):
+            self.player.set_xwindow(window_id)
+        elif sys.platform == "win32":
+            self.player.set_hwnd(window_id)
+        elif sys.platform == "darwin":
+            self.player.set_nsobject(window_id)
+    
+    def open(self, filepath: str, paused: bool = True, repeat: bool = False, start_time: float = 0.0):
+        """
+        Open media
+        
+        Args:
+            filepath: Path to video file
+            paused: Preroll (decode the first frame and pause) instead of playing
+            repeat: Loop the input inside libVLC (no end event between loops)
+            start_time: Start position in seconds
+        """
+        self.generation += 1
+        self.filepath = filepath
+        self.ready = False
+        self.started = not paused
+        self.repeat = repeat
+        
+        if start_time > 0:
+            # Options stick to a Media, so a resume position needs a one-off Media
+            options = [f':start-time={start_time:.3f}']
+            if paused:
+                options.append(':start-paused')
+            if repeat:
+                options.append(f':input-repeat={Config.VIDEO_LOOP_REPEAT}')
+            media = self.catalog.vlc_instance.media_new(filepath, *options)
+            self.player.set_media(media)
+            media.release()  # The player keeps its own reference
+        else:
+            # Reuse the catalog's Media (already parsed) instead of creating one per play
+            media = self.catalog.get_media(filepath, paused=paused, repeat=repeat, slot=self.index)
+            self.player.set_media(media)
+        
+        # set_media() has stopped the previous input, so every event from here on
+        # belongs to this media; the libVLC thread only ever reads this value
+        self.media_generation = self.generation
+        self.player.play()
+    
+    def is_ready(self) -> bool:
+        """Check if a preroll has decoded its first frame and paused"""
+        if not self.ready and not self.started and self.filepath:
+            # Fall back to the state in case the 'paused' event is still queued
+            self.ready = self.player.get_state() == vlc.State.Paused
+        return self.ready
+    
+    def start(self):
+        """Start playback of the opened media (unpause a preroll)"""
+        if not self.started:
+            self.started = True
+            self.player.set_pause(0)
+    
+    def stop(self):
+        """Stop playback and forget the opened media"""
+        self.generation += 1
+        self.filepath = None
+        self.ready = False
+        self.started = False
+        self.repeat = False
+        self.player.stop()
+    
+    def release(self):
+        """Release the libVLC player"""
+        self.player.release()
+
+
+class MediaPlayerWidget(QWidget, PlaybackBackend, metaclass=PlaybackBackendMeta):
     """Widget for displaying photos and videos using VLC"""
     
     # Signals
+    media_started = pyqtSignal()  # Emitted when the first frame of new media is on screen
     media_finished = pyqtSignal()  # Emitted when current media finishes
     media_error = pyqtSignal(str)  # Emitted on playback error
+    media_info_ready = pyqtSignal(str)  # Probed information for a file became available (from the preparser thread)
+    
+    # libVLC events, re-emitted from VLC threads and delivered on the Qt thread
+    vlc_event = pyqtSignal(int, str, int)  # (slot index, event name, media generation)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_media_path = None
         self.current_media_type = None
+        self.looping = False  # Current item repeats in place (single-item playlist)
+        self.image_duration = Config.DEFAULT_IMAGE_DURATION
+        self.start_pending = False  # media_started not yet emitted for the current item
         self.vlc_instance = None
-        self.vlc_player = None
+        self.decode_sandbox = None  # Set when libVLC runs out of process (VIDEO_SANDBOX)
+        self.media_catalog = None
+        self.playback_quality = None
+        self.video_slots = []  # Two players: one on air, one prerolling the next video
+        self.active_slot = None
+        self.poster_slot = None  # Cold-started slot still hidden behind its poster frame
+        self.animation_stream = None
+        self.animation_deadline = 0.0
+        self.animation_first_frame = False
+        self.decoded_images = {}  # filepath -> (width, height, QImage) decoded off the Qt thread
+        self.decode_lock = threading.Lock()
         self.init_ui()
         self.init_vlc()
     
@@ -49,31 +211,49 @@ class MediaPlayerWidget(QWidget):
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.setStyleSheet("background-color: black;")
         
-        # Video frame for VLC
-        self.video_frame = QFrame()
-        self.video_frame.setStyleSheet("background-color: black;")
-        self.video_frame.setCursor(Qt.BlankCursor)
-        self.video_frame.setMouseTracking(True)
-        self.stacked_widget.addWidget(self.video_frame)
-        
-        # Double buffer for images - two image labels to eliminate black flash
-        self.image_label_1 = QLabel()
-        self.image_label_1.setAlignment(Qt.AlignCenter)
-        self.image_label_1.setScaledContents(False)
-        self.image_label_1.setStyleSheet("background-color: black;")
-        self.image_label_1.setCursor(Qt.BlankCursor)
-        self.stacked_widget.addWidget(self.image_label_1)
-        
-        self.image_label_2 = QLabel()
-        self.image_label_2.setAlignment(Qt.AlignCenter)
-        self.image_label_2.setScaledContents(False)
-        self.image_label_2.setStyleSheet("background-color: black;")
-        self.image_label_2.setCursor(Qt.BlankCursor)
-        self.stacked_widget.addWidget(self.image_label_2)
-        
-        # Track which image label is currently active
-        self.current_image_label = self.image_label_1
-        self.next_image_label = self.image_label_2
+        # Double buffer for video - two overlapping VLC surfaces, swapped by raising
+        self.video_stack = VideoSurfaceStack()
+        self.video_frames = []
+        for _ in range(2):
+            video_frame = QFrame()
+            video_frame.setStyleSheet("background-color: black;")
+            video_frame.setCursor(Qt.BlankCursor)
+            video_frame.setMouseTracking(True)
+            self.video_stack.add_surface(video_frame)
+            self.video_frames.append(video_frame)
+        self.stacked_widget.addWidget(self.video_stack)
+        
+        # Image surface: GPU-composited transitions when OpenGL is available,
+        # otherwise double-buffered labels (hard cuts)
+        self.image_surface = None
+        if Config.USE_GL_COMPOSITOR:
+            try:
+                from transition_surface import TransitionSurface
+                self.image_surface = TransitionSurface()
+                self.stacked_widget.addWidget(self.image_surface)
+            except Exception as e:
+                logger.warning(f"OpenGL image surface unavailable, using labels: {e}")
+                self.image_surface = None
+        
+        if self.image_surface is None:
+            # Double buffer for images - two image labels to eliminate black flash
+            self.image_label_1 = QLabel()
+            self.image_label_1.setAlignment(Qt.AlignCenter)
+            self.image_label_1.setScaledContents(False)
+            self.image_label_1.setStyleSheet("background-color: black;")
+            self.image_label_1.setCursor(Qt.BlankCursor)
+            self.stacked_widget.addWidget(self.image_label_1)
+            
+            self.image_label_2 = QLabel()
+            self.image_label_2.setAlignment(Qt.AlignCenter)
+            self.image_label_2.setScaledContents(False)
+            self.image_label_2.setStyleSheet("background-color: black;")
+            self.image_label_2.setCursor(Qt.BlankCursor)
+            self.stacked_widget.addWidget(self.image_label_2)
+            
+            # Track which image label is currently active
+            self.current_image_label = self.image_label_1
+            self.next_image_label = self.image_label_2
         
         layout.addWidget(self.stacked_widget)
         
@@ -82,101 +262,391 @@ class MediaPlayerWidget(QWidget):
         self.image_timer.setSingleShot(True)
         self.image_timer.timeout.connect(self.on_image_timeout)
         
-        # Timer to check video playback status
+        # Timer for animated image frames
+        self.animation_timer = QTimer()
+        self.animation_timer.setSingleShot(True)
+        self.animation_timer.setTimerType(Qt.PreciseTimer)
+        self.animation_timer.timeout.connect(self.show_next_animation_frame)
+        
+        # Watchdog timer - libVLC events drive transitions, this only catches missed ones
         self.video_check_timer = QTimer()
         self.video_check_timer.timeout.connect(self.check_video_status)
         
+        # Queued across threads: VLC callbacks never touch widgets directly
+        self.vlc_event.connect(self.on_vlc_event)
+        
         self.setLayout(layout)
     
     def init_vlc(self):
         """Initialize VLC player"""
         try:
-            # Create VLC instance with hardware acceleration enabled
-            vlc_args = [
-                '--no-xlib',  # Don't use Xlib
-                '--quiet',  # Suppress console output
-                '--no-video-title-show',  # Don't show video title on screen
-                '--mouse-hide-timeout=0',  # Hide mouse immediately
-                '--no-osd',  # Disable on-screen display
-                '--no-snapshot-preview',  # No snapshot preview
-                '--no-stats',  # No stats
-                '--no-sub-autodetect-file',  # No subtitle detection
-                '--avcodec-hw=any',  # Enable hardware decoding
-                '--vout=gl',  # Use OpenGL video output
-                '--codec=avcodec,all',  # Use avcodec for decoding
-            ]
+            # Use the fastest stable decode / video output profile for this device
+            # (default profile until one has been probed)
+            selector = DecodeProfileSelector()
+            profile = selector.get_profile()
+            vlc_args = BASE_VLC_ARGS + profile['args']  # Stats stay on for quality instrumentation
+            
+            # Probe headless while nothing is on screen; the first item stops it
+            selector.probe_when_idle(lambda: self.current_media_path is not None)
+            
+            if Config.VIDEO_SANDBOX:
+                self.init_sandbox(vlc_args, profile)
+                return
             
             self.vlc_instance = vlc.Instance(' '.join(vlc_args))
-            self.vlc_player = self.vlc_instance.media_player_new()
             
-            logger.info("VLC player initialized successfully with hardware acceleration")
+            if self.vlc_instance is None and profile is not DEFAULT_PROFILE:
+                # Stored profile no longer loads (e.g. plugin removed): re-probe next start
+                logger.warning(f"Decode profile '{profile['name']}' failed, falling back to default")
+                selector.clear()
+                profile = DEFAULT_PROFILE
+                self.vlc_instance = vlc.Instance(' '.join(BASE_VLC_ARGS + profile['args']))
+            
+            self.playback_quality = PlaybackQualityCollector(profile['name'])
+            self.media_catalog = MediaCatalog(self.vlc_instance, self.media_info_ready.emit)
+            
+            self.video_slots = [
+                VideoSlot(index, self.vlc_instance, self.media_catalog, frame, self._on_vlc_callback)
+                for index, frame in enumerate(self.video_frames)
+            ]
+            
+            logger.info(f"VLC player initialized successfully (decode profile: {profile['name']})")
         except Exception as e:
             logger.error(f"Failed to initialize VLC: {e}")
             self.media_error.emit(f"VLC initialization failed: {e}")
     
-    def play_media(self, filepath: str, duration: int = None):
+    def init_sandbox(self, vlc_args: list, profile: dict):
+        """
+        Run libVLC in a supervised child process that renders into our video frames
+        
+        Media catalog and quality statistics need in-process libVLC objects and
+        are not available in this mode.
+        """
+        from vlc_sandbox import DecodeSandbox
+        
+        self.decode_sandbox = DecodeSandbox(
+            vlc_args,
+            BASE_VLC_ARGS + DEFAULT_PROFILE['args'],
+            self.video_frames,
+            self.vlc_event.emit,
+            self
+        )
+        self.decode_sandbox.crashed.connect(self.on_decoder_crashed)
+        self.video_slots = self.decode_sandbox.slots
+        
+        logger.info(f"VLC decode sandbox started (decode profile: {profile['name']})")
+    
+    def on_decoder_crashed(self):
+        """The decode sandbox died or hung: skip the video that was on air"""
+        self.poster_slot = None
+        if self.current_media_type == 'video' and self.active_slot is not None:
+            self.finish_video("Video decoder crashed")
+    
+    def play_media(self, filepath: str, duration: int = None, loop: bool = False, start_at: float = 0.0):
         """
         Play media file (video or image)
         
         Args:
             filepath: Path to media file
             duration: Duration in seconds (for images only)
+            loop: Repeat this item in place until other media is played
+            start_at: Start position in seconds (for videos only)
         """
-        if not os.path.exists(filepath):
+        if not os.path.exists(filepath) and not is_stream_url(filepath):
             error_msg = f"Media file not found: {filepath}"
             logger.error(error_msg)
             self.media_error.emit(error_msg)
             return
         
+        # Same single item again (e.g. playlist refresh): keep it running untouched
+        if loop and self.is_looping(filepath):
+            self.image_duration = duration or Config.DEFAULT_IMAGE_DURATION
+            logger.debug(f"Already looping: {os.path.basename(filepath)}")
+            return
+        
         logger.info(f"Playing media: {os.path.basename(filepath)}")
         
         self.current_media_path = filepath
+        self.looping = loop
+        self.image_duration = duration or Config.DEFAULT_IMAGE_DURATION
+        self.start_pending = True
+        self.poster_slot = None
         
         # Determine media type
         if is_video_file(filepath):
-            self.play_video(filepath)
+            self.play_video(filepath, loop, start_at)
         elif is_image_file(filepath):
-            self.play_image(filepath, duration or Config.DEFAULT_IMAGE_DURATION)
+            self.play_image(filepath, self.image_duration)
         else:
             error_msg = f"Unsupported media type: {filepath}"
             logger.error(error_msg)
             self.media_error.emit(error_msg)
     
-    def play_video(self, filepath: str):
-        """Play video file using VLC"""
+    def is_looping(self, filepath: str) -> bool:
+        """Check if this file is already on air and repeating in place"""
+        if not self.looping or filepath != self.current_media_path:
+            return False
+        if self.current_media_type == 'video':
+            slot = self.active_slot
+            return slot is not None and slot.repeat and slot.started and slot.filepath == filepath
+        return self.current_media_type == 'image' and self.image_timer.isActive()
+    
+    def play_video(self, filepath: str, loop: bool = False, start_at: float = 0.0):
+        """
+        Play video file using VLC, swapping to a prerolled player when available
+        
+        Args:
+            filepath: Path to video file
+            loop: Open with input-repeat, so the decoder and video output stay up between loops
+            start_at: Start position in seconds (resume after an interruption)
+        """
         self.current_media_type = 'video'
         
         # Stop timers only, keep previous content visible
         self.image_timer.stop()
+        self.stop_animation()
         
-        # Switch to video frame (index 0)
-        self.stacked_widget.setCurrentIndex(0)
+        if not self.video_slots:
+            self.media_error.emit("VLC is not initialized")
+            return
         
         try:
-            # Create media
-            media = self.vlc_instance.media_new(filepath)
-            self.vlc_player.set_media(media)
+            previous_slot = self.active_slot
+            
+            # A preroll is a plain open from the start, so loops and resumes always open fresh
+            slot = None if loop or start_at > 0 else self.get_prerolled_slot(filepath)
+            if slot is not None and slot.is_ready():
+                logger.info(f"Using prerolled video: {os.path.basename(filepath)}")
+            else:
+                # Cold start (or preroll not finished): play on the slot that is not on air
+                slot = slot or self.get_idle_slot()
+                slot.open(filepath, paused=False, repeat=loop, start_time=start_at)
+                logger.info(f"Opening video{' (loop)' if loop else ''}: {os.path.basename(filepath)}")
+                
+                # Cover Opening/Buffering with the poster frame instead of black
+                # (a resume would flash the first frame, so it keeps the previous content)
+                if start_at <= 0 and self.show_poster(filepath):
+                    self.poster_slot = slot
             
-            # Set video output to our frame (only set once if not already set)
-            if sys.platform.startswith('linux'):
-                self.vlc_player.set_xwindow(int(self.video_frame.winId()))
-            elif sys.platform == "win32":
-                self.vlc_player.set_hwnd(int(self.video_frame.winId()))
-            elif sys.platform == "darwin":
-                self.vlc_player.set_nsobject(int(self.video_frame.winId()))
+            self.active_slot = slot
             
-            # Start playback - VLC will handle transition internally
-            self.vlc_player.play()
+            # Invalidate any events still queued from the previous video
+            if previous_slot is not None and previous_slot is not slot:
+                previous_slot.generation += 1
             
-            # Start checking video status
-            self.video_check_timer.start(500)  # Check every 500ms
+            self.start_slot(slot, reveal=self.poster_slot is not slot)
             
-            logger.info(f"Started video playback: {os.path.basename(filepath)}")
+            # Events drive the transition; poll rarely as a watchdog only
+            self.video_check_timer.start(Config.VIDEO_WATCHDOG_INTERVAL)
         except Exception as e:
             error_msg = f"Failed to play video: {e}"
             logger.error(error_msg)
             self.media_error.emit(error_msg)
     
+    def start_slot(self, slot: VideoSlot, reveal: bool = True):
+        """
+        Put a slot on air: start it, raise its surface, stop the other player
+        
+        Args:
+            slot: Slot to start
+            reveal: Switch to the video surfaces now (False while a poster covers the open)
+        """
+        slot.start()
+        slot.frame.raise_()
+        if reveal:
+            self.stacked_widget.setCurrentWidget(self.video_stack)
+        
+        # Stop the previous video only now, so its last frame covers the swap
+        for other in self.video_slots:
+            if other is not slot and other.started:
+                other.stop()
+        
+        if self.playback_quality:
+            self.playback_quality.start_item(slot.filepath, slot.player.get_media())
+        
+        logger.info(f"Started video playback: {os.path.basename(slot.filepath)}")
+    
+    def show_poster(self, filepath: str) -> bool:
+        """
+        Show a video's poster frame through the image path
+        
+        Args:
+            filepath: Path to video file
+        
+        Returns:
+            True if a poster is now on screen
+        """
+        poster_path = ingest_pipeline.get_poster(filepath)
+        if not poster_path:
+            return False
+        
+        pixmap = QPixmap(poster_path)
+        if pixmap.isNull():
+            return False
+        
+        # Letterbox like the video output, so the swap to live video does not jump
+        target_size = self.get_target_size()
+        scaled_pixmap = pixmap.scaled(target_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        canvas = QPixmap(target_size)
+        canvas.fill(Qt.black)
+        painter = QPainter(canvas)
+        painter.drawPixmap(
+            (target_size.width() - scaled_pixmap.width()) // 2,
+            (target_size.height() - scaled_pixmap.height()) // 2,
+            scaled_pixmap
+        )
+        painter.end()
+        
+        self.show_pixmap(canvas, animate=False)
+        return True
+    
+    def reveal_video(self):
+        """Replace the poster frame with the live video"""
+        self.poster_slot = None
+        self.stacked_widget.setCurrentWidget(self.video_stack)
+    
+    def get_position(self) -> float:
+        """
+        Get the playback position of the current item
+        
+        Returns:
+            Seconds since the item started (videos: media time, images: time on screen)
+        """
+        if self.current_media_type == 'video' and self.active_slot is not None and self.active_slot.started:
+            time_ms = self.active_slot.player.get_time()
+            return time_ms / 1000.0 if time_ms and time_ms > 0 else 0.0
+        if self.current_media_type == 'image' and self.image_timer.isActive():
+            return max(self.image_duration * 1000 - self.image_timer.remainingTime(), 0) / 1000.0
+        return 0.0
+    
+    def get_prerolled_slot(self, filepath: str):
+        """Get the off-air slot already holding this video, if any"""
+        for slot in self.video_slots:
+            if slot is not self.active_slot and slot.filepath == filepath and not slot.started:
+                return slot
+        return None
+    
+    def get_idle_slot(self) -> VideoSlot:
+        """Get the slot that is not on air"""
+        for slot in self.video_slots:
+            if slot is not self.active_slot:
+                return slot
+        return self.video_slots[0]
+    
+    def prepare_playlist(self, filepaths: list):
+        """
+        Pre-parse the playlist's videos in the background
+        
+        Args:
+            filepaths: Paths of all playlist items
+        """
+        if self.media_catalog:
+            self.media_catalog.prepare(filepaths)
+    
+    def get_media_info(self, filepath: str):
+        """
+        Get probed information for a media file
+        
+        Args:
+            filepath: Path to media file
+            
+        Returns:
+            Dict with 'duration' (seconds), 'width', 'height' and 'codec', or None if unknown
+        """
+        if self.media_catalog and filepath and is_video_file(filepath):
+            return self.media_catalog.get_info(filepath)
+        return None
+    
+    def preload(self, filepath: str):
+        """
+        Preroll the next playlist item so its transition is instant
+        
+        Videos are opened on the off-air player and paused on their first frame.
+        Still images are decoded and scaled in the background.
+        
+        Args:
+            filepath: Path to the next media file
+        """
+        if filepath and is_image_file(filepath):
+            self.predecode_image(filepath)
+            return
+        if not Config.VIDEO_PREROLL or not self.video_slots:
+            return
+        if not filepath or not is_video_file(filepath) or not os.path.exists(filepath):
+            return
+        if self.get_prerolled_slot(filepath) is not None:
+            return
+        
+        slot = self.get_idle_slot()
+        
+        try:
+            slot.open(filepath)
+            logger.debug(f"Prerolling video: {os.path.basename(filepath)}")
+        except Exception as e:
+            logger.warning(f"Video preroll failed: {e}")
+    
+    def predecode_image(self, filepath: str):
+        """
+        Decode and scale a still image on a background thread
+        
+        play_image picks the result up instead of decoding on the Qt thread.
+        Animated and SVG images are rendered by their own paths and skipped.
+        
+        Args:
+            filepath: Path to image file
+        """
+        if not filepath or not os.path.exists(filepath) or is_svg_file(filepath) or is_animated_image(filepath):
+            return
+        
+        target_size = self.get_target_size()
+        size = (target_size.width(), target_size.height())
+        with self.decode_lock:
+            cached = self.decoded_images.get(filepath)
+            if cached is not None and cached[:2] == size:
+                return
+        
+        threading.Thread(
+            target=self._decode_image,
+            args=(filepath, size),
+            name="image-predecode",
+            daemon=True
+        ).start()
+    
+    def _decode_image(self, filepath: str, size: tuple):
+        """Decode, fill-scale and center-crop an image to size (background thread)"""
+        try:
+            started = time.perf_counter()
+            with Image.open(filepath) as pil_image:
+                fitted = ImageOps.fit(pil_image.convert('RGB'), size, Image.LANCZOS)
+            data = fitted.tobytes()
+            # QImage is safe to build off the Qt thread (QPixmap is not); copy() detaches it from data
+            image = QImage(data, size[0], size[1], size[0] * 3, QImage.Format_RGB888).copy()
+        except Exception as e:
+            logger.debug(f"Image pre-decode failed, decoding on play: {e}")
+            return
+        
+        with self.decode_lock:
+            # Current and next image only
+            while len(self.decoded_images) >= 2:
+                self.decoded_images.pop(next(iter(self.decoded_images)))
+            self.decoded_images[filepath] = (size[0], size[1], image)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        image_decode_ms.observe(elapsed_ms, path='predecode')
+        logger.debug(f"Pre-decoded {os.path.basename(filepath)} in {elapsed_ms:.0f}ms")
+    
+    def take_decoded_image(self, filepath: str, target_size):
+        """
+        Get a pre-decoded image if one matches the target size
+        
+        Returns:
+            Screen-sized QPixmap, or None
+        """
+        with self.decode_lock:
+            cached = self.decoded_images.pop(filepath, None)
+        if cached is None or cached[:2] != (target_size.width(), target_size.height()):
+            return None
+        return QPixmap.fromImage(cached[2])
+    
     def play_image(self, filepath: str, duration: int):
         """
         Play image file for specified duration
@@ -189,9 +659,35 @@ class MediaPlayerWidget(QWidget):
         
         # Stop timers only, keep previous content visible
         self.video_check_timer.stop()
+        self.stop_animation()
+        
+        # A video cut short by this image still gets its quality record
+        if self.playback_quality:
+            self.playback_quality.finish_item('interrupted')
+        
+        target_size = self.get_target_size()
+        
+        # Animated GIF/WebP: stream frames instead of a single static pixmap
+        if is_animated_image(filepath):
+            self.play_animation(filepath, duration, target_size)
+            return
+        
+        # SVG: rasterize directly at screen resolution (cached per resolution)
+        if is_svg_file(filepath):
+            self.play_svg(filepath, duration, target_size)
+            return
+        
+        # Decoded ahead of time by preload / boot
+        scaled_pixmap = self.take_decoded_image(filepath, target_size)
+        if scaled_pixmap is not None:
+            self.show_pixmap(scaled_pixmap)
+            self.image_timer.start(duration * 1000)
+            logger.info(f"Displaying image for {duration} seconds: {os.path.basename(filepath)}")
+            return
         
         # Preload the image first
         pixmap = QPixmap()
+        started = time.perf_counter()
         
         try:
             # Try loading with PIL first (supports WebP and more formats)
@@ -222,12 +718,6 @@ class MediaPlayerWidget(QWidget):
             self.media_error.emit(error_msg)
             return
         
-        # Get the parent window size (or screen size if no parent)
-        if self.window():
-            target_size = self.window().size()
-        else:
-            target_size = QApplication.instance().primaryScreen().size()
-        
         # Scale image to fill entire screen (will crop to fit, no black bars)
         scaled_pixmap = pixmap.scaled(
             target_size,
@@ -242,212 +732,284 @@ class MediaPlayerWidget(QWidget):
             y = (scaled_pixmap.height() - target_size.height()) // 2
             scaled_pixmap = scaled_pixmap.copy(x, y, target_size.width(), target_size.height())
         
-        # Swap buffers: load into next buffer, then switch to it
-        self.next_image_label.setPixmap(scaled_pixmap)
-        
-        # Switch to the newly loaded image (instant switch, no black)
-        widget_index = self.stacked_widget.indexOf(self.next_image_label)
-        self.stacked_widget.setCurrentIndex(widget_index)
+        # Decoded on the Qt thread: this is time the screen could not update
+        image_decode_ms.observe((time.perf_counter() - started) * 1000, path='inline')
         
-        # Swap current and next for next transition
-        self.current_image_label, self.next_image_label = self.next_image_label, self.current_image_label
-        self.stacked_widget.setCurrentIndex(1)
+        self.show_pixmap(scaled_pixmap)
         
         # Start timer for image duration
         self.image_timer.start(duration * 1000)  # Convert to milliseconds
         
         logger.info(f"Displaying image for {duration} seconds: {os.path.basename(filepath)}")
     
-    def check_video_status(self):
-        """Check if video has finished playing"""
-        if self.vlc_player and self.current_media_type == 'video':
-            state = self.vlc_player.get_state()
-            
-            # Log CPU usage for debugging
-            if hasattr(self, '_last_state_log'):
-                if state != self._last_state_log:
-                    logger.debug(f"Video state changed: {state}")
-                    self._last_state_log = state
-            else:
-                logger.debug(f"Video state: {state}")
-                self._last_state_log = state
-            
-            # VLC states: NothingSpecial=0, Opening=1, Buffering=2, Playing=3, Paused=4, Stopped=5, Ended=6, Error=7
-            if state == vlc.State.Ended:
-                logger.info("Video playback finished")
-                self.video_check_timer.stop()
-                self.media_finished.emit()
-            elif state == vlc.State.Error:
+    def play_svg(self, filepath: str, duration: int, target_size):
+        """
+        Display an SVG rendered at screen resolution
+        
+        Args:
+            filepath: Path to SVG file
+            duration: Display duration in seconds
+            target_size: Size to render at
+        """
+        try:
+            # QtSvg ships as a separate package on Raspberry Pi OS
+            from svg_renderer import render_svg
+        except ImportError as e:
+            error_msg = f"SVG support unavailable: {e}"
+            logger.error(error_msg)
+            self.media_error.emit(error_msg)
+            return
+        
+        pixmap = render_svg(filepath, target_size)
+        if pixmap is None or pixmap.isNull():
+            error_msg = f"Failed to render SVG: {filepath}"
+            logger.error(error_msg)
+            self.media_error.emit(error_msg)
+            return
+        
+        self.show_pixmap(pixmap)
+        self.image_timer.start(duration * 1000)
+        
+        logger.info(f"Displaying SVG for {duration} seconds: {os.path.basename(filepath)}")
+    
+    def play_animation(self, filepath: str, duration: int, target_size):
+        """
+        Play an animated image frame by frame for the item duration
+        
+        Args:
+            filepath: Path to animated GIF/WebP
+            duration: Display duration in seconds (the animation loops until it expires)
+            target_size: Size to render frames at
+        """
+        self.animation_stream = AnimatedImageStream(filepath, target_size)
+        self.animation_stream.start()
+        
+        # First frame transitions in like a static image
+        self.animation_first_frame = True
+        self.show_next_animation_frame()
+        
+        # Item duration governs the whole loop, independent of frame timing
+        self.image_timer.start(duration * 1000)
+        
+        logger.info(f"Playing animation for {duration} seconds: {os.path.basename(filepath)}")
+    
+    def show_next_animation_frame(self):
+        """Present the next buffered animation frame and schedule the one after"""
+        stream = self.animation_stream
+        if stream is None:
+            return
+        
+        frame = stream.next_frame()
+        if frame is None:
+            if stream.error:
+                self.stop_animation()
+                self.image_timer.stop()
+                self.media_error.emit(f"Failed to decode animation: {stream.error}")
+                return
+            # Decoder is behind - hold the current frame and retry shortly
+            self.animation_timer.start(5)
+            return
+        
+        image, delay = frame
+        self.show_pixmap(QPixmap.fromImage(image), animate=self.animation_first_frame)
+        
+        # Schedule against an absolute deadline so per-frame delays don't drift
+        now = time.monotonic()
+        if self.animation_first_frame:
+            self.animation_deadline = now
+            self.animation_first_frame = False
+        self.animation_deadline = max(self.animation_deadline + delay / 1000.0, now)
+        self.animation_timer.start(int((self.animation_deadline - now) * 1000))
+    
+    def stop_animation(self):
+        """Stop animated image playback and free its frame buffer"""
+        self.animation_timer.stop()
+        if self.animation_stream is not None:
+            self.animation_stream.stop()
+            self.animation_stream = None
+    
+    def get_target_size(self):
+        """Get the size images are rendered at (window size, or screen size if no window)"""
+        if self.window():
+            return self.window().size()
+        return QApplication.instance().primaryScreen().size()
+    
+    def show_pixmap(self, pixmap: QPixmap, animate: bool = True):
+        """
+        Present a screen-sized pixmap on the image surface
+        
+        Args:
+            pixmap: Pixmap already scaled to the window size
+            animate: Transition from the previous image (ignored when coming from video)
+        """
+        if self.image_surface is not None:
+            # Cut instead of fading when the previous item was a video
+            from_image = self.stacked_widget.currentWidget() is self.image_surface
+            self.image_surface.set_pixmap(pixmap, animate and from_image)
+            self.stacked_widget.setCurrentWidget(self.image_surface)
+            self.notify_started()
+            return
+        
+        # Swap buffers: load into next buffer, then switch to it (instant switch, no black)
+        self.next_image_label.setPixmap(pixmap)
+        self.stacked_widget.setCurrentWidget(self.next_image_label)
+        
+        # Swap current and next for next transition
+        self.current_image_label, self.next_image_label = self.next_image_label, self.current_image_label
+        self.notify_started()
+    
+    def notify_started(self):
+        """Emit media_started once for the item requested by play_media()"""
+        if self.start_pending:
+            self.start_pending = False
+            self.media_started.emit()
+    
+    def _on_vlc_callback(self, event, slot: VideoSlot, name: str):
+        """
+        libVLC event callback
+        
+        Runs on a libVLC thread: must not call back into libVLC or touch widgets,
+        so it only forwards the event (tagged with slot and media) to the Qt thread.
+        The tag is the generation captured when the media was opened, not the live
+        one, which the Qt thread bumps to invalidate events still in flight.
+        """
+        self.vlc_event.emit(slot.index, name, slot.media_generation)
+    
+    def on_vlc_event(self, index: int, name: str, generation: int):
+        """Handle a libVLC event on the Qt thread"""
+        slot = self.video_slots[index]
+        if generation != slot.generation:
+            logger.debug(f"Ignoring stale VLC event: {name}")
+            return
+        
+        is_on_air = slot is self.active_slot and self.current_media_type == 'video'
+        
+        if name == 'paused' and not slot.started:
+            # First frame decoded: preroll complete
+            slot.ready = True
+        elif name == 'playing':
+            logger.debug(f"Video playing: {os.path.basename(slot.filepath or '')}")
+            if is_on_air:
+                if self.poster_slot is slot:
+                    self.reveal_video()
+                self.notify_started()
+        elif name == 'ended' and is_on_air:
+            logger.info("Video playback finished")
+            self.finish_video()
+        elif name == 'error':
+            if is_on_air:
                 logger.error("Video playback error")
-                self.video_check_timer.stop()
-                self.media_error.emit("Video playback error")
-            elif state == vlc.State.Stopped and self.vlc_player.get_time() > 0:
-                # Video stopped unexpectedly
-                logger.warning("Video stopped unexpectedly")
-                self.video_check_timer.stop()
-                self.media_error.emit("Video stopped unexpectedly")
+                self.finish_video("Video playback error")
+            else:
+                # Failed preroll - the item will be reopened (and report) when played
+                logger.warning(f"Video preroll error: {os.path.basename(slot.filepath or '')}")
+                slot.stop()
+    
+    def finish_video(self, error_msg: str = None):
+        """
+        Complete the current video exactly once
+        
+        Args:
+            error_msg: Error description, or None if the video ended normally
+        """
+        # Drop any duplicate event or watchdog result for this video
+        if self.active_slot is not None:
+            self.active_slot.generation += 1
+        self.video_check_timer.stop()
+        
+        # A loop that ended (repeats exhausted or error) is reopened by the next play
+        self.looping = False
+        
+        if self.playback_quality:
+            self.playback_quality.finish_item('error' if error_msg else 'completed')
+        
+        if error_msg:
+            self.media_error.emit(error_msg)
+        else:
+            self.media_finished.emit()
+    
+    def check_video_status(self):
+        """Watchdog: catch end/error states whose libVLC event was missed"""
+        slot = self.active_slot
+        if slot is None or self.current_media_type != 'video':
+            return
+        
+        state = slot.player.get_state()
+        
+        if self.playback_quality:
+            self.playback_quality.sample()
+        
+        if self.poster_slot is slot and state == vlc.State.Playing:
+            logger.warning("Watchdog: video playing without playing event")
+            self.reveal_video()
+        
+        # VLC states: NothingSpecial=0, Opening=1, Buffering=2, Playing=3, Paused=4, Stopped=5, Ended=6, Error=7
+        if state == vlc.State.Ended:
+            logger.warning("Watchdog: video ended without end event")
+            self.finish_video()
+        elif state == vlc.State.Error:
+            logger.error("Watchdog: video playback error")
+            self.finish_video("Video playback error")
+        elif state == vlc.State.Stopped and slot.started:
+            # Video stopped unexpectedly
+            logger.warning("Video stopped unexpectedly")
+            self.finish_video("Video stopped unexpectedly")
     
     def on_image_timeout(self):
         """Called when image display duration expires"""
+        if self.looping:
+            # Single-image playlist: keep the image (or animation) on screen
+            self.image_timer.start(self.image_duration * 1000)
+            return
+        
+        self.stop_animation()
         logger.info("Image display finished")
         self.media_finished.emit()
     
     def stop(self):
         """Stop current playback"""
-        # Stop VLC player
-        if self.vlc_player:
-            self.vlc_player.stop()
+        if self.playback_quality:
+            self.playback_quality.finish_item('interrupted')
+        
+        # Stop both VLC players (also drops their pending events)
+        for slot in self.video_slots:
+            slot.stop()
+        self.active_slot = None
+        self.poster_slot = None
         
         # Stop timers
         self.image_timer.stop()
         self.video_check_timer.stop()
+        self.stop_animation()
         
-        # Clear both image labels
-        self.image_label_1.clear()
-        self.image_label_2.clear()
+        # Clear image surface
+        if self.image_surface is not None:
+            self.image_surface.clear()
+        else:
+            self.image_label_1.clear()
+            self.image_label_2.clear()
     
     def pause(self):
         """Pause current playback"""
-        if self.vlc_player and self.current_media_type == 'video':
-            self.vlc_player.pause()
+        if self.active_slot and self.current_media_type == 'video':
+            self.active_slot.player.set_pause(1)
     
     def resume(self):
         """Resume paused playback"""
-        if self.vlc_player and self.current_media_type == 'video':
-            self.vlc_player.play()
+        if self.active_slot and self.current_media_type == 'video':
+            self.active_slot.player.set_pause(0)
     
     def cleanup(self):
         """Cleanup resources"""
         self.stop()
-        if self.vlc_player:
-            self.vlc_player.release()
+        for slot in self.video_slots:
+            slot.release()
+        self.video_slots = []
+        if self.playback_quality:
+            self.playback_quality.save_summaries()
+        if self.media_catalog:
+            self.media_catalog.release()
         if self.vlc_instance:
             self.vlc_instance.release()
-
-
-class MediaPlayerApp(QMainWindow):
-    """Main application window for media playback"""
-    
-    def __init__(self, playlist: list = None):
-        super().__init__()
-        self.playlist = playlist or []
-        self.current_index = 0
-        self.init_ui()
-    
-    def init_ui(self):
-        """Initialize the UI"""
-        self.setWindowTitle("Marketing Display")
-        self.setStyleSheet("background-color: black;")
-        
-        # Hide mouse cursor globally for the entire app
-        self.setCursor(Qt.BlankCursor)
-        self.setMouseTracking(True)  # Track mouse to keep cursor hidden
-        QApplication.instance().setOverrideCursor(QCursor(Qt.BlankCursor))
-        
-        # Create media player widget
-        self.player_widget = MediaPlayerWidget(self)
-        self.player_widget.media_finished.connect(self.on_media_finished)
-        self.player_widget.media_error.connect(self.on_media_error)
-        
-        self.setCentralWidget(self.player_widget)
-        
-        # Set window properties - frameless and fullscreen
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        
-        # Force window to cover entire screen
-        screen = QApplication.primaryScreen()
-        if screen:
-            screen_geometry = screen.geometry()
-            self.setGeometry(screen_geometry)
-            logger.info(f"Setting window geometry to screen size: {screen_geometry.width()}x{screen_geometry.height()}")
-        
-        # Install event filter to keep cursor hidden
-        self.installEventFilter(self)
-        
-        # Delay start to ensure window is fully initialized
-        if self.playlist:
-            QTimer.singleShot(100, self.play_current)
-    
-    def eventFilter(self, obj, event):
-        """Filter events to keep mouse cursor hidden"""
-        if event.type() == QEvent.HoverMove or event.type() == QEvent.MouseMove:
-            # Keep cursor hidden even when mouse moves
-            QApplication.instance().setOverrideCursor(QCursor(Qt.BlankCursor))
-        return super().eventFilter(obj, event)
-    
-    def set_playlist(self, playlist: list):
-        """Set new playlist and start playing"""
-        self.playlist = playlist
-        self.current_index = 0
-        if self.playlist:
-            self.play_current()
-    
-    def play_current(self):
-        """Play current media item"""
-        if not self.playlist or self.current_index >= len(self.playlist):
-            logger.warning("No media to play")
-            return
-        
-        item = self.playlist[self.current_index]
-        filepath = item.get('path')
-        duration = item.get('duration')
-        
-        logger.info(f"▶️  Playing [{self.current_index + 1}/{len(self.playlist)}]: {os.path.basename(filepath)}")
-        
-        if filepath:
-            self.player_widget.play_media(filepath, duration)
-        else:
-            logger.error(f"Invalid playlist item: {item}")
-            self.next_media()
-    
-    def next_media(self):
-        """Play next media in playlist"""
-        self.current_index = (self.current_index + 1) % len(self.playlist)
-        if self.current_index == 0:
-            logger.info("🔄 Playlist loop completed, restarting from beginning")
-        self.play_current()
-    
-    def previous_media(self):
-        """Play previous media in playlist"""
-        self.current_index = (self.current_index - 1) % len(self.playlist)
-        self.play_current()
-    
-    def on_media_finished(self):
-        """Called when current media finishes"""
-        logger.info("Media finished, playing next")
-        self.next_media()
-    
-    def on_media_error(self, error_msg: str):
-        """Called when media error occurs"""
-        logger.error(f"Media error: {error_msg}")
-        # Try next media
-        self.next_media()
-    
-    def keyPressEvent(self, event: QEvent):
-        """Handle keyboard events"""
-        key = event.key()
-        
-        if key == Qt.Key_Escape or key == Qt.Key_Q:
-            logger.info("Exit key pressed")
-            self.close()
-        elif key == Qt.Key_Space or key == Qt.Key_Right:
-            logger.info("Next media requested")
-            self.next_media()
-        elif key == Qt.Key_Left:
-            logger.info("Previous media requested")
-            self.previous_media()
-        elif key == Qt.Key_P:
-            logger.info("Pause/Resume requested")
-            # Toggle pause (not implemented yet)
-        elif key == Qt.Key_F or key == Qt.Key_F11:
-            # Toggle fullscreen
-            if self.isFullScreen():
-                self.showNormal()
-            else:
-                self.showFullScreen()
-    
-    def closeEvent(self, event):
-        """Handle window close event"""
-        logger.info("Closing media player")
-        self.player_widget.cleanup()
-        event.accept()
+        if self.decode_sandbox:
+            self.decode_sandbox.shutdown()
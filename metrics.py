@@ -0,0 +1,292 @@
+"""
+Metrics for Marketing Display Application
+On-device counters, gauges and histograms, served in Prometheus text format and saved as a snapshot
+"""
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Tuple
+
+from config import Config
+from utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+# Bucket upper bounds (last bucket +Inf is implicit)
+MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+RATE_BUCKETS = (64e3, 256e3, 1e6, 4e6, 16e6, 64e6)  # bytes per second
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def get_label_key(labels: dict) -> LabelKey:
+    """Hashable, ordered form of a label set"""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(key: LabelKey, extra: Tuple[str, str] = None) -> str:
+    """Prometheus label block, e.g. {result="ok"}"""
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def format_value(value: float) -> str:
+    """Prometheus sample value"""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """Base class: one named metric with a value per label set"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, description: str, lock: threading.Lock):
+        self.name = name
+        self.description = description
+        self.lock = lock
+        self.values: Dict[LabelKey, float] = {}
+
+    def get(self, **labels) -> float:
+        """Current value for a label set (0 if never set)"""
+        with self.lock:
+            return self.values.get(get_label_key(labels), 0.0)
+
+    def render(self) -> list:
+        """Prometheus sample lines"""
+        return [f"{self.name}{format_labels(key)} {format_value(value)}" for key, value in self.values.items()]
+
+    def to_dict(self):
+        """Snapshot form: a number, or a dict keyed by 'name=value,...' when labelled"""
+        if list(self.values) == [()]:
+            return self.values[()]
+        return {','.join(f"{k}={v}" for k, v in key): value for key, value in self.values.items()}
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Add to the count"""
+        key = get_label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        """Set the value"""
+        with self.lock:
+            self.values[get_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        """Add to the value"""
+        key = get_label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, lock: threading.Lock, buckets: tuple = MS_BUCKETS):
+        super().__init__(name, description, lock)
+        self.buckets = tuple(buckets)
+        self.series: Dict[LabelKey, dict] = {}  # label set -> {'counts', 'sum', 'count'}
+
+    def observe(self, value: float, **labels):
+        """Record one value"""
+        key = get_label_key(labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self) -> list:
+        lines = []
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(key, ('le', format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(key, ('le', '+Inf'))} {series['count']}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {format_value(round(series['sum'], 3))}")
+            lines.append(f"{self.name}_count{format_labels(key)} {series['count']}")
+        return lines
+
+    def to_dict(self):
+        result = {}
+        for key, series in self.series.items():
+            buckets = {f"le_{format_value(b)}": c for b, c in zip(self.buckets, series['counts'])}
+            buckets[f"gt_{format_value(self.buckets[-1])}"] = series['count'] - sum(series['counts'])
+            result[','.join(f"{k}={v}" for k, v in key) or 'all'] = {
+                'count': series['count'],
+                'avg': round(series['sum'] / series['count'], 2) if series['count'] else 0.0,
+                'buckets': buckets,
+            }
+        return result
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics"""
+
+    server_version = 'MarketingDisplayMetrics/1.0'
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics scrape: {format % args}")
+
+
+class MetricsRegistry:
+    """
+    Named metrics shared by the whole application
+
+    Metrics are created on first use, so instrumented modules simply declare
+    the ones they update; updating one is a dict write under a lock and costs
+    nothing when nobody scrapes. start() serves them on a localhost HTTP
+    endpoint (GET /metrics, Prometheus text format) and writes a JSON
+    snapshot every METRICS_SNAPSHOT_INTERVAL seconds for devices nobody can
+    scrape.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.lock = threading.Lock()
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.stop_event = threading.Event()
+        self.snapshot_thread: Optional[threading.Thread] = None
+        self.snapshot_file: Optional[str] = None
+
+    def _get_or_create(self, cls, name: str, description: str, **kwargs) -> Metric:
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, description, self.lock, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Get or create a counter"""
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        """Get or create a gauge"""
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str, buckets: tuple = MS_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """
+        Get all metrics in Prometheus text exposition format
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        with self.lock:
+            for metric in self.metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> dict:
+        """
+        Get all current values
+
+        Returns:
+            Dict with timestamp and one entry per metric
+        """
+        with self.lock:
+            values = {name: metric.to_dict() for name, metric in self.metrics.items()}
+        return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'metrics': values}
+
+    def save_snapshot(self, filepath: str = None):
+        """Write the snapshot atomically"""
+        filepath = filepath or self.snapshot_file or Config.METRICS_SNAPSHOT_FILE
+        try:
+            write_json_atomic(filepath, self.snapshot(), indent=2)
+        except Exception as e:
+            logger.error(f"Failed to save metrics snapshot: {e}")
+
+    def start(self, port: int = None, snapshot_file: str = None):
+        """
+        Start the scrape endpoint and the snapshot writer
+
+        Args:
+            port: Local HTTP port (0 or None disables the endpoint)
+            snapshot_file: Snapshot path (defaults to METRICS_SNAPSHOT_FILE)
+        """
+        if self.snapshot_thread is not None:
+            return
+
+        port = Config.METRICS_PORT if port is None else port
+        if port:
+            try:
+                self.httpd = ThreadingHTTPServer((Config.METRICS_BIND_ADDRESS, port), MetricsRequestHandler)
+                self.httpd.daemon_threads = True
+                self.httpd.registry = self
+                threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True).start()
+                logger.info(f"Metrics served on http://{Config.METRICS_BIND_ADDRESS}:{port}/metrics")
+            except OSError as e:
+                self.httpd = None
+                logger.warning(f"Metrics endpoint unavailable on port {port}: {e}")
+
+        self.snapshot_file = snapshot_file or Config.METRICS_SNAPSHOT_FILE
+        self.stop_event.clear()
+        self.snapshot_thread = threading.Thread(target=self._snapshot_loop, name="metrics-snapshot", daemon=True)
+        self.snapshot_thread.start()
+
+    def stop(self):
+        """Stop serving and write a final snapshot"""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+        self.stop_event.set()
+        if self.snapshot_thread is not None:
+            self.snapshot_thread.join(timeout=2)
+            self.snapshot_thread = None
+            self.save_snapshot()
+
+    def _snapshot_loop(self):
+        """Snapshot writer thread"""
+        while not self.stop_event.wait(Config.METRICS_SNAPSHOT_INTERVAL):
+            self.save_snapshot()
+
+
+# Shared registry used by all instrumented modules
+metrics = MetricsRegistry()
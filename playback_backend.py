@@ -0,0 +1,120 @@
+"""
+Playback Backend Interface for Marketing Display Application
+Common contract for the media player widgets and runtime backend selection
+"""
+import importlib
+import logging
+from abc import ABC, ABCMeta, abstractmethod
+
+from PyQt5.QtWidgets import QWidget
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+# Backend name -> (module, widget class); imported lazily so a missing
+# libVLC or QtMultimedia only matters when that backend is selected
+BACKENDS = {
+    'vlc': ('media_player_vlc', 'MediaPlayerWidget'),
+    'qt': ('media_player', 'MediaPlayerWidget'),
+}
+
+
+class PlaybackBackendMeta(type(QWidget), ABCMeta):
+    """Metaclass for player widgets: Qt's wrapper type combined with ABCMeta"""
+
+
+class PlaybackBackend(ABC):
+    """
+    Interface MediaPlayerApp drives, implemented by each player widget
+
+    Implementations are QWidgets (declared with metaclass=PlaybackBackendMeta,
+    since QWidget and ABC have different metaclasses) that also define these
+    signals:
+        media_started: First frame of the requested media is on screen
+        media_finished: Current media finished
+        media_error(str): Current media failed
+        media_info_ready(str): get_media_info() has (new) information for this file
+
+    Optional capabilities (preroll, pre-parsing, probing) have no-op
+    defaults here, so a backend only overrides what it supports.
+    """
+
+    current_media_path = None
+
+    @abstractmethod
+    def play_media(self, filepath: str, duration: int = None, loop: bool = False, start_at: float = 0.0):
+        """
+        Play media file (video or image)
+
+        Args:
+            filepath: Path to media file
+            duration: Duration in seconds (for images only)
+            loop: Repeat this item in place, without media_finished, until
+                other media is played
+            start_at: Start position in seconds (for videos only)
+        """
+
+    def get_position(self) -> float:
+        """
+        Get the playback position of the current item
+
+        Returns:
+            Seconds since the item started (videos: media time, images: time on screen)
+        """
+        return 0.0
+
+    def preload(self, filepath: str):
+        """Prepare the next item so it can start without delay"""
+
+    def prepare_playlist(self, filepaths: list):
+        """Start probing playlist media in the background"""
+
+    def get_media_info(self, filepath: str):
+        """
+        Get probed information for a media file
+
+        Returns:
+            Dict with 'duration', 'width', 'height' and 'codec', or None if unknown
+        """
+        return None
+
+    @abstractmethod
+    def stop(self):
+        """Stop current playback"""
+
+    @abstractmethod
+    def pause(self):
+        """Pause current playback"""
+
+    @abstractmethod
+    def resume(self):
+        """Resume paused playback"""
+
+    def cleanup(self):
+        """Release backend resources"""
+        self.stop()
+
+
+def create_backend(name: str = None, parent=None):
+    """
+    Create the player widget for a playback backend
+
+    Args:
+        name: Backend name ('vlc' or 'qt'), defaults to Config.PLAYBACK_BACKEND
+        parent: Parent widget
+
+    Returns:
+        Player widget implementing PlaybackBackend
+    """
+    name = (name or Config.PLAYBACK_BACKEND).lower()
+    if name not in BACKENDS:
+        logger.warning(f"Unknown playback backend '{name}', using vlc")
+        name = 'vlc'
+
+    module_name, class_name = BACKENDS[name]
+    widget_class = getattr(importlib.import_module(module_name), class_name)
+
+    logger.info(f"Playback backend: {name}")
+    return widget_class(parent)
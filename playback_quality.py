@@ -0,0 +1,194 @@
+"""
+Playback Quality Instrumentation for Marketing Display Application
+Samples libVLC media statistics per item and aggregates per-asset summaries
+"""
+import os
+import json
+import time
+import logging
+import platform
+from typing import Optional, Dict, Any
+import vlc
+
+from config import Config
+from utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+# Cumulative libVLC counters tracked per play
+COUNTERS = (
+    'decoded_video',
+    'displayed_pictures',
+    'lost_pictures',
+    'demux_corrupted',
+    'demux_discontinuity',
+    'read_bytes',
+)
+
+# libVLC reports bitrates in bytes per microsecond; x8000 gives kbit/s
+BITRATE_TO_KBPS = 8000
+
+
+def get_device_model() -> str:
+    """Get a short hardware identifier for summaries"""
+    try:
+        with open('/proc/device-tree/model', 'r') as f:
+            return f.read().strip('\x00\n ')
+    except Exception:
+        return platform.machine()
+
+
+class PlaybackQualityCollector:
+    """
+    Records how well each video actually plays
+
+    Every video item is sampled while it plays (decoded, displayed and lost
+    frames, demux and input bitrate). When the item ends the per-play deltas
+    are folded into a per-asset summary, keyed by file name together with the
+    hardware model and decode profile, so stuttering content and the effect of
+    decode-path changes can be compared across devices.
+    """
+
+    def __init__(self, decode_profile: str = None, summary_file: str = None):
+        self.decode_profile = decode_profile or 'unknown'
+        self.device_model = get_device_model()
+        self.summary_file = summary_file or Config.PLAYBACK_QUALITY_FILE
+        self.summaries: Dict[str, Dict[str, Any]] = self.load_summaries()
+        self.current: Optional[Dict[str, Any]] = None
+        self.last_saved = 0.0
+
+    def start_item(self, filepath: str, media: vlc.Media):
+        """
+        Start collecting statistics for a video that just went on air
+
+        Args:
+            filepath: Path of the playing file
+            media: libVLC Media being played
+        """
+        if self.current is not None:
+            self.finish_item('interrupted')
+
+        self.current = {
+            'filepath': filepath,
+            'media': media,
+            'started': time.monotonic(),
+            'baseline': {name: 0 for name in COUNTERS},
+            'last': {name: 0 for name in COUNTERS},
+            'input_kbps': [],
+            'demux_kbps': [],
+        }
+        self._read(baseline=True)
+
+    def sample(self):
+        """Take a statistics sample of the current video"""
+        if self.current is not None:
+            self._read()
+
+    def finish_item(self, status: str = 'completed'):
+        """
+        Close the current video's record and update its asset summary
+
+        Args:
+            status: 'completed', 'error' or 'interrupted'
+        """
+        current = self.current
+        if current is None:
+            return
+        self._read()
+        self.current = None
+
+        play = {name: current['last'][name] - current['baseline'][name] for name in COUNTERS}
+        play_seconds = time.monotonic() - current['started']
+
+        key = f"{os.path.basename(current['filepath'])}|{self.device_model}|{self.decode_profile}"
+        summary = self.summaries.setdefault(key, {
+            'asset': os.path.basename(current['filepath']),
+            'device_model': self.device_model,
+            'decode_profile': self.decode_profile,
+            'plays': 0,
+            'errors': 0,
+            'interrupted': 0,
+            'play_seconds': 0.0,
+            'max_input_kbps': 0.0,
+            'max_demux_kbps': 0.0,
+            'input_kbps_sum': 0.0,
+            'demux_kbps_sum': 0.0,
+            'bitrate_samples': 0,
+            **{name: 0 for name in COUNTERS},
+        })
+
+        summary['plays'] += 1
+        if status == 'error':
+            summary['errors'] += 1
+        elif status == 'interrupted':
+            summary['interrupted'] += 1
+        summary['play_seconds'] += play_seconds
+        for name in COUNTERS:
+            summary[name] += max(play[name], 0)
+
+        if current['input_kbps']:
+            summary['max_input_kbps'] = max(summary['max_input_kbps'], max(current['input_kbps']))
+            summary['max_demux_kbps'] = max(summary['max_demux_kbps'], max(current['demux_kbps']))
+            summary['input_kbps_sum'] += sum(current['input_kbps'])
+            summary['demux_kbps_sum'] += sum(current['demux_kbps'])
+            summary['bitrate_samples'] += len(current['input_kbps'])
+
+        decoded = max(summary['decoded_video'], 1)
+        summary['lost_ratio'] = summary['lost_pictures'] / decoded
+        summary['avg_input_kbps'] = summary['input_kbps_sum'] / max(summary['bitrate_samples'], 1)
+        summary['avg_demux_kbps'] = summary['demux_kbps_sum'] / max(summary['bitrate_samples'], 1)
+        summary['last_played'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+        lost_ratio = max(play['lost_pictures'], 0) / max(play['decoded_video'], 1)
+        if lost_ratio > Config.PLAYBACK_QUALITY_WARN_LOST_RATIO:
+            logger.warning(
+                f"Playback stutter: {summary['asset']} lost {play['lost_pictures']}/"
+                f"{play['decoded_video']} frames ({lost_ratio:.1%})"
+            )
+
+        # Summaries are small, but don't rewrite the SD card after every item
+        if time.monotonic() - self.last_saved >= Config.PLAYBACK_QUALITY_SAVE_INTERVAL:
+            self.save_summaries()
+
+    def _read(self, baseline: bool = False):
+        """Read libVLC statistics into the current record"""
+        stats = vlc.MediaStats()
+        try:
+            if not self.current['media'].get_stats(stats):
+                return
+        except Exception as e:
+            logger.debug(f"Could not read media stats: {e}")
+            return
+
+        current = self.current
+        for name in COUNTERS:
+            value = getattr(stats, name)
+            if baseline:
+                current['baseline'][name] = value
+            elif value < current['last'][name] or value < current['baseline'][name]:
+                # Counters restarted with the new input - count from zero
+                current['baseline'][name] = 0
+            current['last'][name] = value
+
+        if not baseline and stats.input_bitrate > 0:
+            current['input_kbps'].append(stats.input_bitrate * BITRATE_TO_KBPS)
+            current['demux_kbps'].append(stats.demux_bitrate * BITRATE_TO_KBPS)
+
+    def load_summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Load stored per-asset summaries"""
+        try:
+            if os.path.exists(self.summary_file):
+                with open(self.summary_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load playback quality summaries: {e}")
+        return {}
+
+    def save_summaries(self):
+        """Write per-asset summaries atomically"""
+        try:
+            write_json_atomic(self.summary_file, self.summaries, indent=2)
+            self.last_saved = time.monotonic()
+        except Exception as e:
+            logger.error(f"Failed to save playback quality summaries: {e}")
@@ -0,0 +1,261 @@
+"""
+Playback Rollups for Marketing Display Application
+Per-item, per-hour play counts, on-screen time and errors, uploaded as compact aggregates
+"""
+import gzip
+import json
+import asyncio
+import time
+import logging
+from typing import Optional, Dict, Any, List
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from config import Config
+from async_runtime import async_runtime
+from utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+# Per-item counters in an hour slot
+PLAYS, ON_SCREEN_MS, ERRORS = range(3)
+
+
+def get_current_hour() -> int:
+    """Hours since the epoch (UTC)"""
+    return int(time.time() // 3600)
+
+
+class PlaybackRollups(QObject):
+    """
+    Aggregates play events into hourly per-item totals
+
+    Fed by MediaPlayerApp.item_started / item_ended. Each hour has one slot
+    in a ring buffer of ROLLUP_HOURS slots, reused once its hour falls out of
+    the window; a slot maps item id -> [plays, on-screen ms, errors]. Memory
+    and upload size therefore scale with the catalog and the window, not
+    with how often items play.
+
+    Completed hours are uploaded, checked every ROLLUP_TICK_INTERVAL seconds
+    while online, as one gzipped JSON document for all of them:
+
+        {"device": "...", "hours": [{"hour": "2026-10-18T14:00:00Z", "items": {"item-1": [120, 600000, 0]}}]}
+
+    plays counts passes over the screen. An item looping in place never
+    ends, so its on-screen time is also credited at every tick, along with
+    one play per completed loop period: the 'period' the player reports
+    with item_started (image duration or video length), corrected through
+    item_updated once a video's length is probed. Hours missed while
+    offline wait in the ring (and the state file across restarts) until
+    they are sent or overwritten.
+    """
+
+    # Upload result from the async runtime thread (queued): last hour delivered
+    _uploaded = pyqtSignal(int)
+
+    def __init__(self, connectivity=None, state_file: str = None, parent=None):
+        """
+        Args:
+            connectivity: ConnectivityMonitor gating uploads (always try if None)
+        """
+        super().__init__(parent)
+        self.connectivity = connectivity
+        self.state_file = state_file or Config.ROLLUP_STATE_FILE
+        self.size = Config.ROLLUP_HOURS
+        self.slots: List[Optional[Dict[str, Any]]] = [None] * self.size  # {'hour', 'items'}
+        self.sent_through = get_current_hour() - 1  # Hours up to this one are delivered
+        self.on_screen: Optional[Dict[str, Any]] = None  # Item on screen, when it was last credited and its loop
+        self.last_hour = get_current_hour()
+        self.upload = None
+        self.api_key: Optional[str] = None
+        self.device_id: Optional[str] = None
+
+        self.load_state()
+        self._uploaded.connect(self._on_uploaded)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        """Start crediting on-screen time and uploading"""
+        self.timer.start(Config.ROLLUP_TICK_INTERVAL * 1000)
+
+    def stop(self):
+        """Credit the item on screen and save the window"""
+        self.timer.stop()
+        self._credit_on_screen()
+        self.save_state()
+
+    def set_credentials(self, api_key: str, device_id: str):
+        """Credentials used for uploads"""
+        self.api_key = api_key
+        self.device_id = device_id
+
+    def get_slot(self, hour: int) -> Dict[str, Any]:
+        """Get the slot for an hour, reclaiming it from an hour that left the window"""
+        index = hour % self.size
+        slot = self.slots[index]
+        if slot is None or slot['hour'] != hour:
+            slot = self.slots[index] = {'hour': hour, 'items': {}}
+        return slot
+
+    def get_counters(self, item_id: str, hour: int = None) -> list:
+        """[plays, on-screen ms, errors] of an item in an hour (current hour by default)"""
+        items = self.get_slot(get_current_hour() if hour is None else hour)['items']
+        return items.setdefault(item_id, [0, 0, 0])
+
+    def on_item_started(self, info: dict):
+        """An item reached the screen (Qt thread)"""
+        self._credit_on_screen()
+        self.get_counters(info.get('item'))[PLAYS] += 1
+        now = time.monotonic()
+        self.on_screen = {'item': info.get('item'), 'since': now, 'period': info.get('period'), 'pass_start': now}
+
+    def on_item_updated(self, info: dict):
+        """The item on screen got a new loop period (Qt thread)"""
+        if self.on_screen is not None and self.on_screen['item'] == info.get('item'):
+            self.on_screen['period'] = info.get('period')
+
+    def on_item_ended(self, info: dict, status: str):
+        """An item ended (Qt thread)"""
+        self._credit_on_screen()
+        self.on_screen = None
+        if status == 'error':
+            self.get_counters(info.get('item'))[ERRORS] += 1
+
+    def _credit_on_screen(self):
+        """Add the time (and loops) of the current item on screen since it was last credited"""
+        if self.on_screen is None:
+            return
+        self._count_loops()
+        now = time.monotonic()
+        elapsed_ms = int((now - self.on_screen['since']) * 1000)
+        self.get_counters(self.on_screen['item'])[ON_SCREEN_MS] += elapsed_ms
+        self.on_screen['since'] = now
+
+    def _count_loops(self):
+        """Count a play for every loop period the item on screen has completed since its last pass"""
+        if self.on_screen is None or not self.on_screen['period']:
+            return
+        period = self.on_screen['period']
+        passes = int((time.monotonic() - self.on_screen['pass_start']) // period)
+        if passes:
+            self.get_counters(self.on_screen['item'])[PLAYS] += passes
+            self.on_screen['pass_start'] += passes * period
+
+    def tick(self):
+        """Credit looping items, save at hour boundaries and upload completed hours"""
+        self._credit_on_screen()
+
+        hour = get_current_hour()
+        if hour != self.last_hour:
+            self.last_hour = hour
+            self.save_state()
+
+        self.upload_pending()
+
+    def get_pending_hours(self) -> List[Dict[str, Any]]:
+        """
+        Get completed hours not delivered yet
+
+        Returns:
+            Slots still inside the window, oldest first
+        """
+        current = get_current_hour()
+        return sorted(
+            (slot for slot in self.slots
+             if slot and slot['items'] and self.sent_through < slot['hour'] < current
+             and slot['hour'] > current - self.size),
+            key=lambda slot: slot['hour']
+        )
+
+    def get_payload(self, slots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Compact document for completed hours"""
+        return {
+            'device': self.device_id,
+            'fields': ['plays', 'on_screen_ms', 'errors'],
+            'hours': [
+                {
+                    'hour': time.strftime('%Y-%m-%dT%H:00:00Z', time.gmtime(slot['hour'] * 3600)),
+                    'items': slot['items'],
+                }
+                for slot in slots
+            ],
+        }
+
+    def upload_pending(self):
+        """Upload completed hours if online and registered (returns immediately)"""
+        if not self.api_key:
+            return
+        if self.connectivity is not None and not self.connectivity.is_online():
+            return
+        if self.upload is not None and not self.upload.done():
+            return
+
+        slots = self.get_pending_hours()
+        if not slots:
+            return
+        body = gzip.compress(json.dumps(self.get_payload(slots), separators=(',', ':')).encode('utf-8'))
+        self.upload = async_runtime.submit(self._upload(body, slots[-1]['hour'], len(slots)))
+
+    async def _upload(self, body: bytes, last_hour: int, hours: int):
+        """POST the rollup document (async runtime thread)"""
+        import aiohttp
+
+        headers = {
+            'version': 'v1',
+            'X-Api-Key': self.api_key,
+            'X-Device-Id': self.device_id or '',
+            'Content-Type': 'application/json',
+            'Content-Encoding': 'gzip',
+        }
+        try:
+            session = await async_runtime.get_session()
+            async with session.post(
+                Config.ROLLUP_ENDPOINT,
+                data=body,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=Config.ROLLUP_UPLOAD_TIMEOUT)
+            ) as response:
+                if response.status not in (200, 201, 202, 204):
+                    logger.warning(f"Playback rollup upload rejected: HTTP {response.status}")
+                    return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Playback rollup upload failed: {e}")
+            return
+
+        logger.info(f"Uploaded playback rollups for {hours} hours ({len(body)} bytes)")
+        self._uploaded.emit(last_hour)
+
+    def _on_uploaded(self, last_hour: int):
+        """Mark hours delivered (Qt thread)"""
+        self.sent_through = max(self.sent_through, last_hour)
+        self.save_state()
+
+    def load_state(self):
+        """Restore the window saved by a previous run"""
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not load playback rollups: {e}")
+            return
+
+        current = get_current_hour()
+        for slot in state.get('slots', []):
+            if current - self.size < slot['hour'] <= current:
+                self.slots[slot['hour'] % self.size] = slot
+        self.sent_through = state.get('sent_through', self.sent_through)
+
+    def save_state(self):
+        """Write the window atomically"""
+        try:
+            write_json_atomic(self.state_file, {
+                'sent_through': self.sent_through,
+                'slots': [slot for slot in self.slots if slot and slot['items']],
+            }, separators=(',', ':'))
+        except Exception as e:
+            logger.error(f"Failed to save playback rollups: {e}")
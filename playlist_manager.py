@@ -2,16 +2,22 @@
 Playlist Manager for Marketing Display Application
 Handles playlist fetching, parsing, and state management
 """
+import os
 import json
+import time
 import logging
-import requests
 from typing import Optional, List, Dict
 from datetime import datetime
 
 from config import Config
+from metrics import metrics
+from utils import write_json_atomic
 
 logger = logging.getLogger(__name__)
 
+playlist_fetch_ms = metrics.histogram('display_playlist_fetch_ms', 'Playlist API response time')
+playlist_fetches = metrics.counter('display_playlist_fetches_total', 'Playlist fetches by HTTP status or error')
+
 
 class PlaylistManager:
     """Manages playlist state and backend communication"""
@@ -29,6 +35,9 @@ class PlaylistManager:
         Returns:
             List of playlist items or None if failed
         """
+        import requests  # Only needed once the device syncs, not for a cached boot
+        
+        started = time.monotonic()
         try:
             logger.info(f"Fetching playlist from: {Config.PLAYLIST_ENDPOINT}")
             
@@ -36,6 +45,8 @@ class PlaylistManager:
                 Config.PLAYLIST_ENDPOINT,
                 timeout=30
             )
+            playlist_fetch_ms.observe((time.monotonic() - started) * 1000)
+            playlist_fetches.inc(result=str(response.status_code))
             
             if response.status_code == 200:
                 data = response.json()
@@ -45,12 +56,15 @@ class PlaylistManager:
                 return None
                 
         except requests.exceptions.Timeout:
+            playlist_fetches.inc(result='timeout')
             logger.error("Playlist fetch timeout")
             return None
         except requests.exceptions.ConnectionError:
+            playlist_fetches.inc(result='connection_error')
             logger.error("Connection error while fetching playlist")
             return None
         except Exception as e:
+            playlist_fetches.inc(result='error')
             logger.error(f"Error fetching playlist: {e}")
             return None
     
@@ -214,8 +228,8 @@ class PlaylistManager:
                 'items': self.current_playlist
             }
             
-            with open(filepath, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            # Commit atomically: a power cut leaves the old manifest or the new one, never half of one
+            write_json_atomic(filepath, cache_data, indent=2)
             
             logger.info(f"Playlist cached to: {filepath}")
             
@@ -246,6 +260,24 @@ class PlaylistManager:
         except Exception as e:
             logger.error(f"Error loading playlist cache: {e}")
             return False
+    
+    def load_committed_playlist(self, filepath: str) -> List[Dict]:
+        """
+        Load the last committed playlist for offline boot
+        
+        Args:
+            filepath: Path to cache file
+            
+        Returns:
+            Cached items whose media is already on disk (empty if none)
+        """
+        if not os.path.exists(filepath) or not self.load_playlist_cache(filepath):
+            return []
+        
+        return [
+            item for item in self.current_playlist
+            if item.get('path') and os.path.exists(item['path'])
+        ]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,256 @@
+"""
+Progressive Playback Server for Marketing Display Application
+Serves media files that are still downloading to the local player over HTTP
+"""
+import os
+import time
+import uuid
+import logging
+import mimetypes
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict
+from urllib.parse import quote, unquote
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressiveDownload:
+    """
+    Shared state of one download in progress
+
+    Updated by the downloader, read by the HTTP handler threads and the
+    player. A request for bytes that have not arrived yet blocks until they
+    do, so libVLC sees a slow network stream rather than a truncated file.
+    """
+
+    def __init__(self, url: str, part_path: str, final_path: str, total_size: int):
+        self.url = url
+        self.part_path = part_path
+        self.final_path = final_path
+        self.total_size = total_size
+        self.written = 0
+        self.duration: Optional[float] = None  # Seconds, once probed from the partial file
+        self.probed = False
+        self.started = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.done = False
+        self.failed = False
+        self.condition = threading.Condition()
+
+    def update(self, written: int):
+        """Record bytes written to the part file"""
+        with self.condition:
+            self.written = written
+            self.condition.notify_all()
+
+    def finish(self, failed: bool = False):
+        """Mark the download complete (or failed)"""
+        with self.condition:
+            self.done = not failed
+            self.failed = failed
+            self.finished_at = time.monotonic()
+            self.condition.notify_all()
+
+    def wait_for(self, offset: int, timeout: float) -> bool:
+        """
+        Wait until the file holds bytes up to offset
+
+        Args:
+            offset: Byte count needed
+            timeout: Max seconds to wait without progress
+
+        Returns:
+            True if available, False if the download failed or stalled
+        """
+        with self.condition:
+            while self.written < offset and not self.done:
+                if self.failed:
+                    return False
+                written = self.written
+                self.condition.wait(timeout)
+                if self.written == written and not self.done:
+                    return False  # No progress within timeout
+            return not self.failed
+
+    def get_download_rate(self) -> float:
+        """Average download rate in bytes per second"""
+        elapsed = time.monotonic() - self.started
+        return self.written / elapsed if elapsed > 0 else 0.0
+
+    def is_playable(self) -> bool:
+        """
+        Check if playback can start now without catching up with the download
+
+        At a steady download rate the download stays ahead of playback if the
+        rest of the file arrives before playback reaches the end. A minimum
+        buffer covers the first seconds.
+
+        Returns:
+            True if enough is buffered
+        """
+        if self.done:
+            return True
+        if not self.duration or self.total_size <= 0 or self.failed:
+            return False
+
+        bitrate = self.total_size / self.duration  # bytes per second of playback
+        if self.written < bitrate * Config.PROGRESSIVE_MIN_BUFFER_SECONDS:
+            return False
+
+        rate = self.get_download_rate()
+        if rate <= 0:
+            return False
+
+        time_to_finish = (self.total_size - self.written) / rate
+        return time_to_finish * (1 + Config.PROGRESSIVE_SAFETY_MARGIN) <= self.duration
+
+    def open(self):
+        """Open the file for reading (renamed to its final path once complete)"""
+        try:
+            return open(self.part_path, 'rb')
+        except FileNotFoundError:
+            return open(self.final_path, 'rb')
+
+
+class StreamRequestHandler(BaseHTTPRequestHandler):
+    """Serves one registered download with Range support"""
+
+    server_version = 'MarketingDisplayProgressive/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool):
+        parts = self.path.split('/')
+        download = self.server.registry.get(parts[2]) if len(parts) > 3 and parts[1] == 'stream' else None
+        if download is None:
+            self.send_error(404)
+            return
+
+        total = download.total_size
+        start, end = 0, total - 1
+
+        range_header = self.headers.get('Range')
+        if range_header and range_header.startswith('bytes='):
+            first, _, last = range_header[6:].split(',')[0].partition('-')
+            try:
+                if first:
+                    start = int(first)
+                    end = int(last) if last else total - 1
+                else:
+                    start = max(total - int(last), 0)  # Suffix range
+            except ValueError:
+                self.send_error(400)
+                return
+            end = min(end, total - 1)
+            if start > end:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{total}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{total}')
+        else:
+            self.send_response(200)
+
+        content_type = mimetypes.guess_type(unquote(parts[-1]))[0] or 'application/octet-stream'
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+
+        if not send_body:
+            return
+
+        try:
+            with download.open() as f:
+                f.seek(start)
+                position = start
+                while position <= end:
+                    # Block until the downloader has written the next bytes
+                    if not download.wait_for(position + 1, Config.PROGRESSIVE_STALL_TIMEOUT):
+                        logger.warning(f"Progressive stream stalled: {os.path.basename(download.final_path)}")
+                        break
+                    available = min(download.written if not download.done else total, end + 1)
+                    chunk = f.read(min(Config.DOWNLOAD_CHUNK_SIZE, available - position))
+                    if not chunk:
+                        time.sleep(0.05)  # Size updated before the data reached the page cache
+                        continue
+                    self.wfile.write(chunk)
+                    position += len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Player seeked or stopped
+
+    def log_message(self, format, *args):
+        logger.debug(f"Progressive server: {format % args}")
+
+
+class ProgressiveServer:
+    """
+    Localhost HTTP shim for stream-while-downloading playback
+
+    Started on first use on an ephemeral port. Each registered download gets
+    a URL the player can open while the file is still being written.
+    """
+
+    def __init__(self):
+        self.registry: Dict[str, ProgressiveDownload] = {}
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.lock = threading.Lock()
+
+    def register(self, download: ProgressiveDownload) -> str:
+        """
+        Make a download available for streaming
+
+        Args:
+            download: Download in progress
+
+        Returns:
+            Local URL for the player
+        """
+        with self.lock:
+            if self.httpd is None:
+                self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), StreamRequestHandler)
+                self.httpd.daemon_threads = True
+                self.httpd.registry = self.registry
+                threading.Thread(target=self.httpd.serve_forever, name="progressive-server", daemon=True).start()
+                logger.info(f"Progressive playback server on port {self.httpd.server_port}")
+
+            self._prune()
+            token = uuid.uuid4().hex
+            self.registry[token] = download
+
+        filename = quote(os.path.basename(download.final_path))
+        return f"http://127.0.0.1:{self.httpd.server_port}/stream/{token}/{filename}"
+
+    def _prune(self):
+        """Forget downloads that finished long ago (a player still streaming them has its file open)"""
+        now = time.monotonic()
+        for token, download in list(self.registry.items()):
+            if download.finished_at is not None and now - download.finished_at > 3600:
+                del self.registry[token]
+
+    def shutdown(self):
+        """Stop the server"""
+        with self.lock:
+            if self.httpd is not None:
+                self.httpd.shutdown()
+                self.httpd.server_close()
+                self.httpd = None
+
+
+def is_stream_url(path: str) -> bool:
+    """Check if a playback path is a (progressive) stream URL rather than a file"""
+    return bool(path) and path.startswith(('http://', 'https://'))
+
+
+# Shared server: every downloader registers with the same one
+progressive_server = ProgressiveServer()
@@ -0,0 +1,341 @@
+"""
+Proof-of-Play Journal for Marketing Display Application
+Append-only NDJSON record of what was on screen, uploaded in compressed batches
+"""
+import os
+import gzip
+import json
+import time
+import queue
+import logging
+import threading
+from typing import Optional, Dict, Any, List
+
+from config import Config
+from utils import write_bytes_atomic
+
+logger = logging.getLogger(__name__)
+
+
+SEGMENT_SUFFIX = '.ndjson'
+BATCH_SUFFIX = '.ndjson.gz'
+
+
+def get_epoch_ms() -> int:
+    """Wall-clock time in milliseconds (proof of play is reported in real time, not monotonic)"""
+    return int(time.time() * 1000)
+
+
+class ProofOfPlayJournal:
+    """
+    Records one entry per displayed item and ships them to the backend
+
+    The player reports an item when its first frame is on screen and again
+    when it ends; the pair becomes one line:
+
+        {"item": "item-1", "source": "playlist", "start": 1760000000000, "end": 1760000005000, "status": "completed"}
+
+    status is 'completed', 'error', 'interrupted' (replaced before it ended)
+    or 'continued' (an item looping in place is split every
+    PROOF_OF_PLAY_SPLIT_SECONDS, since no end event arrives between loops).
+
+    Lines are appended by a writer thread to the active segment with a
+    buffered file and fsynced in batches, so the Qt thread never waits on
+    the SD card. Segments are sealed (gzipped) by size or age; sealed
+    batches wait on disk until upload_pending() has delivered them, and the
+    oldest are dropped once they exceed PROOF_OF_PLAY_MAX_DISK_BYTES.
+    """
+
+    def __init__(self, journal_dir: str = None):
+        self.journal_dir = journal_dir or Config.PROOF_OF_PLAY_DIR
+        self.queue: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.open_entry: Optional[Dict[str, Any]] = None  # Item on screen, not yet written
+        self.thread: Optional[threading.Thread] = None
+        self.sentinel = object()
+
+        # Writer thread state
+        self.file = None
+        self.segment_path: Optional[str] = None
+        self.segment_started = 0.0
+        self.segment_entries = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.sequence = 0
+
+        # Upload credentials, set once the device is registered
+        self.api_key: Optional[str] = None
+        self.device_id: Optional[str] = None
+        self.upload_lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread (seals segments left by a previous run first)"""
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name="proof-of-play", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Close the item on screen, write everything and seal the active segment"""
+        if self.thread is None:
+            return
+        self.end_item(None, 'interrupted')
+        self.queue.put(self.sentinel)
+        self.thread.join(timeout=5)
+        self.thread = None
+
+    def set_credentials(self, api_key: str, device_id: str):
+        """Credentials used by upload_pending()"""
+        self.api_key = api_key
+        self.device_id = device_id
+
+    def start_item(self, info: dict):
+        """
+        An item is on screen (Qt thread)
+
+        Args:
+            info: Dict with 'item' (id) and 'source' ('playlist', 'urgent' or 'override')
+        """
+        with self.lock:
+            previous, self.open_entry = self.open_entry, {
+                'item': info.get('item'),
+                'source': info.get('source', 'playlist'),
+                'start': get_epoch_ms(),
+            }
+        if previous is not None:
+            self._append(previous, 'interrupted', self.open_entry['start'])
+
+    def end_item(self, info: Optional[dict], status: str):
+        """
+        The item on screen ended (Qt thread)
+
+        Args:
+            info: Item that ended; if it never reached the screen (failed to
+                open) a zero-length entry is recorded for it
+            status: 'completed', 'error' or 'interrupted'
+        """
+        now = get_epoch_ms()
+        with self.lock:
+            entry, self.open_entry = self.open_entry, None
+        if entry is None and info is not None:
+            entry = {'item': info.get('item'), 'source': info.get('source', 'playlist'), 'start': now}
+        if entry is not None:
+            self._append(entry, status, now)
+
+    def _append(self, entry: dict, status: str, end: int):
+        """Queue a finished entry for the writer thread"""
+        self.queue.put({**entry, 'end': end, 'status': status})
+
+    def _run(self):
+        """Writer thread loop"""
+        self._recover()
+        while True:
+            try:
+                entry = self.queue.get(timeout=Config.PROOF_OF_PLAY_FSYNC_INTERVAL)
+            except queue.Empty:
+                entry = None
+
+            if entry is self.sentinel:
+                break
+            if entry is not None:
+                self._write(entry)
+
+            self._split_open_entry()
+            self._sync_if_due()
+            self._rotate_if_due()
+
+        self._close_segment()
+
+    def _write(self, entry: dict):
+        """Append one line to the active segment"""
+        if self.file is None:
+            self._open_segment()
+        self.file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.segment_entries += 1
+        self.unsynced += 1
+
+    def _split_open_entry(self):
+        """Write out the part of a long (looping) item shown so far"""
+        now = get_epoch_ms()
+        with self.lock:
+            entry = self.open_entry
+            if entry is None or now - entry['start'] < Config.PROOF_OF_PLAY_SPLIT_SECONDS * 1000:
+                return
+            self.open_entry = {**entry, 'start': now}
+        self._write({**entry, 'end': now, 'status': 'continued'})
+
+    def _sync_if_due(self):
+        """fsync once per PROOF_OF_PLAY_FSYNC_BATCH entries or PROOF_OF_PLAY_FSYNC_INTERVAL seconds"""
+        if not self.unsynced:
+            return
+        if (self.unsynced >= Config.PROOF_OF_PLAY_FSYNC_BATCH
+                or time.monotonic() - self.last_sync >= Config.PROOF_OF_PLAY_FSYNC_INTERVAL):
+            self._sync()
+
+    def _sync(self):
+        """Flush and fsync the active segment"""
+        try:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except OSError as e:
+            logger.error(f"Proof-of-play journal sync failed: {e}")
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def _rotate_if_due(self):
+        """Seal the active segment once it is big or old enough to ship"""
+        if self.file is None or not self.segment_entries:
+            return
+        if (self.segment_entries >= Config.PROOF_OF_PLAY_BATCH_ENTRIES
+                or time.monotonic() - self.segment_started >= Config.PROOF_OF_PLAY_BATCH_MAX_AGE):
+            self._close_segment()
+
+    def _open_segment(self):
+        """Start a new active segment"""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.sequence += 1
+        name = f"pop-{time.strftime('%Y%m%dT%H%M%S')}-{self.sequence:04d}{SEGMENT_SUFFIX}"
+        self.segment_path = os.path.join(self.journal_dir, name)
+        self.file = open(self.segment_path, 'a', buffering=64 * 1024)
+        self.segment_started = time.monotonic()
+        self.segment_entries = 0
+
+    def _close_segment(self):
+        """Sync, close and seal the active segment"""
+        if self.file is None:
+            return
+        self._sync()
+        self.file.close()
+        self.file = None
+        self.seal(self.segment_path)
+        self.segment_path = None
+
+    def _recover(self):
+        """Seal segments a previous run left open (crash or power loss)"""
+        try:
+            names = sorted(os.listdir(self.journal_dir))
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.endswith(SEGMENT_SUFFIX):
+                self.seal(os.path.join(self.journal_dir, name))
+
+    def seal(self, path: str):
+        """
+        Compress a segment into an upload batch
+
+        A line cut off by power loss is dropped; every complete line was
+        fsynced before it counted.
+
+        Args:
+            path: Segment file (removed once sealed)
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            data = data[:data.rfind(b'\n') + 1]  # Complete lines only
+
+            if data:
+                write_bytes_atomic(path[:-len(SEGMENT_SUFFIX)] + BATCH_SUFFIX, gzip.compress(data))
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Failed to seal proof-of-play segment {os.path.basename(path)}: {e}")
+            return
+
+        self.enforce_disk_limit()
+
+    def get_pending_batches(self) -> List[str]:
+        """
+        Get sealed batches waiting for upload
+
+        Returns:
+            Paths, oldest first
+        """
+        try:
+            names = sorted(n for n in os.listdir(self.journal_dir) if n.endswith(BATCH_SUFFIX))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.journal_dir, name) for name in names]
+
+    def enforce_disk_limit(self):
+        """Drop the oldest batches while the backlog exceeds PROOF_OF_PLAY_MAX_DISK_BYTES"""
+        batches = []
+        for path in self.get_pending_batches():
+            try:
+                batches.append((path, os.path.getsize(path)))
+            except OSError:
+                continue
+
+        total = sum(size for _, size in batches)
+        dropped = 0
+        while batches and total > Config.PROOF_OF_PLAY_MAX_DISK_BYTES:
+            path, size = batches.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            dropped += 1
+
+        if dropped:
+            logger.warning(f"Proof-of-play backlog over {Config.PROOF_OF_PLAY_MAX_DISK_BYTES} bytes: "
+                           f"dropped {dropped} oldest batches")
+
+    async def upload_pending(self) -> int:
+        """
+        Upload sealed batches, oldest first (async runtime)
+
+        Stops at the first failure; the remaining batches stay on disk for
+        the next attempt.
+
+        Returns:
+            Number of batches delivered
+        """
+        if not self.api_key or not self.upload_lock.acquire(blocking=False):
+            return 0
+
+        import aiohttp
+        from async_runtime import async_runtime
+
+        delivered = 0
+        try:
+            session = await async_runtime.get_session()
+            for path in self.get_pending_batches():
+                try:
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                except FileNotFoundError:
+                    continue  # Dropped by the disk limit meanwhile
+
+                headers = {
+                    'version': 'v1',
+                    'X-Api-Key': self.api_key,
+                    'X-Device-Id': self.device_id or '',
+                    'Content-Type': 'application/x-ndjson',
+                    'Content-Encoding': 'gzip',
+                }
+                try:
+                    async with session.post(
+                        Config.PROOF_OF_PLAY_ENDPOINT,
+                        data=body,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=Config.PROOF_OF_PLAY_UPLOAD_TIMEOUT)
+                    ) as response:
+                        if response.status not in (200, 201, 202, 204):
+                            logger.warning(f"Proof-of-play upload rejected: HTTP {response.status}")
+                            break
+                except Exception as e:
+                    logger.warning(f"Proof-of-play upload failed: {e}")
+                    break
+
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                delivered += 1
+        finally:
+            self.upload_lock.release()
+
+        if delivered:
+            logger.info(f"Uploaded {delivered} proof-of-play batches")
+        return delivered
@@ -0,0 +1,179 @@
+"""
+Refresh Coordinator for Marketing Display Application
+Single-flight content sync: one run at a time, requests during a run merged into one follow-up
+"""
+import time
+import asyncio
+import logging
+from typing import Optional, Callable, Coroutine
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from config import Config
+from async_runtime import async_runtime
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshRun:
+    """One content sync and the requests it covers"""
+
+    def __init__(self, run_id: int, requests: list):
+        self.run_id = run_id
+        self.requests = requests  # [(action, message), ...] merged into this run
+        self.started = time.monotonic()
+        self.superseded = False  # A newer request arrived while this run was in flight
+        self.cancel_requested = False
+        self.task: Optional[asyncio.Task] = None  # Set by the coroutine once it runs
+        self.future = None
+
+    def get_actions(self) -> list:
+        """Distinct request actions, in arrival order"""
+        return list(dict.fromkeys(action for action, _ in self.requests))
+
+    def cancel(self):
+        """
+        Cancel the sync (any thread)
+
+        Only the task is cancelled, never the future: the coroutine always
+        gets to run its finally and report that the run is over.
+        """
+        self.cancel_requested = True
+        task = self.task
+        if task is not None:
+            try:
+                task.get_loop().call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # Loop already closed (shutdown)
+
+
+class RefreshCoordinator(QObject):
+    """
+    Runs at most one content sync at a time
+
+    Requests may come from any thread (SignalR, timers, the UI). A request
+    while idle starts a run right away; requests during a run are merged and
+    start one follow-up run after REFRESH_COALESCE_DELAY, so a burst of CMS
+    publishes costs at most two syncs and never two in parallel on the same
+    cache files. The running sync can check run.superseded to drop work that
+    a newer request has made stale, and can be cancelled outright.
+
+    Every run ends with run_finished(dict): run id, outcome ('ok', 'empty',
+    'failed', 'superseded' or 'cancelled'), the merged actions and duration.
+    """
+
+    run_finished = pyqtSignal(dict)
+
+    # Cross-thread entry points, delivered queued on the Qt thread
+    _requested = pyqtSignal(str, object, bool)
+    _done = pyqtSignal(object)
+
+    def __init__(self, sync: Callable[[RefreshRun], Coroutine], parent=None):
+        """
+        Args:
+            sync: Coroutine function performing one sync; returns a dict with
+                at least 'outcome' (extra keys are reported as-is)
+        """
+        super().__init__(parent)
+        self.sync = sync
+        self.current: Optional[RefreshRun] = None
+        self.pending: list = []
+        self.next_run_id = 1
+
+        self._requested.connect(self._on_requested)
+        self._done.connect(self._on_done)
+
+        self.follow_up_timer = QTimer(self)
+        self.follow_up_timer.setSingleShot(True)
+        self.follow_up_timer.timeout.connect(self._start_pending)
+
+    def request(self, action: str = 'refresh', message=None, cancel_running: bool = False):
+        """
+        Ask for a content sync (any thread, returns immediately)
+
+        Args:
+            action: Reason for the sync (e.g. SignalR action)
+            message: Message that triggered it
+            cancel_running: Cancel a run in flight instead of letting it finish
+        """
+        self._requested.emit(action, message, cancel_running)
+
+    def is_running(self) -> bool:
+        """Check if a sync is in flight"""
+        return self.current is not None
+
+    def cancel(self):
+        """Cancel the running sync and drop merged requests (Qt thread)"""
+        self.pending = []
+        self.follow_up_timer.stop()
+        if self.current is not None:
+            self.current.cancel()
+
+    def _on_requested(self, action: str, message, cancel_running: bool):
+        """Start a run or merge into the follow-up (Qt thread)"""
+        self.pending.append((action, message))
+
+        if self.current is None:
+            if not self.follow_up_timer.isActive():
+                self._start_pending()
+            return
+
+        self.current.superseded = True
+        logger.info(f"Refresh requested during run {self.current.run_id} ({action}): "
+                    f"merged into follow-up ({len(self.pending)} pending)")
+        if cancel_running:
+            self.current.cancel()
+
+    def _start_pending(self):
+        """Start one run covering every pending request (Qt thread)"""
+        if self.current is not None or not self.pending:
+            return
+
+        run = RefreshRun(self.next_run_id, self.pending)
+        self.next_run_id += 1
+        self.pending = []
+        self.current = run
+
+        logger.info(f"Refresh run {run.run_id} started: {', '.join(run.get_actions())}"
+                    + (f" ({len(run.requests)} requests merged)" if len(run.requests) > 1 else ""))
+
+        run.future = async_runtime.submit(self._execute(run))
+
+    async def _execute(self, run: RefreshRun) -> dict:
+        """Run the sync and report the run over once it has unwound (async runtime thread)"""
+        run.task = asyncio.current_task()
+        result = {'outcome': 'cancelled'}
+        try:
+            if not run.cancel_requested:  # Else cancelled before it got to start
+                result = await self.sync(run) or {}
+                result.setdefault('outcome', 'ok')
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Refresh run {run.run_id} failed: {e}")
+            result = {'outcome': 'failed', 'error': str(e)}
+        finally:
+            # Reported from here, not from the future: a cancelled future resolves
+            # before the sync's own cleanup has run, which would let a follow-up overlap it
+            self._done.emit((run, result))
+        return result
+
+    def _on_done(self, payload):
+        """Report a finished run and schedule the follow-up (Qt thread)"""
+        run, result = payload
+        if run is not self.current:
+            return
+
+        self.current = None
+        outcome = {
+            'run': run.run_id,
+            'actions': run.get_actions(),
+            'requests': len(run.requests),
+            'duration': round(time.monotonic() - run.started, 2),
+            **result,
+        }
+        logger.info(f"Refresh run {run.run_id} finished: {outcome['outcome']} in {outcome['duration']}s")
+        self.run_finished.emit(outcome)
+
+        if self.pending:
+            self.follow_up_timer.start(int(Config.REFRESH_COALESCE_DELAY * 1000))
@@ -8,16 +8,21 @@ from typing import Callable, Optional
 from signalrcore.hub_connection_builder import HubConnectionBuilder
 
 from config import Config
+from metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+signalr_reconnects = metrics.counter('display_signalr_reconnects_total', 'SignalR reconnection attempts')
+signalr_connected = metrics.gauge('display_signalr_connected', '1 while the SignalR connection is open')
+
 
 class SignalRClient:
     """SignalR client for real-time playlist updates"""
     
-    def __init__(self, on_playlist_updated: Optional[Callable] = None):
+    def __init__(self, on_playlist_updated: Optional[Callable] = None, on_override: Optional[Callable] = None):
         self.hub_connection = None
         self.on_playlist_updated = on_playlist_updated
+        self.on_override = on_override
         self.is_connected = False
         self.reconnect_attempts = 0
     
@@ -43,6 +48,7 @@ class SignalRClient:
             # Register message handlers
             self.hub_connection.on("PlaylistUpdated", self.handle_playlist_updated)
             self.hub_connection.on("ContentChanged", self.handle_content_changed)
+            self.hub_connection.on("PlaybackOverride", self.handle_playback_override)
             
             # Start connection
             self.hub_connection.start()
@@ -65,16 +71,19 @@ class SignalRClient:
         """Called when connection opens"""
         self.is_connected = True
         self.reconnect_attempts = 0
+        signalr_connected.set(1)
         logger.info("SignalR connection established")
     
     def on_close(self):
         """Called when connection closes"""
         self.is_connected = False
+        signalr_connected.set(0)
         logger.warning("SignalR connection closed")
         
         # Attempt reconnection
         if self.reconnect_attempts < Config.SIGNALR_MAX_RECONNECT_ATTEMPTS:
             self.reconnect_attempts += 1
+            signalr_reconnects.inc()
             logger.info(f"Reconnecting... (attempt {self.reconnect_attempts})")
             time.sleep(Config.SIGNALR_RECONNECT_INTERVAL)
             self.start()
@@ -120,6 +129,27 @@ class SignalRClient:
         except Exception as e:
             logger.error(f"Error handling ContentChanged message: {e}")
     
+    def handle_playback_override(self, message):
+        """
+        Handle PlaybackOverride message from backend
+        
+        Args:
+            message: Message data from SignalR: 'action' ('start' or 'stop'),
+                content ('itemId', 'url' or 'pinned') and 'duration' in seconds
+        """
+        try:
+            # signalrcore passes hub arguments as a list
+            if isinstance(message, list):
+                message = message[0] if message else {}
+            
+            logger.info(f"Received PlaybackOverride message: {message}")
+            
+            if self.on_override:
+                self.on_override(message)
+            
+        except Exception as e:
+            logger.error(f"Error handling PlaybackOverride message: {e}")
+    
     def send_message(self, method: str, *args):
         """
         Send message to SignalR hub
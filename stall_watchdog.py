@@ -0,0 +1,212 @@
+"""
+UI Stall Watchdog for Marketing Display Application
+Measures Qt event-loop latency and captures the main thread's stack while it is frozen
+"""
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Optional, Dict, Any, List
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+from config import Config
+from metrics import metrics
+from utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+STALL_BUCKETS_MS = (250, 500, 1000, 2000, 5000, 10000, 30000)
+
+event_loop_latency_ms = metrics.histogram('display_event_loop_latency_ms', 'How late the Qt heartbeat fires',
+                                          buckets=LATENCY_BUCKETS_MS)
+ui_stall_ms = metrics.histogram('display_ui_stall_ms', 'Duration of Qt thread stalls', buckets=STALL_BUCKETS_MS)
+
+
+def get_stall_site(stack: List[traceback.FrameSummary]) -> str:
+    """
+    Find the application frame a stall is attributed to
+
+    Args:
+        stack: Main thread stack, outermost frame first
+
+    Returns:
+        'file.py:line function' of the innermost frame in this application
+        (innermost frame overall if none is)
+    """
+    for frame in reversed(stack):
+        if frame.filename.startswith(APP_DIR):
+            return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    if stack:
+        frame = stack[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    return 'unknown'
+
+
+class StallWatchdog(QObject):
+    """
+    Detects and explains UI freezes
+
+    A precise heartbeat timer on the Qt thread records how late each tick
+    fires (event-loop latency). A monitor thread watches the time since the
+    last tick; once the Qt thread has been silent for STALL_THRESHOLD_MS it
+    grabs the main thread's Python stack through sys._current_frames(), so
+    the report shows where the freeze is, not just that it happened.
+
+    Latencies and stall durations go into the metrics registry's histograms,
+    and stalls are also counted per code site. The report is written to STALL_REPORT_FILE.
+    """
+
+    def __init__(self, report_file: str = None, parent=None):
+        super().__init__(parent)
+        self.report_file = report_file or Config.STALL_REPORT_FILE
+        self.interval_ms = Config.STALL_HEARTBEAT_INTERVAL
+        self.threshold_ms = Config.STALL_THRESHOLD_MS
+
+        self.max_ms = {'latency': 0.0, 'stalls': 0.0}  # Worst values (histograms keep distributions only)
+        self.sites: Dict[str, Dict[str, Any]] = {}
+        self.recent = deque(maxlen=Config.STALL_RECENT_COUNT)  # Last stalls with their stacks
+
+        self.lock = threading.Lock()
+        self.last_beat = time.monotonic()
+        self.captured: List[List[traceback.FrameSummary]] = []  # Stacks of the stall in progress
+        self.main_thread_id: Optional[int] = None
+        self.stop_event = threading.Event()
+        self.monitor_thread: Optional[threading.Thread] = None
+        self.last_saved = time.monotonic()
+        self.since = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setTimerType(Qt.PreciseTimer)
+        self.heartbeat_timer.timeout.connect(self.on_heartbeat)
+
+    def start(self):
+        """Start the heartbeat and the monitor thread (Qt thread)"""
+        if self.monitor_thread is not None:
+            return
+
+        self.main_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.heartbeat_timer.start(self.interval_ms)
+
+        self.stop_event.clear()
+        self.monitor_thread = threading.Thread(target=self._monitor, name="stall-watchdog", daemon=True)
+        self.monitor_thread.start()
+        logger.info(f"Stall watchdog started (heartbeat {self.interval_ms}ms, threshold {self.threshold_ms}ms)")
+
+    def stop(self):
+        """Stop monitoring and write the report"""
+        self.heartbeat_timer.stop()
+        self.stop_event.set()
+        if self.monitor_thread is not None:
+            self.monitor_thread.join(timeout=1)
+            self.monitor_thread = None
+        self.save_report()
+
+    def on_heartbeat(self):
+        """Heartbeat tick (Qt thread): record latency, close a stall that just ended"""
+        now = time.monotonic()
+        with self.lock:
+            gap_ms = (now - self.last_beat) * 1000
+            self.last_beat = now
+            stacks, self.captured = self.captured, []
+
+        lateness_ms = max(gap_ms - self.interval_ms, 0.0)
+        event_loop_latency_ms.observe(lateness_ms)
+        self.max_ms['latency'] = max(self.max_ms['latency'], lateness_ms)
+
+        if gap_ms >= self.threshold_ms:
+            self._record_stall(gap_ms, stacks)
+
+        if now - self.last_saved >= Config.STALL_REPORT_SAVE_INTERVAL:
+            self.save_report()
+
+    def _monitor(self):
+        """Monitor thread: capture the main thread's stack while it is stalled"""
+        check_interval = self.threshold_ms / 4000
+        while not self.stop_event.wait(check_interval):
+            with self.lock:
+                silent_ms = (time.monotonic() - self.last_beat) * 1000
+                # First sample at the threshold, then one per STALL_RESAMPLE_MS while it lasts
+                due_ms = self.threshold_ms + len(self.captured) * Config.STALL_RESAMPLE_MS
+                if silent_ms < due_ms or len(self.captured) >= Config.STALL_MAX_SAMPLES:
+                    continue
+
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=Config.STALL_STACK_DEPTH)
+            del frame
+
+            with self.lock:
+                if (time.monotonic() - self.last_beat) * 1000 < self.threshold_ms:
+                    continue  # Recovered while we were sampling
+                self.captured.append(stack)
+                first = len(self.captured) == 1
+
+            if first:
+                logger.warning(
+                    f"UI thread stalled for {silent_ms:.0f}ms at {get_stall_site(stack)}\n"
+                    + ''.join(traceback.format_list(stack))
+                )
+
+    def _record_stall(self, duration_ms: float, stacks: list):
+        """Fold an ended stall into the histograms and per-site counts"""
+        ui_stall_ms.observe(duration_ms)
+        self.max_ms['stalls'] = max(self.max_ms['stalls'], duration_ms)
+
+        site = get_stall_site(stacks[0]) if stacks else 'unknown'
+        entry = self.sites.setdefault(site, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        entry['count'] += 1
+        entry['total_ms'] = round(entry['total_ms'] + duration_ms, 1)
+        entry['max_ms'] = round(max(entry['max_ms'], duration_ms), 1)
+
+        self.recent.append({
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_ms': round(duration_ms),
+            'site': site,
+            # Where the thread was at each sample; a moving stack means several slow steps
+            'samples': [get_stall_site(stack) for stack in stacks],
+            'stack': traceback.format_list(stacks[0]) if stacks else [],
+        })
+
+        logger.warning(f"UI thread stall ended after {duration_ms:.0f}ms ({site})")
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        Get the stall statistics
+
+        Returns:
+            Dict with latency and stall histograms, per-site counts and recent stalls
+        """
+        return {
+            'since': self.since,
+            'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'heartbeat_ms': self.interval_ms,
+            'threshold_ms': self.threshold_ms,
+            'latency': self.get_histogram(event_loop_latency_ms, 'latency'),
+            'stalls': self.get_histogram(ui_stall_ms, 'stalls'),
+            'sites': dict(sorted(self.sites.items(), key=lambda kv: kv[1]['total_ms'], reverse=True)),
+            'recent': list(self.recent),
+        }
+
+    def get_histogram(self, histogram, name: str) -> Dict[str, Any]:
+        """Report form of a registry histogram, with the worst value seen"""
+        summary = histogram.to_dict().get('all', {'count': 0, 'avg': 0.0, 'buckets': {}})
+        return {**summary, 'max_ms': round(self.max_ms[name], 1)}
+
+    def save_report(self):
+        """Write the report atomically"""
+        try:
+            write_json_atomic(self.report_file, self.get_report(), indent=2)
+            self.last_saved = time.monotonic()
+        except Exception as e:
+            logger.error(f"Failed to save stall report: {e}")
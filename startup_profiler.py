@@ -0,0 +1,94 @@
+"""
+Startup Profiler for Marketing Display Application
+Per-phase timeline from process start to the first frame on screen
+
+Imported first by app.py, so its clock starts before any heavy import.
+Phases are always recorded (one monotonic read each); the timeline is
+printed and saved only with --profile-startup.
+"""
+import sys
+import time
+import logging
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Records named phase boundaries relative to process start"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.marks: List[Tuple[str, float]] = []  # (phase, ms since start) at the end of each phase
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since process start"""
+        return (time.monotonic() - self.started) * 1000
+
+    def mark(self, phase: str):
+        """
+        Record the end of a phase
+
+        Args:
+            phase: Phase name (the time since the previous mark is its duration)
+        """
+        elapsed = self.elapsed_ms()
+        self.marks.append((phase, elapsed))
+        logger.debug(f"Startup: {phase} done at {elapsed:.0f}ms")
+
+    def get_timeline(self) -> list:
+        """
+        Get the recorded phases
+
+        Returns:
+            List of dicts with 'phase', 'duration_ms' and 'at_ms'
+        """
+        timeline = []
+        previous = 0.0
+        for phase, at in self.marks:
+            timeline.append({'phase': phase, 'duration_ms': round(at - previous, 1), 'at_ms': round(at, 1)})
+            previous = at
+        return timeline
+
+    def report(self, budget_ms: int = None, output_file: str = None) -> bool:
+        """
+        Print the timeline and optionally save it as JSON
+
+        Args:
+            budget_ms: Time-to-first-frame budget to check the total against
+            output_file: JSON file to write
+
+        Returns:
+            True if the last phase ended within the budget (or no budget given)
+        """
+        timeline = self.get_timeline()
+        total = timeline[-1]['at_ms'] if timeline else 0.0
+        within_budget = budget_ms is None or (bool(timeline) and total <= budget_ms)
+
+        lines = ["", "Startup timeline", "-" * 48, f"{'phase':24}{'duration':>12}{'at':>12}"]
+        for entry in timeline:
+            lines.append(f"{entry['phase']:24}{entry['duration_ms']:>10.0f}ms{entry['at_ms']:>10.0f}ms")
+        lines.append("-" * 48)
+        if budget_ms is not None:
+            lines.append(f"{'budget':24}{'':>12}{budget_ms:>10}ms  {'OK' if within_budget else 'OVER'}")
+        print("\n".join(lines), file=sys.stderr)
+
+        if output_file:
+            from utils import write_json_atomic  # Not at the top: this module is imported before anything else
+
+            try:
+                write_json_atomic(output_file, {
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'timeline': timeline,
+                    'total_ms': total,
+                    'budget_ms': budget_ms,
+                    'within_budget': within_budget,
+                }, indent=2)
+            except OSError as e:
+                logger.warning(f"Could not write startup profile: {e}")
+
+        return within_budget
+
+
+# Shared profiler, clock started at first import
+startup_profiler = StartupProfiler()
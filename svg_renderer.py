@@ -0,0 +1,88 @@
+"""
+SVG Rasterizer for Marketing Display Application
+Renders vector images directly at screen resolution and caches the result
+"""
+import os
+import logging
+from typing import Optional
+from PyQt5.QtCore import Qt, QSize, QRectF
+from PyQt5.QtGui import QImage, QPainter, QPixmap
+from PyQt5.QtSvg import QSvgRenderer
+
+logger = logging.getLogger(__name__)
+
+
+def get_svg_render_path(filepath: str, size: QSize) -> str:
+    """
+    Get cache path of an SVG rendered at a given resolution
+
+    The raster is stored alongside the source as '<name>.svg.<W>x<H>.png' so it
+    is cleaned up together with the source file.
+
+    Args:
+        filepath: Path to SVG file
+        size: Render resolution
+
+    Returns:
+        Path of the cached raster
+    """
+    return f"{filepath}.{size.width()}x{size.height()}.png"
+
+
+def render_svg(filepath: str, size: QSize) -> Optional[QPixmap]:
+    """
+    Rasterize an SVG at the given size, reusing a cached render when current
+
+    The drawing fills the whole area (center crop, no black bars), matching
+    how raster images are scaled.
+
+    Args:
+        filepath: Path to SVG file
+        size: Target resolution (usually the screen size)
+
+    Returns:
+        Rendered pixmap or None if the SVG could not be rendered
+    """
+    render_path = get_svg_render_path(filepath, size)
+
+    # Reuse the cached raster if it is newer than the source
+    try:
+        if os.path.getmtime(render_path) >= os.path.getmtime(filepath):
+            pixmap = QPixmap(render_path)
+            if not pixmap.isNull():
+                logger.debug(f"Using cached SVG render: {os.path.basename(render_path)}")
+                return pixmap
+    except OSError:
+        pass
+
+    renderer = QSvgRenderer(filepath)
+    if not renderer.isValid():
+        logger.error(f"Invalid SVG file: {filepath}")
+        return None
+
+    # Scale intrinsic size to cover the target area and center it
+    intrinsic = renderer.defaultSize()
+    if intrinsic.isEmpty():
+        intrinsic = size
+    covered = intrinsic.scaled(size, Qt.KeepAspectRatioByExpanding)
+    x = (size.width() - covered.width()) / 2
+    y = (size.height() - covered.height()) / 2
+
+    image = QImage(size, QImage.Format_RGB32)
+    image.fill(Qt.black)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+    renderer.render(painter, QRectF(x, y, covered.width(), covered.height()))
+    painter.end()
+
+    # Write atomically so a partially written raster is never picked up
+    temp_path = f"{render_path}.tmp"
+    if image.save(temp_path, 'PNG'):
+        os.replace(temp_path, render_path)
+        logger.info(f"Rendered SVG at {size.width()}x{size.height()}: {os.path.basename(filepath)}")
+    else:
+        logger.warning(f"Failed to cache SVG render: {render_path}")
+
+    return QPixmap.fromImage(image)
@@ -11,7 +11,7 @@ from PyQt5.QtCore import Qt
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from media_player_vlc import MediaPlayerApp
+from media_player_app import MediaPlayerApp
 from config import Config
 from utils import setup_logging
 
@@ -0,0 +1,87 @@
+"""
+Tests for the media ingest pipeline's poster and fallback lookups
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from media_ingest import (
+    MediaIngestPipeline, get_normalized_path, get_poster_path, POSTER_SUFFIX, NORMALIZED_SUFFIX
+)
+
+
+def make_file(path, mtime=None):
+    with open(path, 'wb') as f:
+        f.write(b'\x00' * 16)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_poster_path_shared_by_normalized_copy(tmp_path):
+    video = str(tmp_path / 'clip.mp4')
+    assert get_poster_path(video) == video + POSTER_SUFFIX
+    assert get_poster_path(get_normalized_path(video)) == video + POSTER_SUFFIX
+
+
+def test_get_poster(tmp_path):
+    pipeline = MediaIngestPipeline()
+    now = time.time()
+    video = make_file(tmp_path / 'clip.mp4', now - 10)
+
+    assert pipeline.get_poster(video) is None
+
+    poster = make_file(get_poster_path(video), now)
+    assert pipeline.get_poster(video) == poster
+    assert pipeline.get_poster(get_normalized_path(video)) == poster
+
+    # Re-downloaded video: the old poster no longer matches
+    os.utime(video, (now + 10, now + 10))
+    assert pipeline.get_poster(video) is None
+
+
+def test_reject(tmp_path):
+    pipeline = MediaIngestPipeline()
+    now = time.time()
+    video = make_file(tmp_path / 'clip.mp4', now - 10)
+    normalized = make_file(get_normalized_path(video), now)
+
+    assert normalized.endswith(NORMALIZED_SUFFIX)
+    assert pipeline.resolve_playback_path(video) == normalized
+
+    assert pipeline.reject(video) is False
+    assert pipeline.reject(normalized) is True
+    assert pipeline.resolve_playback_path(video) == video
+
+
+def test_submit_extracts_poster_without_normalization(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ENABLE_POSTER_FRAMES', True)
+    monkeypatch.setattr(Config, 'ENABLE_VIDEO_NORMALIZATION', False)
+    pipeline = MediaIngestPipeline()
+    extracted, normalized = [], []
+    monkeypatch.setattr(pipeline, 'extract_poster', extracted.append)
+    monkeypatch.setattr(pipeline, 'normalize_video', normalized.append)
+
+    video = make_file(tmp_path / 'clip.mp4')
+    pipeline.submit(video)
+    pipeline.jobs.join()
+
+    assert extracted == [video]
+    assert normalized == []
+
+
+def test_submit_skips_when_nothing_is_needed(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ENABLE_POSTER_FRAMES', True)
+    monkeypatch.setattr(Config, 'ENABLE_VIDEO_NORMALIZATION', True)
+    pipeline = MediaIngestPipeline()
+    now = time.time()
+    video = make_file(tmp_path / 'clip.mp4', now - 10)
+    make_file(get_normalized_path(video), now)
+    make_file(get_poster_path(video), now)
+
+    pipeline.submit(video)
+
+    assert pipeline.pending == set()
@@ -0,0 +1,32 @@
+"""
+Tests for the atomic file writers
+"""
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import write_bytes_atomic, write_json_atomic
+
+
+def test_write_json_atomic(tmp_path):
+    path = str(tmp_path / 'state' / 'data.json')
+
+    write_json_atomic(path, {'a': 1}, indent=2)
+    write_json_atomic(path, {'b': [1, 2]}, separators=(',', ':'))
+
+    with open(path) as f:
+        assert json.load(f) == {'b': [1, 2]}
+    assert os.listdir(tmp_path / 'state') == ['data.json']
+
+
+def test_write_bytes_atomic(tmp_path):
+    path = str(tmp_path / 'batch.gz')
+
+    write_bytes_atomic(path, b'old')
+    write_bytes_atomic(path, b'new')
+
+    with open(path, 'rb') as f:
+        assert f.read() == b'new'
+    assert not os.path.exists(path + '.tmp')
@@ -0,0 +1,123 @@
+"""
+GPU-composited Image Surface for Marketing Display Application
+Presents prepared frames through OpenGL and animates transitions between them
+"""
+import logging
+from PyQt5.QtWidgets import QOpenGLWidget
+from PyQt5.QtCore import Qt, QVariantAnimation, QEasingCurve, QAbstractAnimation, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class TransitionSurface(QOpenGLWidget):
+    """
+    OpenGL-backed presentation surface for images
+
+    Each frame handed to the surface is already scaled to the screen size, so
+    Qt's OpenGL paint engine uploads it as a texture once (textures are cached
+    per pixmap) and every animation tick only re-composites the two textures
+    on the GPU. No CPU-side blending happens during a transition.
+    """
+
+    # Signals
+    transition_finished = pyqtSignal()  # Emitted when a transition completes
+
+    TRANSITION_CROSSFADE = 'crossfade'
+    TRANSITION_SLIDE = 'slide'
+    TRANSITION_NONE = 'none'
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.current_pixmap: QPixmap = None
+        self.previous_pixmap: QPixmap = None
+        self.transition_type = Config.IMAGE_TRANSITION_TYPE
+        self.progress = 1.0
+
+        self.setCursor(Qt.BlankCursor)
+        self.setStyleSheet("background-color: black;")
+
+        # Drives transition progress from 0.0 (previous frame) to 1.0 (current frame)
+        self.animation = QVariantAnimation(self)
+        self.animation.setStartValue(0.0)
+        self.animation.setEndValue(1.0)
+        self.animation.setEasingCurve(QEasingCurve.InOutQuad)
+        self.animation.valueChanged.connect(self.on_progress_changed)
+        self.animation.finished.connect(self.on_animation_finished)
+
+    def set_pixmap(self, pixmap: QPixmap, animate: bool = True):
+        """
+        Present a new frame, transitioning from the current one
+
+        Args:
+            pixmap: Frame to present, already scaled to the surface size
+            animate: Run the configured transition (False for an instant cut)
+        """
+        if self.animation.state() == QAbstractAnimation.Running:
+            self.animation.stop()
+
+        duration = Config.IMAGE_TRANSITION_DURATION
+        can_animate = (
+            animate
+            and self.current_pixmap is not None
+            and duration > 0
+            and self.transition_type != self.TRANSITION_NONE
+        )
+
+        self.previous_pixmap = self.current_pixmap if can_animate else None
+        self.current_pixmap = pixmap
+
+        if can_animate:
+            self.progress = 0.0
+            self.animation.setDuration(duration)
+            self.animation.start()
+        else:
+            self.progress = 1.0
+
+        self.update()
+
+    def clear(self):
+        """Drop all frames and paint black"""
+        self.animation.stop()
+        self.current_pixmap = None
+        self.previous_pixmap = None
+        self.progress = 1.0
+        self.update()
+
+    def on_progress_changed(self, value):
+        """Repaint on every animation tick"""
+        self.progress = float(value)
+        self.update()
+
+    def on_animation_finished(self):
+        """Release the outgoing frame once the transition completes"""
+        self.previous_pixmap = None
+        self.progress = 1.0
+        self.update()
+        self.transition_finished.emit()
+
+    def initializeGL(self):
+        """Initialize GL state"""
+        logger.info(f"OpenGL image surface ready (transition: {self.transition_type}, "
+                    f"{Config.IMAGE_TRANSITION_DURATION}ms)")
+
+    def paintGL(self):
+        """Composite the previous and current frames for the current progress"""
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+
+        if self.previous_pixmap is not None and self.progress < 1.0:
+            if self.transition_type == self.TRANSITION_SLIDE:
+                offset = int(self.width() * self.progress)
+                painter.drawPixmap(-offset, 0, self.previous_pixmap)
+                painter.drawPixmap(self.width() - offset, 0, self.current_pixmap)
+            else:
+                painter.drawPixmap(0, 0, self.previous_pixmap)
+                painter.setOpacity(self.progress)
+                painter.drawPixmap(0, 0, self.current_pixmap)
+        elif self.current_pixmap is not None:
+            painter.drawPixmap(0, 0, self.current_pixmap)
+
+        painter.end()
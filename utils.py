@@ -2,40 +2,20 @@
 Utility functions for Marketing Display Application
 """
 import os
-import subprocess
+import json
+import time
+import queue
+import atexit
 import hashlib
 import logging
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
 from typing import Optional, List, Dict
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
 
-def check_internet_connection(host: str = "8.8.8.8", timeout: int = 2) -> bool:
-    """
-    Check if internet connection is available
-    
-    Args:
-        host: Host to ping (default: Google DNS)
-        timeout: Timeout in seconds
-        
-    Returns:
-        True if internet is available, False otherwise
-    """
-    try:
-        subprocess.check_call(
-            ["ping", "-c", "1", "-W", str(timeout), host],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        return True
-    except subprocess.CalledProcessError:
-        return False
-    except Exception as e:
-        logger.error(f"Error checking internet connection: {e}")
-        return False
-
-
 def get_file_hash(filepath: str) -> Optional[str]:
     """
     Calculate SHA256 hash of a file
@@ -119,6 +99,19 @@ def is_image_file(filename: str) -> bool:
     return ext in image_extensions
 
 
+def is_svg_file(filename: str) -> bool:
+    """
+    Check if file is a vector (SVG) image based on extension
+    
+    Args:
+        filename: Filename or path
+        
+    Returns:
+        True if SVG file, False otherwise
+    """
+    return os.path.splitext(filename)[1].lower() == '.svg'
+
+
 def format_bytes(bytes_size: int) -> str:
     """
     Format bytes to human readable string
@@ -212,15 +205,218 @@ def cleanup_old_files(directory: str, max_age_days: int = 30) -> int:
     return removed_count
 
 
-def setup_logging(log_file: str, log_level: str = 'INFO'):
+def write_bytes_atomic(filepath: str, data: bytes):
+    """
+    Replace a file's contents atomically
+    
+    The data goes to a temporary file that is fsynced and renamed over the
+    target, so a power cut leaves the old file or the new one, never half of one.
+    
+    Args:
+        filepath: File to write (its directory is created if needed)
+        data: New contents
+        
+    Raises:
+        OSError: If the file could not be written
+    """
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, filepath)
+
+
+def write_json_atomic(filepath: str, data, **kwargs):
+    """
+    Write a JSON document atomically
+    
+    Args:
+        filepath: File to write (its directory is created if needed)
+        data: JSON-serializable object
+        **kwargs: Passed to json.dumps (e.g. indent, separators)
+        
+    Raises:
+        OSError: If the file could not be written
+    """
+    write_bytes_atomic(filepath, json.dumps(data, **kwargs).encode('utf-8'))
+
+
+def get_system_uptime() -> Optional[float]:
+    """
+    Get time since the system booted
+    
+    Returns:
+        Seconds since power-on, or None if not available (non-Linux)
+    """
+    try:
+        with open('/proc/uptime', 'r') as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limits repetitive log lines per call site
+    
+    Messages are f-strings, so they are grouped by where they are logged
+    (logger, file, line) rather than by text. Each call site may log `burst`
+    records per `window` seconds; the rest are dropped and counted, and the
+    next record let through reports how many were suppressed. Warnings and
+    errors always pass.
+    """
+    
+    def __init__(self, window: float = 60.0, burst: int = 10):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.sites: Dict[tuple, list] = {}  # site -> [window start, passed, suppressed]
+        self.lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.burst <= 0:
+            return True
+        
+        site = (record.name, record.pathname, record.lineno)
+        now = record.created
+        with self.lock:
+            state = self.sites.get(site)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self.sites[site] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                    record.args = None
+                return True
+            
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            
+            state[2] += 1
+            return False
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that leaves flushing to the log listener"""
+    
+    def flush(self):
+        """Called after every record by StreamHandler.emit: deferred"""
+    
+    def flush_batch(self):
+        """Write buffered records to disk"""
+        super().flush()
+
+
+class BatchingLogListener:
+    """
+    Writes queued log records on a background thread
+    
+    Formatting and file I/O happen here instead of in the logging thread
+    (often the Qt thread). The log file is flushed once per batch, after
+    flush_interval seconds, or at once for warnings and errors, so a 24/7
+    playback loop writes to the SD card in a few larger chunks.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, handlers: list, flush_interval: float = 5.0, batch_size: int = 100):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.thread: Optional[threading.Thread] = None
+        self.sentinel = object()
+    
+    def start(self):
+        """Start the writer thread"""
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Write everything still queued, then stop"""
+        if self.thread is None:
+            return
+        self.queue.put(self.sentinel)
+        self.thread.join(timeout=5)
+        self.thread = None
+        self._flush()
+    
+    def _run(self):
+        """Writer thread loop"""
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush()
+                continue
+            
+            if record is self.sentinel:
+                break
+            
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            self.pending += 1
+            
+            if (record.levelno >= logging.WARNING or self.pending >= self.batch_size
+                    or time.monotonic() - self.last_flush >= self.flush_interval):
+                self._flush()
+    
+    def _flush(self):
+        """Flush batched handlers"""
+        for handler in self.handlers:
+            if isinstance(handler, BatchedRotatingFileHandler):
+                handler.flush_batch()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+
+_log_listener: Optional[BatchingLogListener] = None
+
+
+def get_json_formatter() -> Optional[logging.Formatter]:
+    """
+    Get a JSON formatter from python-json-logger
+    
+    Returns:
+        Formatter, or None if python-json-logger is not installed
+    """
+    try:
+        try:
+            from pythonjsonlogger.json import JsonFormatter  # python-json-logger >= 3.1
+        except ImportError:
+            from pythonjsonlogger.jsonlogger import JsonFormatter
+    except ImportError:
+        return None
+    
+    return JsonFormatter(
+        '%(asctime)s %(name)s %(levelname)s %(threadName)s %(message)s',
+        datefmt='%Y-%m-%dT%H:%M:%S'
+    )
+
+
+def setup_logging(log_file: str, log_level: str = 'INFO', log_format: str = None):
     """
     Setup application logging
     
+    Records are handed to a queue and written by a background thread, with
+    repetitive lines rate-limited per call site before they are queued.
+    
     Args:
         log_file: Path to log file
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
+        log_format: Log file format, 'json' or 'text' (defaults to Config.LOG_FORMAT)
     """
-    from logging.handlers import RotatingFileHandler
+    global _log_listener
+    from config import Config
+    
+    if _log_listener is not None:
+        return
     
     # Create formatter
     formatter = logging.Formatter(
@@ -228,6 +424,12 @@ def setup_logging(log_file: str, log_level: str = 'INFO'):
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
+    # File format: JSON lines for log shipping, text if python-json-logger is missing
+    file_formatter = formatter
+    log_format = log_format or Config.LOG_FORMAT
+    if log_format == 'json':
+        file_formatter = get_json_formatter() or formatter
+    
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(getattr(logging, log_level))
@@ -235,18 +437,41 @@ def setup_logging(log_file: str, log_level: str = 'INFO'):
     
     # File handler
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    file_handler = RotatingFileHandler(
+    file_handler = BatchedRotatingFileHandler(
         log_file,
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
+        maxBytes=Config.LOG_MAX_BYTES,
+        backupCount=Config.LOG_BACKUP_COUNT
     )
     file_handler.setLevel(getattr(logging, log_level))
-    file_handler.setFormatter(formatter)
+    file_handler.setFormatter(file_formatter)
+    
+    # Logging threads only enqueue; the listener formats and writes
+    log_queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(Config.LOG_RATE_LIMIT_WINDOW, Config.LOG_RATE_LIMIT_BURST))
+    
+    _log_listener = BatchingLogListener(
+        log_queue,
+        [console_handler, file_handler],
+        flush_interval=Config.LOG_FLUSH_INTERVAL,
+        batch_size=Config.LOG_FLUSH_BATCH
+    )
+    _log_listener.start()
+    atexit.register(stop_logging)
     
     # Root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level))
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    root_logger.addHandler(queue_handler)
     
     logger.info(f"Logging initialized - Level: {log_level}")
+    if log_format == 'json' and file_formatter is formatter:
+        logger.warning("python-json-logger not installed, writing text logs")
+
+
+def stop_logging():
+    """Write out queued log records and stop the log writer thread"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
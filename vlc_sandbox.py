@@ -0,0 +1,365 @@
+"""
+Video Decode Sandbox for Marketing Display Application
+Supervises libVLC running in a child process (vlc_sandbox_worker.py)
+"""
+import os
+import sys
+import json
+import time
+import logging
+from typing import Optional, List
+import vlc
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vlc_sandbox_worker.py')
+
+
+class SandboxProcess(QObject):
+    """
+    One worker process and its line-delimited JSON channel
+
+    QProcess delivers output and exit notifications on the Qt thread, so no
+    reader thread is needed on this side.
+    """
+
+    message = pyqtSignal(dict)
+    exited = pyqtSignal()
+
+    def __init__(self, init_message: dict, parent=None):
+        super().__init__(parent)
+        self.buffer = b''
+        self.ready = False
+        self.started_at = time.monotonic()
+        self.last_pong = self.started_at
+        self.pid = None
+
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ForwardedErrorChannel)  # Worker logs go to our stderr
+        self.process.readyReadStandardOutput.connect(self._on_output)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
+        self.process.start(sys.executable, [WORKER_SCRIPT])
+
+        # Commands are handled in order, so anything sent now runs after init
+        self.send(init_message)
+
+    def send(self, message: dict):
+        """Send one command to the worker"""
+        if self.process.state() != QProcess.NotRunning:
+            self.process.write((json.dumps(message) + '\n').encode())
+
+    def kill(self):
+        """Kill the worker (exited is emitted once it is gone)"""
+        self.process.kill()
+
+    def shutdown(self):
+        """Stop the worker without reporting it as a crash"""
+        self.process.finished.disconnect(self._on_finished)
+        self.process.errorOccurred.disconnect(self._on_error)
+        self.process.closeWriteChannel()  # Worker releases libVLC on EOF
+        if not self.process.waitForFinished(1000):
+            self.process.kill()
+            self.process.waitForFinished(1000)
+
+    def _on_output(self):
+        """Parse complete lines from the worker"""
+        self.buffer += bytes(self.process.readAllStandardOutput())
+        while b'\n' in self.buffer:
+            line, self.buffer = self.buffer.split(b'\n', 1)
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.warning(f"Invalid message from decode sandbox: {line[:100]!r}")
+                continue
+
+            event = message.get('event')
+            if event == 'ready':
+                self.ready = True
+                self.pid = message.get('pid')
+                self.last_pong = time.monotonic()
+            elif event == 'pong':
+                self.last_pong = time.monotonic()
+            self.message.emit(message)
+
+    def _on_finished(self, exit_code, exit_status):
+        """Worker exited"""
+        logger.debug(f"Decode sandbox process exited (code {exit_code})")
+        self.exited.emit()
+
+    def _on_error(self, error):
+        """Worker could not be started (no finished signal follows)"""
+        if error == QProcess.FailedToStart:
+            logger.error(f"Decode sandbox failed to start: {self.process.errorString()}")
+            self.exited.emit()
+
+
+class SandboxPlayer:
+    """Stand-in for vlc.MediaPlayer, for the calls the player widget makes on a slot"""
+
+    def __init__(self, slot: 'SandboxSlot'):
+        self.slot = slot
+
+    def get_state(self) -> vlc.State:
+        """Last state reported by the worker"""
+        return vlc.State(self.slot.state)
+
+    def get_time(self) -> int:
+        """Last media time reported by the worker (milliseconds, heartbeat resolution)"""
+        return self.slot.time_ms
+
+    def set_pause(self, paused: int):
+        """Pause or resume"""
+        self.slot.sandbox.send({'cmd': 'pause', 'slot': self.slot.index, 'paused': bool(paused)})
+
+    def get_media(self):
+        """Media lives in the worker; not available here"""
+        return None
+
+
+class SandboxSlot:
+    """
+    Video slot whose libVLC player runs in the decode sandbox
+
+    Same interface as media_player_vlc.VideoSlot, so the player widget can
+    drive either.
+    """
+
+    def __init__(self, index: int, sandbox: 'DecodeSandbox', frame, event_callback):
+        self.index = index
+        self.sandbox = sandbox
+        self.frame = frame
+        self.event_callback = event_callback  # (slot index, event name, generation), e.g. the widget's vlc_event.emit
+        self.filepath = None
+        self.generation = 0  # Bumped per opened media so stale events are dropped
+        self.ready = False  # First frame decoded, paused
+        self.started = False
+        self.repeat = False
+        self.state = vlc.State.NothingSpecial.value
+        self.time_ms = 0
+        self.player = SandboxPlayer(self)
+
+    def open(self, filepath: str, paused: bool = True, repeat: bool = False, start_time: float = 0.0):
+        """
+        Open media
+
+        Args:
+            filepath: Path to video file
+            paused: Preroll (decode the first frame and pause) instead of playing
+            repeat: Loop the input inside libVLC (no end event between loops)
+            start_time: Start position in seconds
+        """
+        self.generation += 1
+        self.filepath = filepath
+        self.ready = False
+        self.started = not paused
+        self.repeat = repeat
+        self.state = vlc.State.Opening.value
+        self.time_ms = int(start_time * 1000)
+
+        self.sandbox.send({
+            'cmd': 'open',
+            'slot': self.index,
+            'path': filepath,
+            'paused': paused,
+            'repeat': Config.VIDEO_LOOP_REPEAT if repeat else 0,
+            'start_time': start_time,
+            'generation': self.generation,
+        })
+
+    def is_ready(self) -> bool:
+        """Check if a preroll has decoded its first frame and paused"""
+        if not self.ready and not self.started and self.filepath:
+            self.ready = self.state == vlc.State.Paused.value
+        return self.ready
+
+    def start(self):
+        """Start playback of the opened media (unpause a preroll)"""
+        if not self.started:
+            self.started = True
+            self.sandbox.send({'cmd': 'start', 'slot': self.index})
+
+    def stop(self):
+        """Stop playback and forget the opened media"""
+        self.reset()
+        self.sandbox.send({'cmd': 'stop', 'slot': self.index, 'generation': self.generation})
+
+    def reset(self):
+        """Forget the opened media without talking to the worker"""
+        self.generation += 1
+        self.filepath = None
+        self.ready = False
+        self.started = False
+        self.repeat = False
+        self.state = vlc.State.Stopped.value
+        self.time_ms = 0
+
+    def release(self):
+        """Nothing to release locally; the worker owns the player"""
+
+    def on_event(self, name: str, generation: int):
+        """Handle an event reported by the worker"""
+        if generation != self.generation:
+            return
+
+        if name == 'playing':
+            self.state = vlc.State.Playing.value
+        elif name == 'paused':
+            self.state = vlc.State.Paused.value
+        elif name == 'ended':
+            self.state = vlc.State.Ended.value
+        elif name == 'error':
+            self.state = vlc.State.Error.value
+
+        self.event_callback(self.index, name, generation)
+
+
+class DecodeSandbox(QObject):
+    """
+    Runs video decode in a supervised child process
+
+    The worker renders into the player widget's video frames by window ID and
+    is controlled over its stdin/stdout. A heartbeat detects a hung decoder;
+    a crashed or hung worker is replaced by a warm spare that is already
+    initialized, so video is back in well under a second while images keep
+    playing in this process.
+    """
+
+    crashed = pyqtSignal()  # Worker died or hung; all slots were reset
+
+    def __init__(self, vlc_args: List[str], fallback_args: List[str], frames: list, event_callback, parent=None):
+        super().__init__(parent)
+        self.init_message = {
+            'cmd': 'init',
+            'args': vlc_args,
+            'fallback_args': fallback_args,
+            'windows': [int(frame.winId()) for frame in frames],
+        }
+        self.slots = [
+            SandboxSlot(index, self, frame, event_callback)
+            for index, frame in enumerate(frames)
+        ]
+        self.ping_id = 0
+        self.crashed_at: Optional[float] = None
+
+        self.active = self._spawn()
+        self.spare: Optional[SandboxProcess] = None
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.timeout.connect(self.check_heartbeat)
+        self.heartbeat_timer.start(Config.VIDEO_SANDBOX_HEARTBEAT_INTERVAL)
+
+    def send(self, message: dict):
+        """Send a command to the active worker (dropped while none is running)"""
+        if self.active is not None:
+            self.active.send(message)
+
+    def _spawn(self) -> SandboxProcess:
+        """Start a worker process"""
+        process = SandboxProcess(self.init_message, self)
+        process.message.connect(lambda message, process=process: self._on_message(process, message))
+        process.exited.connect(lambda process=process: self._on_exited(process))
+        return process
+
+    def _ensure_spare(self):
+        """Keep one initialized worker in reserve"""
+        if Config.VIDEO_SANDBOX_WARM_SPARE and self.spare is None and self.active is not None:
+            self.spare = self._spawn()
+
+    def _on_message(self, process: SandboxProcess, message: dict):
+        """Route a worker message"""
+        event = message.get('event')
+
+        if process is not self.active:
+            return  # Spare: only its ready flag matters
+
+        if event == 'ready':
+            if self.crashed_at is not None:
+                logger.info(f"Decode sandbox restarted in {(time.monotonic() - self.crashed_at) * 1000:.0f}ms")
+                self.crashed_at = None
+            else:
+                logger.info(f"Decode sandbox ready (pid {process.pid})")
+            # Spare is started only once the active worker is up, so they don't compete at boot
+            self._ensure_spare()
+        elif event == 'pong':
+            for slot, (generation, state, time_ms) in zip(self.slots, message.get('states', [])):
+                if generation == slot.generation:
+                    slot.state = state
+                    slot.time_ms = time_ms
+        elif 'slot' in message:
+            self.slots[message['slot']].on_event(event, message.get('generation'))
+
+    def _on_exited(self, process: SandboxProcess):
+        """A worker exited"""
+        if process is self.spare:
+            logger.warning("Decode sandbox spare exited")
+            self.spare = None
+            process.deleteLater()
+            QTimer.singleShot(Config.VIDEO_SANDBOX_RESTART_BACKOFF, self._ensure_spare)
+            return
+
+        if process is not self.active:
+            process.deleteLater()
+            return
+
+        self.restart(died_before_ready=not process.ready)
+        process.deleteLater()
+
+    def restart(self, died_before_ready: bool = False):
+        """Replace the active worker and reset all slots"""
+        logger.error("Decode sandbox crashed, restarting")
+        self.crashed_at = time.monotonic()
+
+        for slot in self.slots:
+            slot.reset()
+
+        if self.spare is not None:
+            self.active, self.spare = self.spare, None
+            if self.active.ready:
+                self._on_message(self.active, {'event': 'ready'})
+        elif died_before_ready:
+            # Worker can't even initialize: don't spin
+            self.active = None
+            QTimer.singleShot(Config.VIDEO_SANDBOX_RESTART_BACKOFF, self._respawn)
+        else:
+            self.active = self._spawn()
+
+        self.crashed.emit()
+
+    def _respawn(self):
+        """Start a new active worker after a backoff"""
+        if self.active is None:
+            self.active = self._spawn()
+
+    def check_heartbeat(self):
+        """Ping the worker and kill it if it stopped answering"""
+        process = self.active
+        if process is None:
+            return
+
+        now = time.monotonic()
+        if process.ready:
+            if (now - process.last_pong) * 1000 > Config.VIDEO_SANDBOX_HEARTBEAT_TIMEOUT:
+                logger.error("Decode sandbox not responding, killing it")
+                process.kill()
+                return
+        elif (now - process.started_at) * 1000 > Config.VIDEO_SANDBOX_STARTUP_TIMEOUT:
+            logger.error("Decode sandbox did not start in time, killing it")
+            process.kill()
+            return
+
+        self.ping_id += 1
+        process.send({'cmd': 'ping', 'id': self.ping_id})
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        self.heartbeat_timer.stop()
+        for process in (self.active, self.spare):
+            if process is not None:
+                process.shutdown()
+        self.active = None
+        self.spare = None
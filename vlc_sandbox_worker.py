@@ -0,0 +1,167 @@
+"""
+Video Decode Sandbox Worker for Marketing Display Application
+Child process that owns libVLC and renders into the parent's video windows
+
+Protocol: one JSON object per line. Commands arrive on stdin, replies and
+libVLC events are written to the original stdout. Everything libVLC or its
+plugins print goes to stderr instead, so it cannot corrupt the channel.
+"""
+import os
+import sys
+import json
+import logging
+import threading
+
+import vlc
+
+logger = logging.getLogger('vlc_sandbox_worker')
+
+
+# libVLC events forwarded to the parent
+VLC_EVENTS = {
+    vlc.EventType.MediaPlayerEndReached: 'ended',
+    vlc.EventType.MediaPlayerEncounteredError: 'error',
+    vlc.EventType.MediaPlayerPlaying: 'playing',
+    vlc.EventType.MediaPlayerPaused: 'paused',
+}
+
+
+class SandboxWorker:
+    """Executes player commands from the parent and reports libVLC events"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.write_lock = threading.Lock()  # Events are sent from libVLC threads
+        self.instance = None
+        self.players = []
+        self.generations = []
+
+    def send(self, message: dict):
+        """Write one message to the parent"""
+        with self.write_lock:
+            self.channel.write(json.dumps(message) + '\n')
+            self.channel.flush()
+
+    def run(self):
+        """Command loop; returns when the parent closes stdin"""
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            message = json.loads(line)
+            handler = getattr(self, f"cmd_{message.get('cmd')}", None)
+            if handler is None:
+                logger.warning(f"Unknown command: {message.get('cmd')}")
+                continue
+
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f"Command {message.get('cmd')} failed: {e}")
+                if 'slot' in message:
+                    self.send({'event': 'error', 'slot': message['slot'], 'generation': message.get('generation')})
+
+        self.release()
+
+    def cmd_init(self, message: dict):
+        """Create the libVLC instance and one player per parent window"""
+        self.instance = vlc.Instance(' '.join(message['args']))
+        if self.instance is None and message.get('fallback_args'):
+            logger.warning("Decode profile failed in sandbox, using fallback profile")
+            self.instance = vlc.Instance(' '.join(message['fallback_args']))
+        if self.instance is None:
+            logger.error("libVLC instance creation failed")
+            sys.exit(1)
+
+        for index, window_id in enumerate(message['windows']):
+            player = self.instance.media_player_new()
+            event_manager = player.event_manager()
+            for event_type, name in VLC_EVENTS.items():
+                event_manager.event_attach(event_type, self._on_vlc_event, index, name)
+
+            if sys.platform.startswith('linux'):
+                player.set_xwindow(window_id)
+            elif sys.platform == "win32":
+                player.set_hwnd(window_id)
+
+            self.players.append(player)
+            self.generations.append(0)
+
+        self.send({'event': 'ready', 'pid': os.getpid()})
+
+    def cmd_open(self, message: dict):
+        """Open a file on a player (paused on its first frame for a preroll)"""
+        index = message['slot']
+
+        options = []
+        if message.get('paused'):
+            options.append(':start-paused')
+        if message.get('repeat'):
+            options.append(f":input-repeat={message['repeat']}")
+        if message.get('start_time'):
+            options.append(f":start-time={message['start_time']:.3f}")
+
+        media = self.instance.media_new(message['path'], *options)
+        self.players[index].set_media(media)
+        media.release()
+        # Only now: events the old input fires while set_media() stops it keep the old tag
+        self.generations[index] = message['generation']
+        self.players[index].play()
+
+    def cmd_start(self, message: dict):
+        """Unpause a prerolled player"""
+        self.players[message['slot']].set_pause(0)
+
+    def cmd_pause(self, message: dict):
+        """Pause or resume a player"""
+        self.players[message['slot']].set_pause(1 if message.get('paused') else 0)
+
+    def cmd_stop(self, message: dict):
+        """Stop a player"""
+        index = message['slot']
+        self.players[index].stop()
+        self.generations[index] = message['generation']
+
+    def cmd_ping(self, message: dict):
+        """Heartbeat: answer with every player's state"""
+        self.send({
+            'event': 'pong',
+            'id': message.get('id'),
+            'states': [
+                [self.generations[index], player.get_state().value, player.get_time()]
+                for index, player in enumerate(self.players)
+            ],
+        })
+
+    def _on_vlc_event(self, event, index: int, name: str):
+        """libVLC callback (libVLC thread): forward to the parent only"""
+        self.send({'event': name, 'slot': index, 'generation': self.generations[index]})
+
+    def release(self):
+        """Release libVLC"""
+        for player in self.players:
+            player.stop()
+            player.release()
+        self.players = []
+        if self.instance is not None:
+            self.instance.release()
+            self.instance = None
+
+
+def main():
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO,
+        format='%(asctime)s - vlc-sandbox - %(levelname)s - %(message)s'
+    )
+
+    # Keep a private copy of stdout for the protocol, send fd 1 to stderr
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    SandboxWorker(channel).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -15,7 +15,6 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QPixmap
 
 from config import Config
-from utils import check_internet_connection
 
 logger = logging.getLogger(__name__)
 